@@ -5,29 +5,59 @@
  Conforme à l'énoncé : AHP + graphiques + PDF + comparaison
  ***************************************************************************/
 """
-from qgis.PyQt.QtCore import QCoreApplication, QVariant
-from qgis.PyQt.QtGui import QIcon, QColor, QPixmap
+from qgis.PyQt.QtCore import QCoreApplication, QTimer
+from qgis.PyQt.QtGui import QIcon, QColor
 from qgis.PyQt.QtWidgets import QAction, QMessageBox, QFileDialog
 from qgis.core import (
-    QgsField, QgsGraduatedSymbolRenderer, QgsRendererRange,
-    QgsSymbol, Qgis, QgsProject
+    QgsApplication, QgsGraduatedSymbolRenderer, QgsRendererRange,
+    QgsSymbol, Qgis, QgsProject, QgsProviderRegistry
 )
 from .SustainableZone_dialog import SustainableZoneDialog
+from .SustainableZone_io import (
+    DEFAULT_STREAMING_THRESHOLD, RESULT_FIELDS, UNCERTAINTY_FIELDS, ResultWriter,
+    ensure_result_fields, node_fields, plugin_setting, scoring_request
+)
+from .SustainableZone_log import (
+    DEFAULT_FLUSH_MS, DEFAULT_LOG_FILE, DEFAULT_ZONE_LINES, ConsoleLog, ZoneLog
+)
+from .SustainableZone_preview import (
+    PREVIEW_EXPRESSION, clear_preview, set_preview,
+    register as register_preview_function,
+    unregister as unregister_preview_function
+)
+from .SustainableZone_task import (
+    AnalysisTask, NodeScoresTask, SensitivityTask, UncertaintyTask, WriteScoresTask
+)
+from .SustainableZone_sensitivity import (
+    DEFAULT_DRAWS, DEFAULT_SPREAD, DEFAULT_SWEEP_STEPS, critical_thresholds
+)
+from .SustainableZone_ahp import set_random_index_cache
+from .SustainableZone_charts import (
+    ATLAS_SORTS, CHART_DPI, DEFAULT_ATLAS_PAGE, add_pdf_page, analysis_charts, compare_chart,
+    export_chart, matplotlib_available, node_chart, render_all, render_png, safe_filename,
+    sensitivity_charts, uncertainty_chart
+)
+from .SustainableZone_pdf import PdfReport
+from .SustainableZone_group import group_ahp
+from .SustainableZone_runs import DEFAULT_RUNS_DAYS, DEFAULT_RUNS_MB, RunArtifacts, prune_runs
+from .SustainableZone_cache import (
+    DEFAULT_CACHE_MB, DEFAULT_FINGERPRINT_MAX, ResultsCache, cache_key, rows_fingerprint,
+    source_state
+)
+from .SustainableZone_engine import (
+    CRITERIA, CLASS_LABELS, DEFAULT_TOP_K, TREE, ResultsStore,
+    advice, norm_ratio, safe_float, sub_weight_matrix, uniform_sub_weights
+)
+import io
 import os
 import os.path
-import re
+import tempfile
+import time
 import numpy as np
 
-# ========== NORMES ==========
-NORM_PIB   = 500.0;  NORM_INFRA = 400.0;  NORM_RESTO = 700.0;  NORM_TOUR = 1000.0
-NORM_IQA   = 40.0;   NORM_RESS  = 600.0;  NORM_BIO   = 900.0
-NORM_SECU  = 68.0;   NORM_SANTE = 60.0;   NORM_PAUV  = 50.0;   NORM_PMR  = 50.0
-
-SUB_NAMES_ECO = ['PIB', 'Infrastructures', 'Restaurants', 'Touristes']
-SUB_NAMES_ENV = ['IQA', 'Ressources', 'Biodiversité']
-SUB_NAMES_SOC = ['Sécurité', 'Santé', 'Pauvreté', 'PMR']
-
-INVERTED_CRITERIA = {'pauv'}
+# Noms des enfants de chaque nœud jugé (racine, dimensions, groupes imbriqués)
+JUDGMENT_NAMES = dict(dim=CRITERIA.dimension_names(),
+                      **{key: CRITERIA.child_names(key) for key in CRITERIA.groups})
 
 
 class SustainableZone:
@@ -35,7 +65,19 @@ class SustainableZone:
         self.iface = iface
         self.dlg = None
         self._results = []
+        self._charts = []
+        # Artefacts de la dernière analyse (images d'export, manifeste)
+        self._run = None
         self._buttons_connected = False
+        self._task = None
+        self._console = None
+        # Recalcul instantané : matrice normalisée de la dernière analyse
+        self._cache = None
+        self._cache_layer_id = None
+        self._preview = None
+        self._preview_timer = None
+        # Ancienne boucle de calcul, pour comparaison avec le moteur vectorisé
+        self.legacy_scoring = False
 
     def initGui(self):
         icon_path = os.path.join(os.path.dirname(__file__), 'icon.png')
@@ -45,8 +87,12 @@ class SustainableZone:
         self.action.triggered.connect(self.run)
         self.iface.addPluginToMenu(u"&SustainableZone", self.action)
         self.iface.addToolBarIcon(self.action)
+        register_preview_function()
 
     def unload(self):
+        self.cancel_analysis()
+        self._drop_preview()
+        unregister_preview_function()
         self.iface.removePluginMenu(u"&SustainableZone", self.action)
         self.iface.removeToolBarIcon(self.action)
 
@@ -54,16 +100,10 @@ class SustainableZone:
         style = f"color:{color}; font-family:Consolas;"
         if bold:
             style += " font-weight:bold;"
-        self.dlg.textBrowser_results.append(f"<span style='{style}'>{msg}</span>")
-        QCoreApplication.processEvents()
+        self._console.write(f"<span style='{style}'>{msg}</span>")
 
     def safe_float(self, val):
-        try:
-            if val is None or val == "" or str(val).strip() == "NULL":
-                return 0.0
-            return float(val)
-        except (ValueError, TypeError):
-            return 0.0
+        return safe_float(val)
 
     def safe_field_value(self, feature, field_name):
         if not field_name:
@@ -75,231 +115,77 @@ class SustainableZone:
             return 0.0
 
     def norm_ratio(self, val, norm, invert=False):
-        v = self.safe_float(val)
-        ratio = v / norm if norm > 0 else 0.0
-        if invert:
-            ratio = max(0.0, 1.0 - ratio)
-        return ratio
+        return norm_ratio(val, norm, invert)
 
     def generate_advice(self, n_eco, n_env, n_soc):
-        if n_env < 0.5:
-            return "URGENCE ÉCOLOGIQUE : biodiversité et qualité air."
-        if n_soc < 0.5:
-            return "RISQUE SOCIAL : sécurité, santé, accessibilité."
-        if n_eco < 0.5:
-            return "DÉFICIT ÉCO : infrastructures et attractivité."
-        if n_eco > 1.2 and n_env < 0.8:
-            return "SURCHAUFFE : limiter tourisme de masse."
-        return "Modèle équilibré : maintenir le cap."
+        return advice(n_eco, n_env, n_soc)
 
     def safe_filename(self, name):
-        return re.sub(r'[^\w\-]', '_', str(name))
+        return safe_filename(name)
 
     # ==================== GRAPHIQUES ====================
-    def generate_charts(self, results, stats, w_eco, w_env, w_soc, output_dir):
-        try:
-            import matplotlib
-            matplotlib.use('Agg')
-            import matplotlib.pyplot as plt
-        except ImportError:
-            self.log("⚠ matplotlib indisponible.", "#f39c12")
-            return []
-
-        os.makedirs(output_dir, exist_ok=True)
-        paths = []
-
-        # 1. Camembert poids AHP
-        try:
-            fig, ax = plt.subplots(figsize=(7, 5))
-            ax.pie([w_eco, w_env, w_soc],
-                   labels=[f'Économie\n({w_eco:.1%})', f'Environnement\n({w_env:.1%})',
-                           f'Social\n({w_soc:.1%})'],
-                   colors=['#3498db', '#27ae60', '#f39c12'],
-                   autopct='%1.1f%%', startangle=90, textprops={'fontsize': 11})
-            ax.set_title('Pondérations AHP des dimensions', fontsize=14, fontweight='bold')
-            p = os.path.join(output_dir, "01_pie_ahp.png")
-            fig.savefig(p, dpi=200, bbox_inches='tight')
-            plt.close(fig)
-            paths.append(p)
-        except Exception as e:
-            self.log(f"⚠ Erreur graphique camembert AHP : {e}", "#f39c12")
-
-        # 2. Barres scores pondérés
-        try:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            names = [r['name'] for r in results]
-            x = np.arange(len(names))
-            w = 0.25
-            ax.bar(x - w, [r['ws_eco'] for r in results], w, label='Économie', color='#3498db')
-            ax.bar(x,     [r['ws_env'] for r in results], w, label='Environnement', color='#27ae60')
-            ax.bar(x + w, [r['ws_soc'] for r in results], w, label='Social', color='#f39c12')
-            ax.set_ylabel('Score pondéré AHP')
-            ax.set_title('Scores pondérés par dimension', fontsize=14, fontweight='bold')
-            ax.set_xticks(x)
-            ax.set_xticklabels(names, rotation=30, ha='right')
-            ax.legend()
-            ax.grid(axis='y', alpha=0.3)
-            p = os.path.join(output_dir, "02_bar_scores.png")
-            fig.savefig(p, dpi=200, bbox_inches='tight')
-            plt.close(fig)
-            paths.append(p)
-        except Exception as e:
-            self.log(f"⚠ Erreur graphique barres scores : {e}", "#f39c12")
-
-        # 3. Barres indice global
-        try:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            names = [r['name'] for r in results]
-            id_vals = [r['id_global'] for r in results]
-            colors = ['#27ae60' if v >= 0.8 else '#f39c12' if v >= 0.5 else '#e74c3c'
-                      for v in id_vals]
-            bars = ax.bar(names, id_vals, color=colors)
-            ax.axhline(y=0.8, color='#27ae60', linestyle='--', label='Seuil durable')
-            ax.axhline(y=0.5, color='#f39c12', linestyle='--', label='Seuil transition')
-            ax.set_ylabel('Score global')
-            ax.set_title('Indice de durabilité global', fontsize=14, fontweight='bold')
-            ax.legend()
-            ax.grid(axis='y', alpha=0.3)
-            for bar, val in zip(bars, id_vals):
-                ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height() + 0.01,
-                        f'{val:.2f}', ha='center', va='bottom', fontweight='bold')
-            plt.xticks(rotation=30, ha='right')
-            p = os.path.join(output_dir, "03_bar_global.png")
-            fig.savefig(p, dpi=200, bbox_inches='tight')
-            plt.close(fig)
-            paths.append(p)
-        except Exception as e:
-            self.log(f"⚠ Erreur graphique indice global : {e}", "#f39c12")
-
-        # 4. Camembert durabilité
-        try:
-            fig, ax = plt.subplots(figsize=(7, 5))
-            ld, vd, cd = [], [], []
-            for lbl, cnt, col in [('Durables', stats.get('Durable', 0), '#27ae60'),
-                                   ('Transition', stats.get('Transition', 0), '#f39c12'),
-                                   ('Critiques', stats.get('Critique', 0), '#e74c3c')]:
-                if cnt > 0:
-                    ld.append(lbl)
-                    vd.append(cnt)
-                    cd.append(col)
-            if vd:
-                ax.pie(vd, labels=ld, colors=cd, autopct='%1.0f%%', startangle=90,
-                       textprops={'fontsize': 12})
-                ax.set_title('ÉTATS DE DURABILITÉ', fontsize=14, fontweight='bold')
-            p = os.path.join(output_dir, "04_pie_durabilite.png")
-            fig.savefig(p, dpi=200, bbox_inches='tight')
-            plt.close(fig)
-            paths.append(p)
-        except Exception as e:
-            self.log(f"⚠ Erreur graphique camembert durabilité : {e}", "#f39c12")
-
-        # 5. Radar par zone
-        for r in results:
-            try:
-                fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
-                cats = ['Économie', 'Environnement', 'Social']
-                vals = [r['norm_eco'], r['norm_env'], r['norm_soc']] + [r['norm_eco']]
-                angles = np.linspace(0, 2 * np.pi, 3, endpoint=False).tolist() + [0]
-                ax.fill(angles, vals, color='#27ae60', alpha=0.25)
-                ax.plot(angles, vals, color='#27ae60', linewidth=2, marker='o')
-                ax.set_thetagrids(np.degrees(angles[:-1]), cats)
-                ax.set_title(f"Profil — {r['name']}", fontsize=13, fontweight='bold')
-                safe_name = self.safe_filename(r['name'])
-                p = os.path.join(output_dir, f"05_radar_{safe_name}.png")
-                fig.savefig(p, dpi=200, bbox_inches='tight')
-                plt.close(fig)
-                paths.append(p)
-            except Exception as e:
-                self.log(f"⚠ Erreur radar {r['name']} : {e}", "#f39c12")
-
-        # 6. Détail sous-critères
+    def show_charts(self, charts):
+        """Ajoute des graphiques (descripteurs) à l'onglet Graphiques, en
+        remplaçant ceux de même nom, et affiche le premier ajouté.
+        """
+        if not charts:
+            return
+        names = {chart.name for chart in charts}
+        if self._run is not None:
+            for name in names:
+                self._run.discard(name)
+        self._charts = [c for c in self._charts if c.name not in names] + list(charts)
+        self.dlg.set_charts(self._charts, len(self._charts) - len(charts))
+        self.dlg.tabWidget.setCurrentIndex(4)
+
+    def save_chart(self, chart):
+        """Enregistre un graphique affiché (PNG haute résolution ou SVG)."""
+        if chart is None:
+            return
+        path, selected = QFileDialog.getSaveFileName(
+            self.dlg, "Exporter le graphique", f"{chart.name}.png",
+            "PNG (*.png);;SVG (*.svg)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += '.svg' if selected.startswith('SVG') else '.png'
         try:
-            fig, axes = plt.subplots(1, 3, figsize=(15, 5))
-            n_zones = len(results)
-            bar_height = 0.8 / max(n_zones, 1)
-            for idx, r in enumerate(results):
-                offset = (idx - n_zones / 2.0 + 0.5) * bar_height
-                y_eco = np.arange(len(SUB_NAMES_ECO)) + offset
-                y_env = np.arange(len(SUB_NAMES_ENV)) + offset
-                y_soc = np.arange(len(SUB_NAMES_SOC)) + offset
-                axes[0].barh(y_eco, r['subs_eco'], height=bar_height, label=r['name'], alpha=0.7)
-                axes[1].barh(y_env, r['subs_env'], height=bar_height, label=r['name'], alpha=0.7)
-                axes[2].barh(y_soc, r['subs_soc'], height=bar_height, label=r['name'], alpha=0.7)
-            for ax, title, names_list in zip(axes,
-                                              ['Économie', 'Environnement', 'Social'],
-                                              [SUB_NAMES_ECO, SUB_NAMES_ENV, SUB_NAMES_SOC]):
-                ax.set_yticks(np.arange(len(names_list)))
-                ax.set_yticklabels(names_list)
-                ax.set_title(title, fontweight='bold')
-                ax.axvline(x=1.0, color='red', linestyle='--', alpha=0.5)
-                ax.legend(fontsize=8)
-                ax.grid(axis='x', alpha=0.3)
-            fig.suptitle('Détail des sous-critères normalisés', fontsize=14, fontweight='bold')
-            plt.tight_layout()
-            p = os.path.join(output_dir, "06_detail_sous_criteres.png")
-            fig.savefig(p, dpi=200, bbox_inches='tight')
-            plt.close(fig)
-            paths.append(p)
+            if path.lower().endswith('.png') and chart in self._charts:
+                with open(path, 'wb') as fh:
+                    fh.write(self._chart_png(chart))
+                if self._run is not None:
+                    self._run.record_export(path)
+            else:
+                export_chart(chart, path)
         except Exception as e:
-            self.log(f"⚠ Erreur graphique sous-critères : {e}", "#f39c12")
-
-        return paths
+            QMessageBox.critical(self.dlg, "Erreur export", str(e))
+            return
+        self.log(f"  💾 Graphique exporté → {path}", "#2ecc71")
 
     # ==================== COMPARAISON ====================
     def compare_zones(self):
         if not self._results or len(self._results) < 2:
-            self.dlg.lbl_compare_result.setText("Lancez d'abord l'analyse.")
+            self.dlg.clear_compare("Lancez d'abord l'analyse.")
             return
         i1 = self.dlg.combo_zone1.currentIndex()
         i2 = self.dlg.combo_zone2.currentIndex()
         if i1 == i2:
-            self.dlg.lbl_compare_result.setText("Choisissez 2 zones différentes.")
+            self.dlg.clear_compare("Choisissez 2 zones différentes.")
             return
         if i1 < 0 or i1 >= len(self._results) or i2 < 0 or i2 >= len(self._results):
-            self.dlg.lbl_compare_result.setText("Index de zone invalide.")
+            self.dlg.clear_compare("Index de zone invalide.")
             return
         r1, r2 = self._results[i1], self._results[i2]
 
         try:
-            import matplotlib
-            matplotlib.use('Agg')
-            import matplotlib.pyplot as plt
-
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5),
-                                            subplot_kw=dict(polar=True))
-            cats = ['Économie', 'Environnement', 'Social']
-            angles = np.linspace(0, 2 * np.pi, 3, endpoint=False).tolist() + [0]
-
-            for ax, r, col in [(ax1, r1, '#3498db'), (ax2, r2, '#e74c3c')]:
-                vals = [r['norm_eco'], r['norm_env'], r['norm_soc']] + [r['norm_eco']]
-                ax.fill(angles, vals, alpha=0.25, color=col)
-                ax.plot(angles, vals, color=col, linewidth=2, marker='o')
-                ax.set_thetagrids(np.degrees(angles[:-1]), cats)
-                ax.set_title(f"{r['name']}\nId={r['id_global']:.3f} ({r['classe']})",
-                             fontsize=11, fontweight='bold')
-
-            fig.suptitle(f"Comparaison : {r1['name']}  VS  {r2['name']}",
-                         fontsize=14, fontweight='bold')
-            plt.tight_layout()
-            cmp_path = os.path.join(os.path.dirname(__file__), 'charts', 'comparaison.png')
-            os.makedirs(os.path.dirname(cmp_path), exist_ok=True)
-            fig.savefig(cmp_path, dpi=200, bbox_inches='tight')
-            plt.close(fig)
-
-            pixmap = QPixmap(cmp_path)
-            if not pixmap.isNull():
-                from qgis.PyQt.QtCore import Qt
-                display_w = max(self.dlg.lbl_compare_result.width(), 500)
-                display_h = max(self.dlg.lbl_compare_result.height(), 300)
-                scaled = pixmap.scaled(
-                    display_w - 10,
-                    display_h - 10,
-                    Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.dlg.lbl_compare_result.setPixmap(scaled)
+            if not matplotlib_available():
+                raise ImportError("matplotlib")
+            # Figure radar modèle, tracée à la taille de l'encadré
+            self.dlg.show_compare(compare_chart(r1, r2))
         except ImportError:
             self._compare_fallback_text(r1, r2)
         except Exception as e:
-            self.dlg.lbl_compare_result.setText(f"Erreur comparaison : {e}")
+            self.dlg.clear_compare(f"Erreur comparaison : {e}")
 
     def _compare_fallback_text(self, r1, r2):
         html = f"""<table style='width:100%; font-size:12px;'>
@@ -315,7 +201,7 @@ class SustainableZone:
             <td>{r2['id_global']:.3f}</td><td>{r1['id_global'] - r2['id_global']:+.3f}</td></tr>
         <tr><td>Classe</td><td>{r1['classe']}</td><td>{r2['classe']}</td><td></td></tr>
         </table>"""
-        self.dlg.lbl_compare_result.setText(html)
+        self.dlg.clear_compare(html)
 
     # ==================== EXPORT PDF ====================
     def export_pdf(self):
@@ -331,67 +217,86 @@ class SustainableZone:
             import matplotlib
             matplotlib.use('Agg')
             import matplotlib.pyplot as plt
-            from matplotlib.backends.backend_pdf import PdfPages
-
-            charts_dir = os.path.join(os.path.dirname(__file__), 'charts')
-            with PdfPages(path) as pdf:
-                # Page titre
-                fig, ax = plt.subplots(figsize=(11, 8.5))
-                ax.axis('off')
-                ax.text(0.5, 0.7, 'Rapport ADMC', fontsize=36, fontweight='bold',
-                        ha='center', color='#2c3e50')
-                ax.text(0.5, 0.6, 'Évaluation de Durabilité Touristique', fontsize=20,
-                        ha='center', color='#27ae60')
-                ax.text(0.5, 0.45, f'{len(self._results)} zones analysées', fontsize=16,
-                        ha='center', color='#7f8c8d')
-                w = self.dlg.get_weights()
-                ax.text(0.5, 0.35,
-                        f'Poids AHP : Éco={w[0]:.3f}  Env={w[1]:.3f}  Soc={w[2]:.3f}',
-                        fontsize=12, ha='center', color='#7f8c8d')
-                pdf.savefig(fig)
-                plt.close(fig)
-
-                # Page résultats tableau
-                fig, ax = plt.subplots(figsize=(11, 8.5))
-                ax.axis('off')
-                table_data = [['Zone', 'Éco', 'Env', 'Soc', 'Global', 'Classe', 'Conseil']]
-                for r in self._results:
-                    table_data.append([
-                        r['name'][:20], f"{r['norm_eco']:.2f}", f"{r['norm_env']:.2f}",
-                        f"{r['norm_soc']:.2f}", f"{r['id_global']:.3f}",
-                        r['classe'], r['conseil'][:30]
-                    ])
-
-                table = ax.table(cellText=table_data, loc='center', cellLoc='center')
-                table.auto_set_font_size(False)
-                table.set_fontsize(9)
-                table.scale(1, 1.8)
-                for j in range(7):
-                    table[0, j].set_facecolor('#2c3e50')
-                    table[0, j].set_text_props(color='white', fontweight='bold')
-                for i, r in enumerate(self._results, 1):
-                    c = ('#d5f5e3' if r['classe'] == 'Durable'
-                         else '#fdebd0' if r['classe'] == 'Transition'
-                         else '#fadbd8')
-                    for j in range(7):
-                        table[i, j].set_facecolor(c)
-                ax.set_title('Résultats détaillés', fontsize=16, fontweight='bold', pad=20)
-                pdf.savefig(fig)
-                plt.close(fig)
 
-                # Pages graphiques
-                if os.path.isdir(charts_dir):
-                    chart_files = sorted(
-                        [f for f in os.listdir(charts_dir) if f.endswith('.png')])
-                    for cf in chart_files:
-                        img_path = os.path.join(charts_dir, cf)
-                        fig, ax = plt.subplots(figsize=(11, 8.5))
-                        ax.axis('off')
-                        img = plt.imread(img_path)
-                        ax.imshow(img)
-                        pdf.savefig(fig)
-                        plt.close(fig)
+            report = PdfReport()
 
+            def add_figure(fig):
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format='pdf')
+                plt.close(fig)
+                report.add_pdf(buffer.getvalue())
+
+            # Page titre
+            fig, ax = plt.subplots(figsize=(11, 8.5))
+            ax.axis('off')
+            ax.text(0.5, 0.7, 'Rapport ADMC', fontsize=36, fontweight='bold',
+                    ha='center', color='#2c3e50')
+            ax.text(0.5, 0.6, 'Évaluation de Durabilité Touristique', fontsize=20,
+                    ha='center', color='#27ae60')
+            ax.text(0.5, 0.45, f'{len(self._results)} zones analysées', fontsize=16,
+                    ha='center', color='#7f8c8d')
+            w = self.dlg.get_weights()
+            ax.text(0.5, 0.35,
+                    f'Poids AHP : Éco={w[0]:.3f}  Env={w[1]:.3f}  Soc={w[2]:.3f}',
+                    fontsize=12, ha='center', color='#7f8c8d')
+            if self._run is not None:
+                ax.text(0.5, 0.27, f"Couche : {self._run.manifest['info']['layer']}"
+                        f" — analyse {self._run.run_id}", fontsize=10, ha='center',
+                        color='#95a5a6')
+            add_figure(fig)
+
+            # Page résultats tableau
+            fig, ax = plt.subplots(figsize=(11, 8.5))
+            ax.axis('off')
+            table_data = [['Zone', 'Éco', 'Env', 'Soc', 'Global', 'Classe', 'Conseil']]
+            for r in self._results:
+                table_data.append([
+                    r['name'][:20], f"{r['norm_eco']:.2f}", f"{r['norm_env']:.2f}",
+                    f"{r['norm_soc']:.2f}", f"{r['id_global']:.3f}",
+                    r['classe'], r['conseil'][:30]
+                ])
+
+            table = ax.table(cellText=table_data, loc='center', cellLoc='center')
+            table.auto_set_font_size(False)
+            table.set_fontsize(9)
+            table.scale(1, 1.8)
+            for j in range(7):
+                table[0, j].set_facecolor('#2c3e50')
+                table[0, j].set_text_props(color='white', fontweight='bold')
+            for i, r in enumerate(self._results, 1):
+                c = ('#d5f5e3' if r['classe'] == 'Durable'
+                     else '#fdebd0' if r['classe'] == 'Transition'
+                     else '#fadbd8')
+                for j in range(7):
+                    table[i, j].set_facecolor(c)
+            ax.set_title('Résultats détaillés', fontsize=16, fontweight='bold', pad=20)
+            add_figure(fig)
+
+            # Pages graphiques de l'analyse courante (dont l'atlas des
+            # radars) : tracées en pages PDF vectorielles par le pool de
+            # processus, puis seulement recopiées dans le rapport
+            charts = sorted(self._charts, key=lambda c: c.name)
+            raster_dpi = max(0, plugin_setting("pdf_raster_dpi", 0, int))
+
+            def progress(done):
+                self.dlg.progressBar.setValue(int(100 * done))
+                QCoreApplication.processEvents()
+
+            self.dlg.btn_export_pdf.setEnabled(False)
+            self.dlg.progressBar.setValue(0)
+            self.dlg.progressBar.setFormat("%p% - Tracé des graphiques du rapport...")
+            start = time.perf_counter()
+            pages = render_all(charts, plugin_setting("chart_workers", 0, int), raster_dpi,
+                               progress, fmt='pdf')
+            for chart, page in zip(charts, pages):
+                add_pdf_page(report, chart, page=page)
+            report.save(path)
+            self.dlg.progressBar.setFormat("100% - Rapport PDF exporté")
+            self.log(f"  📊 {len(charts)} graphiques tracés en "
+                     f"{time.perf_counter() - start:.1f} s", "#7f8c8d")
+
+            if self._run is not None:
+                self._run.record_export(path)
             self.log(f"  📄 PDF exporté → {path}", "#2ecc71")
             QMessageBox.information(self.dlg, "Succès",
                                     f"Rapport PDF exporté :\n{path}")
@@ -401,51 +306,86 @@ class SustainableZone:
                                  "matplotlib est requis pour l'export PDF.")
         except Exception as e:
             QMessageBox.critical(self.dlg, "Erreur PDF", str(e))
+        finally:
+            self.dlg.btn_export_pdf.setEnabled(True)
+
+    # ==================== ARTEFACTS D'ANALYSE ====================
+    def _new_run(self, layer, weights):
+        """Répertoire d'artefacts de l'analyse terminée (profil QGIS, sinon
+        dossier temporaire), décrit par son manifeste ; les analyses trop
+        anciennes ou au-delà du budget de taille sont supprimées.
+        """
+        info = {
+            'layer': layer.name(),
+            'layer_id': layer.id(),
+            'source': layer.publicSource(),
+            'features': layer.featureCount(),
+            'weights': [float(w) for w in weights],
+            'local_weights': {key: [float(w) for w in local]
+                              for key, local in self.dlg.get_local_weights().items()},
+        }
+        default_dir = os.path.join(QgsApplication.qgisSettingsDirPath(),
+                                   "SustainableZone", "runs")
+        for directory in (plugin_setting("runs_dir", default_dir, str),
+                          os.path.join(tempfile.gettempdir(), "SustainableZone", "runs")):
+            try:
+                run = RunArtifacts(directory, info)
+            except OSError:
+                continue
+            removed = prune_runs(
+                directory, plugin_setting("runs_max_mb", DEFAULT_RUNS_MB, int) * 1024 * 1024,
+                plugin_setting("runs_max_days", DEFAULT_RUNS_DAYS, int) * 86400,
+                keep=run.run_id)
+            if removed:
+                self.log(f"  🧹 {len(removed)} ancienne(s) analyse(s) supprimée(s)", "#7f8c8d")
+            return run
+        self.log("⚠ Aucun répertoire d'artefacts accessible.", "#f39c12")
+        return None
+
+    def _chart_png(self, chart):
+        """PNG d'export (CHART_DPI) d'un graphique de l'analyse courante,
+        rangé avec l'analyse : un nouvel export du même graphique reprend
+        cette image au lieu de la retracer (seul gain de ce rangement).
+        """
+        run = self._run
+        png = run.get(chart.name, CHART_DPI) if run is not None else None
+        if png is not None:
+            self.log(f"  ♻ {chart.name} repris de l'analyse {run.run_id}", "#7f8c8d")
+            return png
+        png = render_png(chart, CHART_DPI)
+        if run is not None:
+            try:
+                run.put(chart.name, png, CHART_DPI)
+            except OSError:
+                pass
+        return png
 
     # ==================== VALIDATION CHAMPS ====================
     def validate_fields(self, ui):
-        missing = []
-        field_labels = {
-            'pib': 'PIB', 'infra': 'Infrastructures', 'resto': 'Restaurants',
-            'tour': 'Touristes', 'iqa': 'IQA', 'ress': 'Ressources',
-            'bio': 'Biodiversité', 'secu': 'Sécurité', 'sante': 'Santé',
-            'pauv': 'Pauvreté', 'pmr': 'PMR'
-        }
-        for key, label in field_labels.items():
-            if not ui.get(key):
-                missing.append(label)
-        return missing
+        return [ind['name'] for ind in CRITERIA.indicators if not ui.get(ind['key'])]
 
     # ==================== LANCER L'ANALYSE ====================
     def launch_analysis(self):
-        """Exécute l'analyse SANS fermer la fenêtre."""
+        """Exécute l'analyse SANS fermer la fenêtre.
+        Le calcul tourne dans une QgsTask ; la fenêtre et la carte restent utilisables.
+        """
+        if self._task is not None:
+            return
         layer = self.dlg.mMapLayerComboBox.currentLayer()
         if not layer:
             QMessageBox.warning(self.dlg, "Erreur", "Sélectionnez une couche.")
             return
 
         self.dlg.progressBar.setValue(0)
-        self.dlg.progressBar.setFormat("Analyse en cours...")
-        self.dlg.textBrowser_results.clear()
+        self.dlg.progressBar.setFormat("%p% - Analyse en cours...")
+        self._console.clear()
         self.log(">> DÉMARRAGE ADMC...", "#3498db", True)
 
         weights = self.dlg.get_weights()
         w_eco, w_env, w_soc = weights[0], weights[1], weights[2]
         self.log(f"  Poids AHP : Éco={w_eco:.3f} Env={w_env:.3f} Soc={w_soc:.3f}", "#9b59b6")
 
-        ui = {
-            'pib': self.dlg.mField_PIB.currentField(),
-            'infra': self.dlg.mField_Infra.currentField(),
-            'resto': self.dlg.mField_Resto.currentField(),
-            'tour': self.dlg.mField_Touristes.currentField(),
-            'iqa': self.dlg.mField_IQA.currentField(),
-            'ress': self.dlg.mField_Ress.currentField(),
-            'bio': self.dlg.mField_Bio.currentField(),
-            'secu': self.dlg.mField_Secu.currentField(),
-            'sante': self.dlg.mField_Sante.currentField(),
-            'pauv': self.dlg.mField_Pauvrete.currentField(),
-            'pmr': self.dlg.mField_PMR.currentField(),
-        }
+        ui = self.dlg.get_field_mapping()
 
         missing = self.validate_fields(ui)
         if missing:
@@ -456,57 +396,259 @@ class SustainableZone:
                 + "\n\nVeuillez les configurer dans les onglets correspondants.")
             return
 
-        layer.startEditing()
-        res_fields = [
-            QgsField("Score_Eco", QVariant.Double),
-            QgsField("Score_Env", QVariant.Double),
-            QgsField("Score_Soc", QVariant.Double),
-            QgsField("Id_Global", QVariant.Double),
-            QgsField("Classe_ADMC", QVariant.String),
-            QgsField("Conseil", QVariant.String)
-        ]
-        for rf in res_fields:
-            if layer.fields().indexOf(rf.name()) == -1:
-                layer.dataProvider().addAttributes([rf])
-        layer.updateFields()
-
-        feats = list(layer.getFeatures())
-        count = len(feats)
-        if count == 0:
-            self.log(">> Couche vide.", "#e74c3c", True)
-            layer.rollBack()
-            return
+        self._drop_preview()
+        self._cache = None
+        ensure_result_fields(layer)
+        request = scoring_request(layer, ui.values())
 
         use_sub_ahp = self.dlg.chk_sub_ahp.isChecked()
         if use_sub_ahp:
             sub_w_eco, sub_w_env, sub_w_soc = self.dlg.get_sub_weights()
             self.log("  AHP détaillé sous-critères : activé", "#9b59b6")
         else:
-            sub_w_eco = np.ones(4) / 4.0
-            sub_w_env = np.ones(3) / 3.0
-            sub_w_soc = np.ones(4) / 4.0
+            sub_w_eco, sub_w_env, sub_w_soc = uniform_sub_weights()
+
+        sub_weights = (sub_w_eco, sub_w_env, sub_w_soc)
+        n_features = layer.featureCount()
+        threshold = plugin_setting("streaming_threshold", DEFAULT_STREAMING_THRESHOLD, int)
+        streaming = n_features < 0 or n_features > threshold
+
+        if not self.legacy_scoring:
+            key = self._results_key(layer, ui, weights, sub_weights, streaming)
+            if key is not None and self._restore_cached(layer, key, weights):
+                return
+
+        if self.legacy_scoring:
+            # Entités lues sans géométrie ni attributs inutiles : seuls les
+            # champs résultats sont écrits (jamais updateFeature)
+            writer = ResultWriter(layer)
+            writer.begin()
+            try:
+                results, stats = self._score_features_legacy(
+                    writer, list(layer.getFeatures(request)), ui, weights, sub_weights)
+                if results:
+                    writer.commit()
+                else:
+                    writer.rollback()
+            except Exception:
+                writer.rollback()
+                raise
+            self._finish_analysis(layer, ResultsStore.from_records(results), stats, weights)
+            return
+
+        log_file = None
+        if plugin_setting("log_to_file", False, bool):
+            log_file = plugin_setting("log_file", DEFAULT_LOG_FILE, str)
+        try:
+            zone_log = ZoneLog(n_features,
+                               plugin_setting("log_zone_lines", DEFAULT_ZONE_LINES, int),
+                               log_file)
+        except OSError as e:
+            self.log(f"⚠ Journal sur disque indisponible : {e}", "#f39c12")
+            zone_log = ZoneLog(n_features,
+                               plugin_setting("log_zone_lines", DEFAULT_ZONE_LINES, int))
+
+        task = AnalysisTask(layer, request, ui, weights, sub_weights, streaming, zone_log)
+        task.message.connect(self.log)
+        task.progressChanged.connect(lambda p: self.dlg.progressBar.setValue(int(p)))
+        task.analysisFinished.connect(lambda ok: self._on_analysis_finished(task, ok))
+        self._task = task
+        self.dlg.set_running(True)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_analysis_finished(self, task, ok):
+        """Reçoit les résultats de la tâche de fond (thread principal)."""
+        if task is not self._task:
+            return
+        self._task = None
+        self.dlg.set_running(False)
+        if not ok:
+            if task.error:
+                self.log(f">> Échec de l'analyse : {task.error}", "#e74c3c", True)
+                self.dlg.progressBar.setFormat("Échec")
+            else:
+                self.log(">> Analyse annulée.", "#e74c3c", True)
+                self.dlg.progressBar.setFormat("Annulée")
+            return
+        if not task.bulk:
+            self.log("  Écriture via le tampon d'édition (fournisseur sans écriture groupée)",
+                     "#9b59b6")
+        # Hors mode flux, les résultats couvrent toutes les zones : ils servent
+        # aussi de base au recalcul instantané
+        self._cache = None if task.streaming else task.results
+        self._cache_layer_id = task.layer.id()
+        if self._cache is None:
+            self.log("  Recalcul instantané des poids indisponible en mode flux", "#7f8c8d")
+        if self._finish_analysis(task.layer, task.results, task.stats, task.weights,
+                                 task.aggregates):
+            self._store_cached(task)
+
+    def cancel_analysis(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _finish_analysis(self, layer, results, stats, weights, aggregates=None):
+        """Style, graphiques, comparaison et bilan une fois les scores écrits.
+        Les graphiques ne sont que décrits ici : chacun est tracé quand
+        l'onglet Graphiques l'affiche. Retourne False si la couche est vide.
+        """
+        if sum(stats.values()) == 0:
+            self.log(">> Couche vide.", "#e74c3c", True)
+            self.dlg.progressBar.setFormat("En attente...")
+            return False
+
+        self.apply_style(layer)
+
+        self._results = results
+        try:
+            self._run = self._new_run(layer, weights)
+        except Exception as e:
+            # Sans répertoire d'artefacts, les exports retracent les graphiques
+            self._run = None
+            self.log(f"⚠ Artefacts d'analyse indisponibles : {e}", "#f39c12")
+
+        # Graphiques (descripteurs, tracés à l'affichage)
+        if matplotlib_available():
+            atlas_sort = plugin_setting("atlas_sort", "id_global", str)
+            if atlas_sort not in ATLAS_SORTS:
+                self.log(f"⚠ Réglage atlas_sort « {atlas_sort} » inconnu "
+                         f"({', '.join(ATLAS_SORTS)}) : tri par id_global.", "#f39c12")
+                atlas_sort = 'id_global'
+            self._charts = analysis_charts(
+                results, stats, weights, aggregates,
+                atlas_page=max(0, plugin_setting("atlas_page_size", DEFAULT_ATLAS_PAGE, int)),
+                atlas_sort=atlas_sort)
+            self.log(f"  📊 {len(self._charts)} graphiques prêts (tracés à l'affichage)",
+                     "#2ecc71")
+        else:
+            self._charts = []
+            self.log("⚠ matplotlib indisponible.", "#f39c12")
+        self.dlg.set_charts(self._charts)
 
+        # Comparaison
+        self.dlg.populate_compare_combos(results)
+
+        # Bilan
+        total = sum(stats.values())
+        self.log(f"""
+        <br><b style='color:#3498db'>━━━ BILAN ━━━</b><br>
+        <table><tr><td style='color:#27ae60'>✔ Durables:</td><td><b>{stats['Durable']}</b></td></tr>
+        <tr><td style='color:#f39c12'>⚠ Transition:</td><td><b>{stats['Transition']}</b></td></tr>
+        <tr><td style='color:#e74c3c'>✘ Critiques:</td><td><b>{stats['Critique']}</b></td></tr></table>
+        <br><i>→ Onglet Graphiques pour visualiser | Onglet Comparer pour comparer 2 zones | Bouton PDF pour exporter</i>""")
+
+        self.dlg.progressBar.setValue(100)
+        self.dlg.progressBar.setFormat("100% - Terminée")
+        self._console.flush()
+        self.dlg.tabWidget.setCurrentIndex(4)  # Aller à l'onglet graphiques
+        self.dlg.set_simulation_available(self._cache is not None)
+        self.iface.messageBar().pushMessage(
+            "ADMC", f"{total} zones analysées", level=Qgis.Success)
+        return True
+
+    # ==================== CACHE DES RÉSULTATS ====================
+    def _results_cache(self):
+        if not plugin_setting("results_cache", True, bool):
+            return None
+        default_dir = os.path.join(QgsApplication.qgisSettingsDirPath(),
+                                   "SustainableZone", "cache")
+        return ResultsCache(plugin_setting("cache_dir", default_dir, str),
+                            plugin_setting("cache_max_mb", DEFAULT_CACHE_MB, int) * 1024 * 1024)
+
+    def _results_key(self, layer, ui, weights, sub_weights, streaming):
+        """Clé de cache de l'analyse, ou None si la source n'est pas
+        identifiable (couche mémoire : modifications non détectables).
+
+        Source fichier : date et taille du fichier. Autres sources (PostGIS,
+        WFS...) : empreinte des valeurs lues (indicateurs, nom, résultats),
+        au-delà de cache_fingerprint_max entités, pas de cache. Modifications
+        en attente dans le tampon d'édition : pas de cache (elles ne sont
+        pas dans la source).
+        """
+        provider = layer.providerType()
+        if provider == 'memory' or (layer.isEditable() and layer.isModified()):
+            return None
+        decoded = QgsProviderRegistry.instance().decodeUri(provider, layer.source())
+        state = source_state(decoded.get('path', ''))
+        if not state:
+            state = self._values_fingerprint(layer, ui)
+            if state is None:
+                return None
+        top_k = plugin_setting("stream_top_k", DEFAULT_TOP_K, int) if streaming else 0
+        return cache_key(provider, layer.source(), state,
+                         layer.featureCount(), ui, CRITERIA.signature(), sub_weights,
+                         weights, top_k)
+
+    def _values_fingerprint(self, layer, ui):
+        """Empreinte des attributs lus par l'analyse et des champs résultats
+        d'une source sans fichier, ou None si elle est trop grande.
+        """
+        limit = plugin_setting("cache_fingerprint_max", DEFAULT_FINGERPRINT_MAX, int)
+        if layer.featureCount() < 0 or layer.featureCount() > limit:
+            return None
+        names = list(ui.values()) + [name for name, _ in RESULT_FIELDS]
+        request = scoring_request(layer, names)
+        return rows_fingerprint((f.id(), f.attributes())
+                                for f in layer.getFeatures(request))
+
+    def _restore_cached(self, layer, key, weights):
+        """Restaure résultats, combos et graphiques d'une analyse en cache."""
+        cache = self._results_cache()
+        if cache is None:
+            return False
+        start = time.perf_counter()
+        entry = cache.get(key)
+        if entry is None:
+            return False
+        try:
+            store = ResultsStore.load(entry['results'])
+        except (OSError, ValueError, KeyError):
+            cache.discard(key)
+            return False
+        self._cache = None if entry['streaming'] else store
+        self._cache_layer_id = layer.id()
+        self.log(f"  ♻ Résultats restaurés depuis le cache "
+                 f"({(time.perf_counter() - start) * 1000:.0f} ms)", "#2ecc71")
+        self._finish_analysis(layer, store, entry['stats'], weights)
+        return True
+
+    def _store_cached(self, task):
+        """Range l'analyse terminée dans le cache. La clé est calculée après
+        l'écriture des scores : elle décrit la source telle qu'elle est
+        maintenant, champs résultats compris.
+        """
+        cache = self._results_cache()
+        if cache is None:
+            return
+        key = self._results_key(task.layer, task.ui, task.weights, task.sub_weights,
+                                task.streaming)
+        if key is None:
+            return
+        try:
+            # Les graphiques se retracent depuis les résultats : rien à ranger
+            cache.put(key, task.results, task.stats, task.streaming)
+        except (OSError, ValueError) as e:
+            self.log(f"⚠ Cache des résultats indisponible : {e}", "#f39c12")
+
+    # ==================== CALCUL DES SCORES ====================
+    def _score_features_legacy(self, writer, feats, ui, weights, sub_weights):
+        """Ancienne boucle entité par entité.
+        Conservée une version pour vérifier les résultats du moteur vectorisé
+        (activer avec ``legacy_scoring = True``) ; à retirer ensuite.
+        Les champs résultats sont écrits par ``writer`` (ResultWriter).
+        """
+        w_eco, w_env, w_soc = weights[0], weights[1], weights[2]
+        sub_w_eco, sub_w_env, sub_w_soc = sub_weights
+        count = len(feats)
         stats = {'Durable': 0, 'Transition': 0, 'Critique': 0}
         results = []
 
         for i, f in enumerate(feats):
-            s_eco = [
-                self.norm_ratio(self.safe_field_value(f, ui['pib']), NORM_PIB),
-                self.norm_ratio(self.safe_field_value(f, ui['infra']), NORM_INFRA),
-                self.norm_ratio(self.safe_field_value(f, ui['resto']), NORM_RESTO),
-                self.norm_ratio(self.safe_field_value(f, ui['tour']), NORM_TOUR)
-            ]
-            s_env = [
-                self.norm_ratio(self.safe_field_value(f, ui['iqa']), NORM_IQA),
-                self.norm_ratio(self.safe_field_value(f, ui['ress']), NORM_RESS),
-                self.norm_ratio(self.safe_field_value(f, ui['bio']), NORM_BIO)
-            ]
-            s_soc = [
-                self.norm_ratio(self.safe_field_value(f, ui['secu']), NORM_SECU),
-                self.norm_ratio(self.safe_field_value(f, ui['sante']), NORM_SANTE),
-                self.norm_ratio(self.safe_field_value(f, ui['pauv']), NORM_PAUV, invert=True),
-                self.norm_ratio(self.safe_field_value(f, ui['pmr']), NORM_PMR)
-            ]
+            s_eco, s_env, s_soc = (
+                [self.norm_ratio(self.safe_field_value(f, ui[ind['key']]), ind['norm'],
+                                 invert=ind['invert'])
+                 for ind in CRITERIA.indicators_of(dim)]
+                for dim in ('eco', 'env', 'soc'))
 
             norm_eco = np.dot(s_eco, sub_w_eco)
             norm_env = np.dot(s_env, sub_w_env)
@@ -535,14 +677,10 @@ class SustainableZone:
                 "#2ecc71" if classe == "Durable"
                 else "#f39c12" if classe == "Transition"
                 else "#e74c3c")
+            QCoreApplication.processEvents()
 
-            f['Score_Eco'] = float(ws_eco)
-            f['Score_Env'] = float(ws_env)
-            f['Score_Soc'] = float(ws_soc)
-            f['Id_Global'] = float(id_global)
-            f['Classe_ADMC'] = classe
-            f['Conseil'] = conseil
-            layer.updateFeature(f)
+            writer.add(f.id(), (float(ws_eco), float(ws_env), float(ws_soc),
+                                float(id_global), classe, conseil))
 
             results.append({
                 'name': str(fname),
@@ -553,54 +691,305 @@ class SustainableZone:
             })
             self.dlg.progressBar.setValue(int(((i + 1) / count) * 100))
 
-        layer.commitChanges()
-        self.apply_style(layer)
+        return results, stats
 
-        self._results = results
+    # ==================== RECALCUL INSTANTANÉ ====================
+    def _cache_layer(self):
+        if self._cache is None or not self._cache_layer_id:
+            return None
+        return QgsProject.instance().mapLayer(self._cache_layer_id)
 
-        # Graphiques
-        charts_dir = os.path.join(os.path.dirname(__file__), 'charts')
-        graph_paths = self.generate_charts(results, stats, w_eco, w_env, w_soc, charts_dir)
-        self.dlg.set_graph_paths(graph_paths)
-        self.log(f"  📊 {len(graph_paths)} graphiques générés", "#2ecc71")
+    def preview_rescore(self):
+        """Recalcule les scores en mémoire avec les poids AHP courants et
+        met à jour la carte, sans écrire dans la source.
+        """
+        layer = self._cache_layer()
+        if layer is None or self._task is not None:
+            return
+        weights = self.dlg.get_weights()
+        scores = self._cache.rescore(self.dlg.get_sub_weights(), weights)
+        self._preview = (weights, scores)
+        set_preview(layer.id(), self._cache.fids, scores['id_global'])
+        self.apply_style(layer, PREVIEW_EXPRESSION)
+        self.dlg.set_preview_pending(True)
+
+        counts = np.bincount(scores['classes'], minlength=len(CLASS_LABELS))
+        self.log(f"  Aperçu : ✔ {counts[2]} durables | ⚠ {counts[1]} transition | "
+                 f"✘ {counts[0]} critiques — non enregistré", "#9b59b6")
+
+    def apply_preview(self):
+        """Écrit dans la source les scores de l'aperçu (confirmation)."""
+        layer = self._cache_layer()
+        if layer is None or self._preview is None or self._task is not None:
+            return
+        weights, scores = self._preview
+        task = WriteScoresTask(layer, self._cache.fids, scores)
+        task.progressChanged.connect(lambda p: self.dlg.progressBar.setValue(int(p)))
+        task.analysisFinished.connect(
+            lambda ok: self._on_preview_written(task, ok, weights, scores))
+        self._task = task
+        self.dlg.progressBar.setFormat("%p% - Écriture des scores...")
+        self.dlg.set_running(True)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_preview_written(self, task, ok, weights, scores):
+        if task is not self._task:
+            return
+        self._task = None
+        self.dlg.set_running(False)
+        if not ok:
+            self.log(f">> Écriture annulée : {task.error or 'interrompue'}", "#e74c3c", True)
+            self.dlg.set_preview_pending(True)
+            return
+        self._drop_preview()
+        self._cache = self._cache.with_scores(scores)
+        self._finish_analysis(task.layer, self._cache, self._cache.stats(), weights)
+
+    def _drop_preview(self):
+        """Abandonne l'aperçu et rend à la carte les scores enregistrés."""
+        if self._preview_timer is not None:
+            self._preview_timer.stop()
+        if self._preview is not None:
+            layer = self._cache_layer()
+            if layer is not None:
+                self.apply_style(layer)
+        if self._cache_layer_id:
+            clear_preview(self._cache_layer_id)
+        self._preview = None
+        if self.dlg is not None:
+            self.dlg.set_preview_pending(False)
+
+    # ==================== AHP DE GROUPE ====================
+    def import_expert_judgments(self):
+        """Agrège un fichier de formulaires d'experts (CSV/JSON) et reporte
+        les jugements de groupe dans les spinboxes de chaque niveau renseigné.
+        """
+        path, _ = QFileDialog.getOpenFileName(
+            self.dlg, "Importer des avis d'experts", "",
+            "Formulaires d'experts (*.csv *.json);;CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+        method = self.dlg.get_group_method()
+        try:
+            experts, levels, skipped = group_ahp(path, method,
+                                                 self.dlg.chk_drop_inconsistent.isChecked())
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            QMessageBox.warning(self.dlg, "Erreur", f"Fichier d'experts illisible :\n{e}")
+            return
 
-        # Comparaison
-        self.dlg.populate_compare_combos(results)
+        self.log(f">> AHP de groupe ({method.upper()}) : {len(experts)} formulaires "
+                 f"← {os.path.basename(path)}", "#3498db", True)
+        for level, res in levels.items():
+            names = JUDGMENT_NAMES[level]
+            expert_cr = res['expert_cr']
+            answered = ~np.isnan(expert_cr)
+            weights = " | ".join(f"{n}: {w:.3f}" for n, w in zip(names, res['weights']))
+            self.log(f"  {' / '.join(names)} : {int(res['kept'].sum())}/{int(answered.sum())} "
+                     f"experts retenus, CR médian {np.nanmedian(expert_cr):.3f}, "
+                     f"CR du groupe {res['cr']:.3f}", "#9b59b6")
+            self.log(f"    {weights}", "#9b59b6")
+            worst = np.argsort(-np.nan_to_num(expert_cr, nan=-1.0))[:3]
+            worst = [i for i in worst if answered[i] and expert_cr[i] >= 0.10]
+            if worst:
+                self.log("    Moins cohérents : " + ", ".join(
+                    f"{experts[i]} (CR {expert_cr[i]:.2f})" for i in worst), "#f39c12")
+            if np.any((res['judgments'] < 1 / 9) | (res['judgments'] > 9)):
+                self.log("    ⚠ Jugements hors échelle ramenés à 1/9 … 9", "#f39c12")
+            self.dlg.set_judgments(level, np.clip(res['judgments'], 1 / 9, 9.0))
+        for level, reason in skipped.items():
+            self.log(f"  {' / '.join(JUDGMENT_NAMES[level])} : non importé ({reason})",
+                     "#f39c12")
+        self._console.flush()
+
+    # ==================== INCERTITUDE DES POIDS ====================
+    def run_uncertainty(self):
+        """Simulation Monte-Carlo des jugements par paires des dimensions,
+        sur les scores normalisés de la dernière analyse.
+        """
+        layer = self._cache_layer()
+        if layer is None or self._task is not None:
+            return
+        ensure_result_fields(layer, UNCERTAINTY_FIELDS)
+        dims = self._cache.subs @ sub_weight_matrix(*self.dlg.get_sub_weights())
+        draws = max(1, plugin_setting("mc_draws", DEFAULT_DRAWS, int))
+        spread = plugin_setting("mc_spread", DEFAULT_SPREAD, float)
+        self.log(f">> Incertitude des poids : {draws} tirages, ±{spread:g} pas de Saaty",
+                 "#3498db", True)
+
+        task = UncertaintyTask(layer, self._cache.fids, dims, self.dlg.get_judgments(),
+                               draws, spread)
+        task.progressChanged.connect(lambda p: self.dlg.progressBar.setValue(int(p)))
+        task.analysisFinished.connect(lambda ok: self._on_uncertainty_finished(task, ok))
+        self._task = task
+        self.dlg.progressBar.setFormat("%p% - Simulation Monte-Carlo...")
+        self.dlg.set_running(True)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_uncertainty_finished(self, task, ok):
+        if task is not self._task:
+            return
+        self._task = None
+        self.dlg.set_running(False)
+        if not ok:
+            self.log(f">> Simulation interrompue : {task.error or 'annulée'}", "#e74c3c", True)
+            self.dlg.progressBar.setFormat("Annulée")
+            return
+        mc = task.result
+        stability = mc['p_class'].max(axis=1)
+        stable = int(np.count_nonzero(stability >= 0.9))
+        self.log(f"  🎲 {stable}/{len(stability)} zones gardent leur classe dans ≥ 90 % "
+                 f"des tirages ({mc['inconsistent']:.0%} des tirages avec CR ≥ 0.10)",
+                 "#9b59b6")
+        if mc['rank_draws'] < mc['draws']:
+            self.log(f"  Rangs MC_Rg_Min / MC_Rg_Max sur les {mc['rank_draws']} premiers "
+                     f"tirages (sur {mc['draws']})", "#7f8c8d")
+        self.log("  Champs écrits : " + ", ".join(name for name, _ in UNCERTAINTY_FIELDS),
+                 "#7f8c8d")
+
+        if matplotlib_available():
+            self.show_charts([uncertainty_chart(self._cache, mc)])
+        self.dlg.progressBar.setValue(100)
+        self.dlg.progressBar.setFormat("100% - Simulation terminée")
+        self._console.flush()
+
+    # ==================== SCORES DES NŒUDS ====================
+    def run_node_scores(self):
+        """Scores des nœuds intermédiaires de l'arbre des critères (un seul
+        produit sur les sous-critères normalisés de la dernière analyse),
+        écrits dans des champs N_<clé> et tracés.
+        """
+        layer = self._cache_layer()
+        if layer is None or self._task is not None:
+            return
+        nodes = list(CRITERIA.groups)
+        fields = node_fields(nodes)
+        ensure_result_fields(layer, fields)
+        scores = TREE.node_scores(self._cache.subs, self.dlg.get_local_weights(), nodes)
+        self.log(f">> Scores des nœuds : {len(nodes)} nœuds", "#3498db", True)
+
+        task = NodeScoresTask(layer, self._cache.fids, scores, fields)
+        task.progressChanged.connect(lambda p: self.dlg.progressBar.setValue(int(p)))
+        task.analysisFinished.connect(
+            lambda ok: self._on_node_scores_finished(task, ok, scores))
+        self._task = task
+        self.dlg.progressBar.setFormat("%p% - Écriture des scores des nœuds...")
+        self.dlg.set_running(True)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_node_scores_finished(self, task, ok, scores):
+        if task is not self._task:
+            return
+        self._task = None
+        self.dlg.set_running(False)
+        if not ok:
+            self.log(f">> Écriture interrompue : {task.error or 'annulée'}", "#e74c3c", True)
+            self.dlg.progressBar.setFormat("Annulée")
+            return
+        self.log("  Champs écrits : " + ", ".join(name for name, _ in task.fields), "#7f8c8d")
 
-        # Bilan
-        total = sum(stats.values())
-        self.log(f"""
-        <br><b style='color:#3498db'>━━━ BILAN ━━━</b><br>
-        <table><tr><td style='color:#27ae60'>✔ Durables:</td><td><b>{stats['Durable']}</b></td></tr>
-        <tr><td style='color:#f39c12'>⚠ Transition:</td><td><b>{stats['Transition']}</b></td></tr>
-        <tr><td style='color:#e74c3c'>✘ Critiques:</td><td><b>{stats['Critique']}</b></td></tr></table>
-        <br><i>→ Onglet Graphiques pour visualiser | Onglet Comparer pour comparer 2 zones | Bouton PDF pour exporter</i>""")
+        if matplotlib_available():
+            self.show_charts([node_chart(scores)])
+        self.dlg.progressBar.setValue(100)
+        self.dlg.progressBar.setFormat("100% - Scores des nœuds écrits")
+        self._console.flush()
+
+    # ==================== SENSIBILITÉ DES JUGEMENTS ====================
+    def run_sensitivity(self):
+        """Balayage un-à-un de chaque jugement (dimensions et sous-critères)
+        sur les sous-critères normalisés de la dernière analyse.
+        """
+        if self._cache is None or self._task is not None:
+            return
+        steps = max(3, plugin_setting("sweep_steps", DEFAULT_SWEEP_STEPS, int))
+        self.log(f">> Sensibilité : balayage de chaque jugement sur 1/9 … 9 ({steps} pas)",
+                 "#3498db", True)
+        task = SensitivityTask(self._cache.subs, self.dlg.get_judgments(),
+                               self.dlg.get_sub_judgments(), steps)
+        task.progressChanged.connect(lambda p: self.dlg.progressBar.setValue(int(p)))
+        task.analysisFinished.connect(lambda ok: self._on_sensitivity_finished(task, ok))
+        self._task = task
+        self.dlg.progressBar.setFormat("%p% - Balayage des jugements...")
+        self.dlg.set_running(True)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_sensitivity_finished(self, task, ok):
+        if task is not self._task:
+            return
+        self._task = None
+        self.dlg.set_running(False)
+        if not ok:
+            self.log(f">> Balayage interrompu : {task.error or 'annulé'}", "#e74c3c", True)
+            self.dlg.progressBar.setFormat("Annulée")
+            return
 
+        rows = []
+        for sweep in task.sweeps:
+            names = JUDGMENT_NAMES[sweep['group']]
+            i, j = sweep['pair']
+            rows.append((f"{names[i]} / {names[j]}", sweep['current'],
+                         critical_thresholds(sweep)))
+        ranked = sorted(rows, key=lambda r: -(r[2]['max_down'] + r[2]['max_up']))
+        html = ("<table><tr><td><b>Jugement</b></td><td><b>Actuel</b></td>"
+                "<td><b>Seuil bas</b></td><td><b>Seuil haut</b></td></tr>")
+        for label, current, t in ranked[:5]:
+            low = '—' if t['lower'] is None else f"{t['lower']:.2f}"
+            high = '—' if t['upper'] is None else f"{t['upper']:.2f}"
+            html += (f"<tr><td>{label}</td><td>{current:.2f}</td>"
+                     f"<td>{low}</td><td>{high}</td></tr>")
+        self.log("  Jugements les plus sensibles :" + html + "</table>", "#9b59b6")
+
+        if matplotlib_available():
+            self.show_charts(sensitivity_charts(rows))
         self.dlg.progressBar.setValue(100)
-        self.dlg.progressBar.setFormat("100% - Terminée")
-        self.dlg.tabWidget.setCurrentIndex(4)  # Aller à l'onglet graphiques
-        self.iface.messageBar().pushMessage(
-            "ADMC", f"{total} zones analysées", level=Qgis.Success)
+        self.dlg.progressBar.setFormat("100% - Balayage terminé")
+        self._console.flush()
 
     # ==================== MOTEUR PRINCIPAL ====================
     def run(self):
         """Ouvre la fenêtre et connecte le bouton OK à l'analyse."""
         # Recréer le dialogue à chaque ouverture pour éviter les états résiduels
+        self.cancel_analysis()
+        self._task = None
+        # RI simulés (matrices de plus de 10 critères) conservés entre sessions
+        set_random_index_cache(os.path.join(QgsApplication.qgisSettingsDirPath(),
+                                            "SustainableZone", "random_index.json"))
         self.dlg = SustainableZoneDialog(self.iface.mainWindow())
+        self._console = ConsoleLog(self.dlg.textBrowser_results,
+                                   plugin_setting("log_flush_ms", DEFAULT_FLUSH_MS, int))
 
         # Connecter le bouton OK à l'analyse (PAS à accept/fermer)
         self.dlg.button_box.accepted.connect(self.launch_analysis)
 
         # Connecter les autres boutons
         self.dlg.btn_compare.clicked.connect(self.compare_zones)
+        self.dlg.btn_graph_export.clicked.connect(
+            lambda: self.save_chart(self.dlg.current_chart()))
+        self.dlg.btn_compare_export.clicked.connect(
+            lambda: self.save_chart(self.dlg.current_compare()))
         self.dlg.btn_export_pdf.clicked.connect(self.export_pdf)
+        self.dlg.btn_cancel_analysis.clicked.connect(self.cancel_analysis)
+        self.dlg.btn_apply_weights.clicked.connect(self.apply_preview)
+        self.dlg.btn_monte_carlo.clicked.connect(self.run_uncertainty)
+        self.dlg.btn_sensitivity.clicked.connect(self.run_sensitivity)
+        self.dlg.btn_node_scores.clicked.connect(self.run_node_scores)
+        self.dlg.btn_import_experts.clicked.connect(self.import_expert_judgments)
+
+        # Recalcul instantané quand les poids AHP changent (anti-rebond)
+        self._preview_timer = QTimer(self.dlg)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(plugin_setting("preview_delay_ms", 300, int))
+        self._preview_timer.timeout.connect(self.preview_rescore)
+        self.dlg.weightsChanged.connect(self._preview_timer.start)
 
         self._results = []
+        self._charts = []
+        self._drop_preview()
+        self._cache = None
 
         # show() au lieu de exec_() : la fenêtre reste ouverte
         self.dlg.show()
 
-    def apply_style(self, layer):
+    def apply_style(self, layer, attribute="Id_Global"):
         ranges = [
             QgsRendererRange(0.0, 0.5,
                              QgsSymbol.defaultSymbol(layer.geometryType()), "Critique"),
@@ -612,7 +1001,7 @@ class SustainableZone:
         ranges[0].symbol().setColor(QColor("#e74c3c"))
         ranges[1].symbol().setColor(QColor("#f39c12"))
         ranges[2].symbol().setColor(QColor("#27ae60"))
-        renderer = QgsGraduatedSymbolRenderer("Id_Global", ranges)
+        renderer = QgsGraduatedSymbolRenderer(attribute, ranges)
         layer.setRenderer(renderer)
         layer.triggerRepaint()
         self.iface.layerTreeView().refreshLayerSymbology(layer.id())
\ No newline at end of file
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Processus d'Analyse Hiérarchique (AHP)
+ Poids (moyenne géométrique ou vecteur propre) et ratio de cohérence,
+ pour une matrice ou une pile de matrices, sans dépendance QGIS/Qt.
+ ***************************************************************************/
+"""
+import json
+import os
+
+import numpy as np
+
+# RI (Random Index) pour matrices de taille n
+RI_TABLE = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12,
+            6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+
+# Au-delà de la table : RI simulé sur des matrices réciproques aléatoires
+# (jugements tirés uniformément sur l'échelle 1/9 … 9), conservé en mémoire
+# et, si défini, dans un fichier JSON
+RI_SAMPLES = 20000
+RI_SEED = 0
+RI_CHUNK = 2000
+_simulated_ri = {}
+_ri_cache_file = None
+
+# Seuil usuel de Saaty : au-delà, la matrice est jugée incohérente
+CR_THRESHOLD = 0.10
+
+# Bornes de l'échelle de Saaty (les jugements nuls ou négatifs sont ramenés
+# au minimum pour garder une matrice réciproque définie)
+MIN_JUDGMENT = 0.01
+
+
+def set_random_index_cache(path):
+    """Fichier JSON où conserver les RI simulés (None : mémoire seule)."""
+    global _ri_cache_file
+    _ri_cache_file = path
+
+
+def _read_ri_cache():
+    try:
+        with open(_ri_cache_file, encoding='utf-8') as fh:
+            return {int(n): float(ri) for n, ri in json.load(fh).items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def simulate_random_index(n, samples=RI_SAMPLES, seed=RI_SEED, chunk=RI_CHUNK):
+    """CI moyen de matrices réciproques n × n aléatoires (valeur propre
+    maximale exacte, tirages par lots de ``chunk``).
+    """
+    if n < 3:
+        return 0.0
+    scale = np.concatenate([1.0 / np.arange(9, 1, -1), np.arange(1, 10)])
+    rng = np.random.default_rng(seed)
+    m = n * (n - 1) // 2
+    total = 0.0
+    for start in range(0, samples, chunk):
+        count = min(chunk, samples - start)
+        M = pairwise_matrices(n, rng.choice(scale, size=(count, m)))
+        total += np.linalg.eigvals(M).real.max(axis=1).sum()
+    return float((total / samples - n) / (n - 1))
+
+
+def random_index(n):
+    if n in RI_TABLE:
+        return RI_TABLE[n]
+    if n not in _simulated_ri:
+        stored = _read_ri_cache() if _ri_cache_file else {}
+        if n not in stored:
+            stored[n] = simulate_random_index(n)
+            if _ri_cache_file:
+                try:
+                    os.makedirs(os.path.dirname(_ri_cache_file) or '.', exist_ok=True)
+                    with open(f"{_ri_cache_file}.tmp", 'w', encoding='utf-8') as fh:
+                        json.dump({str(k): v for k, v in sorted(stored.items())}, fh)
+                    os.replace(f"{_ri_cache_file}.tmp", _ri_cache_file)
+                except OSError:
+                    pass
+        _simulated_ri.update(stored)
+    return _simulated_ri[n]
+
+
+def upper_pairs(n):
+    """Paires (i, j), i < j, dans l'ordre des spinboxes du dialogue."""
+    return [(i, j) for i in range(n) for j in range(i + 1, n)]
+
+
+def pairwise_matrix(n, judgments):
+    """Matrice réciproque n × n à partir des jugements du triangle supérieur.
+
+    :param judgments: dict {(i, j): valeur} avec i < j ; les paires absentes
+        valent 1 (importance égale).
+    """
+    M = np.ones((n, n))
+    for (i, j), value in judgments.items():
+        value = max(float(value), MIN_JUDGMENT)
+        M[i, j] = value
+        M[j, i] = 1.0 / value
+    return M
+
+
+def pairwise_matrices(n, upper):
+    """Pile de matrices réciproques (k × n × n).
+
+    :param upper: tableau (k × n(n-1)/2) des jugements, colonnes dans
+        l'ordre de ``upper_pairs(n)``.
+    """
+    upper = np.maximum(np.asarray(upper, dtype=np.float64), MIN_JUDGMENT)
+    k = upper.shape[0]
+    rows, cols = np.triu_indices(n, 1)
+    M = np.ones((k, n, n))
+    M[:, rows, cols] = upper
+    M[:, cols, rows] = 1.0 / upper
+    return M
+
+
+def ahp(matrix, method='geometric'):
+    """Calcul AHP générique pour une matrice n × n.
+    Retourne (weights, CR).
+    """
+    weights, cr = ahp_batch(np.asarray(matrix, dtype=np.float64)[np.newaxis], method)
+    return weights[0], cr[0]
+
+
+def ahp_batch(matrices, method='geometric', squarings=8):
+    """AHP vectorisé sur une pile de matrices (k × n × n).
+
+    :param method: 'geometric' (moyenne géométrique des lignes) ou
+        'eigenvector' (vecteur propre principal).
+    :param squarings: méthode 'eigenvector' : la matrice est élevée à la
+        puissance 2**squarings (256 par défaut).
+    :returns: (weights (k × n), CR (k,)).
+    """
+    M = np.asarray(matrices, dtype=np.float64)
+    n = M.shape[-1]
+    if method == 'geometric':
+        # Moyenne géométrique par ligne
+        weights = np.prod(M, axis=2) ** (1.0 / n)
+    elif method == 'eigenvector':
+        # Matrice positive : les colonnes de M^p tendent vers le vecteur de
+        # Perron ; les carrés successifs (renormalisés) y arrivent en
+        # quelques produits matriciels, sans boucle par matrice
+        P = M.copy()
+        for _ in range(squarings):
+            P = P @ P
+            P /= P.sum(axis=(1, 2), keepdims=True)
+        weights = P.sum(axis=2)
+    else:
+        raise ValueError(f"Méthode AHP inconnue : {method}")
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    # Ratio de cohérence
+    Aw = np.einsum('kij,kj->ki', M, weights)
+    lambda_max = np.mean(Aw / weights, axis=1)
+    CI = (lambda_max - n) / max(n - 1, 1)
+    ri = random_index(n)
+    CR = CI / ri if ri > 0 else np.zeros(len(M))
+    return weights, CR
+
+
+def is_consistent(cr):
+    return cr < CR_THRESHOLD
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Cache disque des résultats
+ Résultats (.npz) d'une analyse rangés sous une clé de contenu (source,
+ champs, normes, poids), avec éviction LRU par taille. Les graphiques n'y
+ sont pas : ils se reconstruisent (descripteurs) à partir des résultats.
+ ***************************************************************************/
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+CACHE_VERSION = 2
+DEFAULT_CACHE_MB = 200
+# Sources sans fichier : empreinte des valeurs jusqu'à ce nombre d'entités
+DEFAULT_FINGERPRINT_MAX = 100000
+MANIFEST_FILE = "manifest.json"
+RESULTS_FILE = "results.npz"
+
+
+def source_state(path):
+    """Date de modification et taille du fichier source (et de son
+    journal WAL éventuel) ; liste vide hors fichier.
+    """
+    state = []
+    for candidate in (path, f"{path}-wal"):
+        if candidate and os.path.isfile(candidate):
+            st = os.stat(candidate)
+            state.append([os.path.basename(candidate), st.st_mtime_ns, st.st_size])
+    return state
+
+
+def rows_fingerprint(rows):
+    """Empreinte de lignes ``(identifiant, valeurs)``, indépendante de leur
+    ordre (somme des SHA-256 de chaque ligne) : tient lieu de date de
+    modification pour les sources sans fichier (bases de données, WFS).
+    """
+    total = 0
+    count = 0
+    for row in rows:
+        digest = hashlib.sha256(repr(row).encode('utf-8')).digest()
+        total = (total + int.from_bytes(digest[:16], 'big')) % (1 << 128)
+        count += 1
+    return f"{count}:{total:032x}"
+
+
+def _plain(value):
+    """Convertit tableaux NumPy et tuples en valeurs JSON stables."""
+    if isinstance(value, np.ndarray) or isinstance(value, np.generic):
+        return np.round(np.asarray(value, dtype=np.float64), 12).tolist()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in sorted(value.items())}
+    if isinstance(value, float):
+        return round(value, 12)
+    return value
+
+
+def cache_key(*parts):
+    """Empreinte SHA-256 des éléments qui déterminent les résultats."""
+    payload = json.dumps([CACHE_VERSION] + _plain(list(parts)),
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultsCache:
+    """Entrées ``<répertoire>/<clé>/`` : results.npz et manifest.json.
+    Au-delà de ``max_bytes``, les entrées les moins récemment utilisées
+    sont supprimées.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """Entrée de la clé (dict results/stats/streaming) ou None.
+        ``results`` est le chemin du .npz écrit par ``ResultsStore.save``.
+        """
+        entry_dir = self._entry_dir(key)
+        manifest_path = os.path.join(entry_dir, MANIFEST_FILE)
+        if not os.path.isfile(manifest_path):
+            return None
+        try:
+            with open(manifest_path, encoding='utf-8') as fh:
+                manifest = json.load(fh)
+            results = os.path.join(entry_dir, RESULTS_FILE)
+            if manifest['version'] != CACHE_VERSION or not os.path.isfile(results):
+                raise ValueError("entrée incomplète")
+            manifest['last_used'] = time.time()
+            self._write_manifest(entry_dir, manifest)
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        return {
+            'results': results,
+            'stats': manifest['stats'],
+            'streaming': manifest['streaming'],
+        }
+
+    def put(self, key, store, stats, streaming=False):
+        """Enregistre les résultats (objet avec ``save(path)``) ; l'entrée
+        n'apparaît qu'une fois complète.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            store.save(os.path.join(tmp_dir, RESULTS_FILE))
+            now = time.time()
+            self._write_manifest(tmp_dir, {
+                'version': CACHE_VERSION,
+                'stats': {k: int(v) for k, v in stats.items()},
+                'streaming': bool(streaming),
+                'created': now,
+                'last_used': now,
+            })
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=key)
+
+    def entries(self):
+        """(dernière utilisation, taille en octets, clé) des entrées valides."""
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for key in os.listdir(self.directory):
+            entry_dir = self._entry_dir(key)
+            try:
+                with open(os.path.join(entry_dir, MANIFEST_FILE), encoding='utf-8') as fh:
+                    last_used = json.load(fh)['last_used']
+                size = sum(os.path.getsize(os.path.join(entry_dir, name))
+                           for name in os.listdir(entry_dir))
+            except (OSError, ValueError, KeyError):
+                continue
+            found.append((last_used, size, key))
+        return found
+
+    def evict(self, keep=None):
+        """Supprime les entrées les plus anciennes au-delà de ``max_bytes``."""
+        found = sorted(self.entries())
+        total = sum(size for _, size, _ in found)
+        for _, size, key in found:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+
+    def discard(self, key):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _write_manifest(entry_dir, manifest):
+        path = os.path.join(entry_dir, MANIFEST_FILE)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as fh:
+            json.dump(manifest, fh, ensure_ascii=False, indent=1)
+        os.replace(f"{path}.tmp", path)
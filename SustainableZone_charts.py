@@ -0,0 +1,738 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Graphiques à la demande
+ Descripteurs de graphiques (type + données compactes) construits dès la
+ fin de l'analyse, tracés seulement quand on les affiche ou les exporte.
+ Tracé sur des Figure matplotlib autonomes (sans pyplot, sans QGIS/Qt).
+ ***************************************************************************/
+"""
+import io
+import multiprocessing
+import multiprocessing.spawn
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from .SustainableZone_engine import CLASS_LABELS, CLASS_THRESHOLDS, CRITERIA
+
+CHART_DPI = 200
+# Formats d'export d'un graphique (fichier écrit à la demande)
+EXPORT_FORMATS = ('png', 'svg', 'pdf')
+# PDF rastérisé (option) : tout ce qui passe sous les textes et les axes
+# (zorder < 2.5 : barres, polygones, courbes)
+RASTER_ZORDER = 2.5
+# Aperçus écran : résolution plancher (fenêtre minuscule)
+MIN_PREVIEW_DPI = 20
+# Compression zlib des PNG : niveau rapide (images en mémoire, même rendu)
+PNG_COMPRESS_LEVEL = 1
+# Atlas des radars : zones par page (0 = un radar par zone) et tri
+DEFAULT_ATLAS_PAGE = 48
+ATLAS_SORTS = ('id_global', 'classe')
+# En dessous, le lancement des processus coûte plus que le tracé
+MIN_PARALLEL_CHARTS = 8
+DIMENSION_LABELS = ['Économie', 'Environnement', 'Social']
+DIMENSION_COLORS = ['#3498db', '#27ae60', '#f39c12']
+CLASS_COLORS = ['#e74c3c', '#f39c12', '#27ae60']      # ordre de CLASS_LABELS
+
+
+def matplotlib_available():
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def safe_filename(name):
+    return re.sub(r'[^\w\-]', '_', str(name))
+
+
+class Chart:
+    """Descriptif d'un graphique : ``name`` (nom de fichier sans extension),
+    ``kind`` (fonction de tracé de DRAWERS) et ``data`` (valeurs à tracer).
+    Ne dépend que de tableaux NumPy et de valeurs simples.
+    """
+
+    def __init__(self, name, kind, **data):
+        self.name = name
+        self.kind = kind
+        self.data = data
+
+    @property
+    def title(self):
+        return self.name.replace('_', ' ').title()
+
+    @property
+    def figsize(self):
+        size = FIGSIZES[self.kind]
+        return size(**self.data) if callable(size) else size
+
+    def draw(self, fig):
+        DRAWERS[self.kind](fig, **self.data)
+
+    def __repr__(self):
+        return f"Chart({self.name!r}, {self.kind!r})"
+
+
+# ========== RENDU ==========
+def new_figure(chart, dpi=None):
+    """Figure autonome (canevas Agg), utilisable hors du thread principal."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=chart.figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def render_png(chart, dpi=CHART_DPI):
+    """Trace le graphique et renvoie l'image PNG (bytes). Les radars
+    réutilisent une figure modèle propre au thread (RadarTemplate).
+    """
+    if chart.kind in RADAR_KINDS:
+        template = radar_template(chart.kind)
+        template.update(**chart.data)
+        return template.render_png(dpi)
+    fig = new_figure(chart)
+    chart.draw(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight',
+                pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
+    return buffer.getvalue()
+
+
+def preview_dpi(chart, width, height):
+    """Résolution pour laquelle le graphique tient dans ``width`` × ``height``
+    pixels (proportions conservées).
+    """
+    fig_w, fig_h = chart.figsize
+    return max(MIN_PREVIEW_DPI, min(width / fig_w, height / fig_h))
+
+
+def render_preview(chart, width, height):
+    """Aperçu écran : tracé directement à la taille d'affichage, dans un
+    tampon RGBA en mémoire (ni recadrage, ni PNG, ni mise à l'échelle Qt).
+    Haute résolution et fichiers sont réservés à l'export (render_png).
+
+    :returns: (octets RGBA, largeur, hauteur) en pixels.
+    """
+    dpi = preview_dpi(chart, width, height)
+    if chart.kind in RADAR_KINDS:
+        template = radar_template(chart.kind)
+        template.update(**chart.data)
+        rgba = template.render_rgba(dpi)
+    else:
+        fig = new_figure(chart, dpi)
+        chart.draw(fig)
+        if chart.kind not in FIXED_LAYOUT_KINDS:
+            # Remplace le recadrage « tight » de l'export : taille exacte
+            fig.tight_layout()
+        fig.canvas.draw()
+        rgba = np.asarray(fig.canvas.buffer_rgba())
+    return rgba.tobytes(), rgba.shape[1], rgba.shape[0]
+
+
+def render_bytes(chart, fmt='png', dpi=CHART_DPI):
+    """Graphique en mémoire au format d'export : PNG (``dpi``), SVG ou PDF
+    (vectoriels, figure neuve même pour les radars).
+    """
+    if fmt == 'png':
+        return render_png(chart, dpi)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+    fig = new_figure(chart)
+    chart.draw(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def render_pdf_page(chart, raster_dpi=0):
+    """Page PDF (bytes, une page, vectorielle) du graphique, à assembler
+    dans le rapport (add_pdf_page).
+
+    :param raster_dpi: si > 0, le contenu des axes (barres, polygones,
+        courbes) est rastérisé à cette résolution, textes et axes restant
+        vectoriels (graphiques très chargés).
+    """
+    fig = new_figure(chart)
+    chart.draw(fig)
+    options = {'bbox_inches': 'tight'}
+    if raster_dpi > 0:
+        for ax in fig.axes:
+            ax.set_rasterization_zorder(RASTER_ZORDER)
+        options['dpi'] = raster_dpi
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='pdf', **options)
+    return buffer.getvalue()
+
+
+def add_pdf_page(report, chart, raster_dpi=0, page=None):
+    """Ajoute le graphique en page de ``report`` (PdfReport).
+
+    :param page: page déjà tracée (render_pdf_page, ou render_all avec
+        ``fmt='pdf'``) : seulement recopiée, contenu vectoriel intact.
+        Sinon le graphique est tracé ici.
+    """
+    report.add_pdf(page if page is not None else render_pdf_page(chart, raster_dpi))
+
+
+def export_chart(chart, path, dpi=CHART_DPI):
+    """Écrit le graphique dans ``path``, au format donné par l'extension
+    (PNG par défaut). Seule écriture de fichier d'un graphique : à la
+    demande de l'utilisateur.
+    """
+    fmt = os.path.splitext(path)[1].lower().lstrip('.') or 'png'
+    data = render_bytes(chart, fmt, dpi)
+    with open(path, 'wb') as fh:
+        fh.write(data)
+    return path
+
+
+def _render_job(job):
+    chart, fmt, dpi = job
+    if fmt == 'pdf':
+        return render_pdf_page(chart, dpi)
+    return render_bytes(chart, fmt, dpi)
+
+
+def python_executable():
+    """Interpréteur Python pour les processus de tracé, ou None.
+
+    Dans QGIS, ``sys.executable`` est souvent l'exécutable de QGIS : on
+    cherche alors python3 / python.exe à côté de l'installation Python.
+    """
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+    names = ('python.exe', 'pythonw.exe') if os.name == 'nt' else ('python3', 'python')
+    for directory in (sys.exec_prefix, os.path.join(sys.exec_prefix, 'bin')):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def render_all(charts, workers=None, dpi=CHART_DPI, progress=None, fmt='png'):
+    """Trace tous les graphiques (bytes au format ``fmt``, dans l'ordre de
+    ``charts``) : PNG ou SVG comme render_bytes, ou ``'pdf'`` pour des
+    pages de rapport (render_pdf_page, ``dpi`` = résolution de
+    rastérisation, 0 : tout vectoriel).
+
+    Les descripteurs ne contiennent que des tableaux compacts : ils sont
+    envoyés à un pool de ``workers`` processus (nombre de cœurs par défaut)
+    qui tracent chacun avec Agg. Tracé en série si un seul processus
+    suffit, si aucun interpréteur Python n'est trouvé ou si le pool ne
+    démarre pas.
+
+    :param progress: fonction optionnelle appelée avec la fraction tracée.
+    """
+    charts = list(charts)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(charts) or 1))
+    executable = python_executable() if workers > 1 else None
+    images = []
+    if executable is not None and len(charts) >= MIN_PARALLEL_CHARTS:
+        # L'interpréteur de spawn est global au processus (QGIS) : il est
+        # rétabli dès que le pool est fermé
+        previous = multiprocessing.spawn.get_executable()
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(executable)
+        chunk = max(1, len(charts) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                for data in pool.map(_render_job, [(chart, fmt, dpi) for chart in charts],
+                                     chunksize=chunk):
+                    images.append(data)
+                    if progress is not None:
+                        progress(len(images) / len(charts))
+        except (BrokenProcessPool, OSError):
+            # Processus impossibles à lancer : les graphiques restants en série
+            pass
+        finally:
+            context.set_executable(previous)
+    for chart in charts[len(images):]:
+        images.append(_render_job((chart, fmt, dpi)))
+        if progress is not None:
+            progress(len(images) / len(charts))
+    return images
+
+
+# ========== DESCRIPTEURS ==========
+def analysis_charts(results, stats, weights, aggregates=None, atlas_page=DEFAULT_ATLAS_PAGE,
+                    atlas_sort='id_global'):
+    """Graphiques d'une analyse (1 à 7), sans rien tracer.
+
+    :param results: ResultsStore (toutes les zones, ou le top-k en mode flux).
+    :param aggregates: ScoreAggregator du mode flux (histogramme), ou None.
+    :param atlas_page: zones par page de l'atlas des radars (0 : un radar
+        par zone).
+    :param atlas_sort: ordre de l'atlas, 'id_global' ou 'classe'.
+    """
+    charts = [
+        Chart("01_pie_ahp", 'pie_ahp', weights=[float(w) for w in weights[:3]]),
+        Chart("02_bar_scores", 'bar_scores', names=results.names(),
+              weighted=np.array(results.weighted)),
+        Chart("03_bar_global", 'bar_global', names=results.names(),
+              id_global=np.array(results.id_global)),
+        Chart("04_pie_durabilite", 'pie_classes',
+              counts=[stats.get(lbl, 0) for lbl in CLASS_LABELS]),
+    ]
+    # Échelle radiale commune à tous les radars (profils comparables)
+    rmax = max(1.0, float(results.dims.max(initial=0.0))) * 1.05
+    if atlas_page > 0:
+        charts += atlas_charts(results, atlas_page, atlas_sort, rmax)
+    else:
+        for i in range(len(results)):
+            name = results.name(i)
+            charts.append(Chart(f"05_radar_{safe_filename(name)}", 'radar',
+                                values=np.array(results.dims[i]),
+                                titles=[f"Profil — {name}"], rmax=rmax))
+    charts.append(Chart("06_detail_sous_criteres", 'sub_criteria', names=results.names(),
+                        subs=np.array(results.subs)))
+    if aggregates is not None:
+        charts.append(Chart("07_hist_global", 'hist_global', edges=aggregates.hist_edges,
+                            hist=aggregates.hist, count=aggregates.count))
+    return charts
+
+
+def atlas_charts(results, page_size=DEFAULT_ATLAS_PAGE, sort='id_global', rmax=None):
+    """Atlas des profils : radars en petits multiples, ``page_size`` zones
+    par page, triées par Id_Global décroissant ou par classe (puis Id_Global).
+    """
+    if sort not in ATLAS_SORTS:
+        raise ValueError(f"Tri d'atlas inconnu : {sort}")
+    id_global = np.asarray(results.id_global, dtype=np.float64)
+    if sort == 'classe':
+        order = np.lexsort((-id_global, -np.asarray(results.classes)))
+    else:
+        order = np.argsort(-id_global, kind='stable')
+    rmax = rmax or max(1.0, float(results.dims.max(initial=0.0))) * 1.05
+    cols = int(np.ceil(np.sqrt(page_size * 4.0 / 3.0)))
+    rows = int(np.ceil(page_size / cols))
+    pages = int(np.ceil(len(order) / page_size))
+    # Numéros de page de même largeur : l'ordre des noms est celui des pages
+    width = max(2, len(str(pages)))
+    charts = []
+    for p in range(pages):
+        idx = order[p * page_size:(p + 1) * page_size]
+        charts.append(Chart(
+            f"05_atlas_{p + 1:0{width}d}", 'atlas', names=[results.name(i) for i in idx],
+            values=np.array(results.dims[idx]), classes=np.array(results.classes[idx]),
+            id_global=id_global[idx], grid=(rows, cols), rmax=rmax, page=(p + 1, pages),
+            sort=sort))
+    return charts
+
+
+def uncertainty_chart(results, mc, max_zones=30):
+    """Graphique de la simulation Monte-Carlo : zones les moins stables."""
+    stability = np.clip(mc['p_class'].max(axis=1), 0.0, 1.0)
+    likely = mc['p_class'].argmax(axis=1)
+    shown = np.argsort(stability, kind='stable')[:max_zones]
+    shown = shown[np.argsort(-mc['mean'][shown], kind='stable')]
+    return Chart("08_incertitude", 'uncertainty', names=[results.name(i)[:20] for i in shown],
+                 mean=mc['mean'][shown], p05=mc['p05'][shown], p95=mc['p95'][shown],
+                 likely=likely[shown], stability=stability, draws=mc['draws'])
+
+
+def sensitivity_charts(rows):
+    """Tornado des jugements et tableau des seuils critiques.
+
+    :param rows: liste de (libellé, jugement courant, critical_thresholds).
+    """
+    rows = sorted(rows, key=lambda r: r[2]['max_down'] + r[2]['max_up'])
+    return [Chart("09_tornado", 'tornado', rows=rows),
+            Chart("10_seuils_critiques", 'thresholds', rows=rows)]
+
+
+def compare_chart(r1, r2):
+    """Radars côte à côte de deux zones (lignes de ResultsStore)."""
+    return Chart("comparaison", 'compare',
+                 values=np.array([[r['norm_eco'], r['norm_env'], r['norm_soc']] for r in (r1, r2)]),
+                 titles=[f"{r['name']}\nId={r['id_global']:.3f} ({r['classe']})"
+                         for r in (r1, r2)],
+                 suptitle=f"Comparaison : {r1['name']}  VS  {r2['name']}")
+
+
+def node_chart(scores):
+    """Distribution des scores (ratio à la norme) de chaque nœud de l'arbre
+    des critères.
+    """
+    return Chart("11_noeuds", 'nodes', scores=np.asarray(scores))
+
+
+# ========== TRACÉS ==========
+def _threshold_lines(ax, axis='h'):
+    line = ax.axhline if axis == 'h' else ax.axvline
+    line(CLASS_THRESHOLDS[1], color='#27ae60', linestyle='--', label='Seuil durable')
+    line(CLASS_THRESHOLDS[0], color='#f39c12', linestyle='--', label='Seuil transition')
+
+
+def _draw_pie_ahp(fig, weights):
+    ax = fig.subplots()
+    ax.pie(weights,
+           labels=[f'{lbl}\n({w:.1%})' for lbl, w in zip(DIMENSION_LABELS, weights)],
+           colors=DIMENSION_COLORS, autopct='%1.1f%%', startangle=90,
+           textprops={'fontsize': 11})
+    ax.set_title('Pondérations AHP des dimensions', fontsize=14, fontweight='bold')
+
+
+def _draw_bar_scores(fig, names, weighted):
+    ax = fig.subplots()
+    x = np.arange(len(names))
+    w = 0.25
+    for d, (label, color) in enumerate(zip(DIMENSION_LABELS, DIMENSION_COLORS)):
+        ax.bar(x + (d - 1) * w, weighted[:, d], w, label=label, color=color)
+    ax.set_ylabel('Score pondéré AHP')
+    ax.set_title('Scores pondérés par dimension', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(names, rotation=30, ha='right')
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+
+def _draw_bar_global(fig, names, id_global):
+    ax = fig.subplots()
+    colors = [CLASS_COLORS[c] for c in np.searchsorted(CLASS_THRESHOLDS, id_global, side='right')]
+    bars = ax.bar(np.arange(len(names)), id_global, color=colors)
+    _threshold_lines(ax)
+    ax.set_ylabel('Score global')
+    ax.set_title('Indice de durabilité global', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+    for bar, val in zip(bars, id_global):
+        ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height() + 0.01,
+                f'{val:.2f}', ha='center', va='bottom', fontweight='bold')
+    ax.set_xticks(np.arange(len(names)))
+    ax.set_xticklabels(names, rotation=30, ha='right')
+
+
+def _draw_pie_classes(fig, counts):
+    ax = fig.subplots()
+    labels = {'Durable': 'Durables', 'Transition': 'Transition', 'Critique': 'Critiques'}
+    shown = [(labels[lbl], cnt, col)
+             for lbl, cnt, col in reversed(list(zip(CLASS_LABELS, counts, CLASS_COLORS)))
+             if cnt > 0]
+    if shown:
+        ld, vd, cd = zip(*shown)
+        ax.pie(vd, labels=ld, colors=cd, autopct='%1.0f%%', startangle=90,
+               textprops={'fontsize': 12})
+        ax.set_title('ÉTATS DE DURABILITÉ', fontsize=14, fontweight='bold')
+
+
+class RadarTemplate:
+    """Figure radar construite une seule fois (axes polaires, grilles,
+    libellés, polygones) : pour chaque zone, seuls les polygones et les
+    titres changent avant le rendu.
+
+    Le fond (tout sauf les polygones et les titres) est tracé une fois par
+    résolution et échelle radiale, puis recopié pour chaque zone. Un
+    panneau par couleur de ``colors`` (2 pour la comparaison de zones).
+    Une instance n'est pas partagée entre threads (voir radar_template).
+    """
+
+    def __init__(self, colors=('#27ae60',), title_size=13, fig=None):
+        if fig is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(6 * len(colors), 6 if len(colors) == 1 else 5))
+            FigureCanvasAgg(fig)
+        self.figure = fig
+        self.title_size = title_size
+        angles = np.linspace(0, 2 * np.pi, 3, endpoint=False)
+        self._closed = np.append(angles, angles[0])
+        self.panels = []
+        for k, color in enumerate(colors):
+            ax = fig.add_subplot(1, len(colors), k + 1, polar=True)
+            polygon, = ax.fill(self._closed, np.zeros(4), color=color, alpha=0.25)
+            line, = ax.plot(self._closed, np.zeros(4), color=color, linewidth=2, marker='o')
+            ax.set_thetagrids(np.degrees(angles), DIMENSION_LABELS)
+            ax.set_title(' ', fontsize=title_size, fontweight='bold')
+            self.panels.append((ax, polygon, line))
+        self._suptitle = fig.suptitle(' ', fontsize=14, fontweight='bold')
+        # Mise en page fixe : pas de recadrage « tight » (second tracé) par zone
+        if len(colors) == 1:
+            fig.subplots_adjust(left=0.16, right=0.84, bottom=0.08, top=0.84)
+        else:
+            fig.subplots_adjust(left=0.08, right=0.92, bottom=0.08, top=0.74, wspace=0.45)
+        self._rmax = None
+        self._background = None     # (dpi, image du fond)
+
+    def _dynamic(self):
+        for ax, polygon, line in self.panels:
+            yield ax, polygon
+            yield ax, line
+            yield ax, ax.title
+        yield self.panels[0][0], self._suptitle
+
+    def update(self, values, titles, suptitle=None, rmax=None):
+        """Données d'une zone par panneau (``values`` : scores éco/env/soc).
+        ``rmax`` : rayon maximal commun (sinon max(1, valeurs)).
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        rmax = rmax or max(1.0, float(values.max())) * 1.05
+        if rmax != self._rmax:
+            for ax, _polygon, _line in self.panels:
+                ax.set_ylim(0, rmax)
+            self._rmax = rmax
+            self._background = None
+        for (ax, polygon, line), vals, title in zip(self.panels, values, titles):
+            closed = np.append(vals, vals[0])
+            line.set_ydata(closed)
+            polygon.set_xy(np.column_stack([self._closed, closed]))
+            ax.title.set_text(title)
+        self._suptitle.set_text(suptitle or '')
+
+    def render_rgba(self, dpi=CHART_DPI):
+        """Image de la zone courante (tableau RGBA du canevas)."""
+        canvas = self.figure.canvas
+        if self._background is None or self._background[0] != dpi:
+            self.figure.set_dpi(dpi)
+            for _ax, artist in self._dynamic():
+                artist.set_animated(True)
+            canvas.draw()
+            self._background = (dpi, canvas.copy_from_bbox(self.figure.bbox))
+        canvas.restore_region(self._background[1])
+        for ax, artist in self._dynamic():
+            ax.draw_artist(artist)
+        return np.asarray(canvas.buffer_rgba())
+
+    def render_png(self, dpi=CHART_DPI):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.fromarray(self.render_rgba(dpi)).save(
+            buffer, format='png', compress_level=PNG_COMPRESS_LEVEL, dpi=(dpi, dpi))
+        return buffer.getvalue()
+
+
+# Radars : paramètres du modèle et mise en forme des données du descripteur
+RADAR_KINDS = {
+    'radar': dict(colors=('#27ae60',), title_size=13),
+    'compare': dict(colors=('#3498db', '#e74c3c'), title_size=11),
+}
+_templates = threading.local()
+# Déjà mis en page par leur fonction de tracé (pas de tight_layout en aperçu)
+FIXED_LAYOUT_KINDS = set(RADAR_KINDS) | {'atlas', 'sub_criteria', 'uncertainty'}
+
+
+def radar_template(kind='radar'):
+    """Modèle de radar du thread courant (créé au premier appel)."""
+    templates = _templates.__dict__.setdefault('by_kind', {})
+    if kind not in templates:
+        templates[kind] = RadarTemplate(**RADAR_KINDS[kind])
+    return templates[kind]
+
+
+def _draw_radar(fig, values, titles, suptitle=None, rmax=None):
+    RadarTemplate(**RADAR_KINDS['radar'], fig=fig).update(values, titles, suptitle, rmax)
+
+
+def _draw_compare(fig, values, titles, suptitle=None, rmax=None):
+    RadarTemplate(**RADAR_KINDS['compare'], fig=fig).update(values, titles, suptitle, rmax)
+
+
+def _draw_atlas(fig, names, values, classes, id_global, grid, rmax, page, sort):
+    """Page d'atlas : un seul axe ; tous les polygones de la page forment une
+    PolyCollection, grilles et rayons une LineCollection.
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+    rows, cols = grid
+    radius = 0.36
+    ax = fig.add_axes([0.01, 0.01, 0.98, 0.90])
+    ax.set_xlim(0, cols)
+    ax.set_ylim(0, rows)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+    k = np.arange(len(names))
+    centers = np.column_stack([k % cols + 0.5, rows - k // cols - 0.5])
+    angles = np.linspace(0, 2 * np.pi, 3, endpoint=False)
+    unit = np.column_stack([np.cos(angles), np.sin(angles)])          # 3 × 2
+    scale = radius * np.asarray(values, dtype=np.float64) / rmax        # n × 3
+    polygons = centers[:, None, :] + scale[:, :, None] * unit[None]
+
+    circle = np.linspace(0, 2 * np.pi, 49)
+    rings = [centers[i] + r * radius / rmax * np.column_stack([np.cos(circle), np.sin(circle)])
+             for i in range(len(names)) for r in (0.5, 1.0)]
+    spokes = [np.array([centers[i], centers[i] + radius * u])
+              for i in range(len(names)) for u in unit]
+    ax.add_collection(LineCollection(rings + spokes, colors='#bdc3c7', linewidths=0.4))
+    colors = [CLASS_COLORS[c] for c in classes]
+    ax.add_collection(PolyCollection(polygons, facecolors=colors, edgecolors=colors,
+                                     alpha=0.45, linewidths=1.0))
+    for (cx, cy), name, value in zip(centers, names, id_global):
+        ax.text(cx, cy - radius - 0.04, f"{name[:18]}\n{value:.2f}", ha='center', va='top',
+                fontsize=5.5)
+
+    order = 'Id_Global décroissant' if sort == 'id_global' else 'classe puis Id_Global'
+    fig.suptitle(f"Atlas des profils — page {page[0]}/{page[1]} (tri : {order})",
+                 fontsize=13, fontweight='bold')
+    fig.text(0.5, 0.915, "Sommets : Économie (→), Environnement (↖), Social (↙) — "
+             f"cercles à {0.5 * rmax:.2f} et {rmax:.2f}", ha='center', fontsize=8,
+             color='#7f8c8d')
+
+
+def _draw_sub_criteria(fig, names, subs):
+    axes = fig.subplots(1, 3)
+    n_zones = len(names)
+    bar_height = 0.8 / max(n_zones, 1)
+    for ax, dim in zip(axes, CRITERIA.dimensions):
+        sub_names = CRITERIA.names(dim['key'])
+        columns = subs[:, CRITERIA.slices[dim['key']]]
+        for idx, zone in enumerate(names):
+            offset = (idx - n_zones / 2.0 + 0.5) * bar_height
+            ax.barh(np.arange(len(sub_names)) + offset, columns[idx],
+                    height=bar_height, label=zone, alpha=0.7)
+        ax.set_yticks(np.arange(len(sub_names)))
+        ax.set_yticklabels(sub_names)
+        ax.set_title(dim['name'], fontweight='bold')
+        ax.axvline(x=1.0, color='red', linestyle='--', alpha=0.5)
+        ax.legend(fontsize=8)
+        ax.grid(axis='x', alpha=0.3)
+    fig.suptitle('Détail des sous-critères normalisés', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+
+
+def _draw_hist_global(fig, edges, hist, count):
+    ax = fig.subplots()
+    centers = (edges[:-1] + edges[1:]) / 2.0
+    colors = [CLASS_COLORS[c] for c in np.searchsorted(CLASS_THRESHOLDS, centers, side='right')]
+    ax.bar(centers, hist, width=np.diff(edges), color=colors, edgecolor='white')
+    _threshold_lines(ax, 'v')
+    ax.set_xlabel('Score global')
+    ax.set_ylabel('Nombre de zones')
+    ax.set_title(f'Distribution de l\'indice global ({count} zones)',
+                 fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+
+def _draw_uncertainty(fig, names, mean, p05, p95, likely, stability, draws):
+    axes = fig.subplots(1, 2, gridspec_kw={'width_ratios': [2, 1]})
+    ax = axes[0]
+    x = np.arange(len(names))
+    ax.errorbar(x, mean, yerr=[mean - p05, p95 - mean], fmt='none', ecolor='#7f8c8d',
+                capsize=3)
+    ax.scatter(x, mean, c=[CLASS_COLORS[c] for c in likely], zorder=3)
+    _threshold_lines(ax)
+    ax.set_xticks(x)
+    ax.set_xticklabels(names, rotation=45, ha='right', fontsize=8)
+    ax.set_ylabel('Score global (moyenne, 5–95 %)')
+    ax.set_title(f'{len(names)} zones les moins stables', fontweight='bold')
+    ax.legend(fontsize=8)
+    ax.grid(axis='y', alpha=0.3)
+
+    ax = axes[1]
+    ax.hist(stability, bins=np.linspace(1.0 / 3.0, 1.0, 21), color='#9b59b6',
+            edgecolor='white')
+    ax.set_xlabel('Probabilité de la classe la plus probable')
+    ax.set_ylabel('Nombre de zones')
+    ax.set_title('Stabilité des classes', fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+
+    fig.suptitle(f"Incertitude des poids AHP — {draws} tirages", fontsize=14, fontweight='bold')
+    fig.tight_layout()
+
+
+def _draw_tornado(fig, rows):
+    ax = fig.subplots()
+    y = np.arange(len(rows))
+    ax.barh(y, [-r[2]['max_down'] for r in rows], color='#e74c3c',
+            label='Jugement abaissé (→ 1/9)')
+    ax.barh(y, [r[2]['max_up'] for r in rows], color='#3498db',
+            label='Jugement augmenté (→ 9)')
+    ax.axvline(x=0, color='#2c3e50', linewidth=1)
+    ax.set_yticks(y)
+    ax.set_yticklabels([r[0] for r in rows], fontsize=9)
+    ticks = ax.get_xticks()
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([f'{abs(t):.0f}' for t in ticks])
+    ax.set_xlabel('Zones changeant de classe (maximum sur le balayage)')
+    ax.set_title('Sensibilité des jugements par paires', fontsize=14, fontweight='bold')
+    ax.legend(fontsize=9, loc='lower right')
+    ax.grid(axis='x', alpha=0.3)
+
+
+def _draw_thresholds(fig, rows):
+    def fmt(v):
+        return '—' if v is None else f'{v:.2f}'
+    table_data = [['Jugement', 'Actuel', 'Seuil bas', 'Seuil haut', 'Zones sensibles']]
+    for label, current, t in reversed(rows):
+        table_data.append([label, f'{current:.2f}', fmt(t['lower']), fmt(t['upper']),
+                           str(t['zones'])])
+    ax = fig.subplots()
+    ax.axis('off')
+    table = ax.table(cellText=table_data, loc='center', cellLoc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+    table.scale(1, 1.5)
+    for j in range(5):
+        table[0, j].set_facecolor('#2c3e50')
+        table[0, j].set_text_props(color='white', fontweight='bold')
+    ax.set_title('Seuils critiques (valeur la plus proche où une zone change de classe)',
+                 fontsize=13, fontweight='bold')
+
+
+def _draw_nodes(fig, scores):
+    colors = {dim['key']: dim['color'] for dim in CRITERIA.dimensions}
+    groups = list(CRITERIA.groups.values())
+    labels = [g['name'] if g['parent'] == 'dim' else f"↳ {g['name']}" for g in groups]
+    ax = fig.subplots()
+    data = [scores[:, k] for k in range(len(groups))]
+    try:
+        box = ax.boxplot(data, orientation='horizontal', tick_labels=labels,
+                         patch_artist=True, showfliers=False)
+    except TypeError:
+        # matplotlib < 3.10 (QGIS LTR) : ni orientation ni tick_labels
+        box = ax.boxplot(data, vert=False, labels=labels,
+                         patch_artist=True, showfliers=False)
+    for patch, group in zip(box['boxes'], groups):
+        patch.set_facecolor(colors[group['dimension']])
+        patch.set_alpha(0.7 if group['parent'] == 'dim' else 0.4)
+    ax.invert_yaxis()
+    # Ratios aux normes : souvent > 1, l'axe suit les données
+    top = float(np.nanmax(scores)) if scores.size else 1.0
+    ax.set_xlim(0, max(1.0, top) * 1.05)
+    ax.axvline(1.0, color='#7f8c8d', linestyle='--', linewidth=1)
+    ax.set_xlabel('Score du nœud (ratio à la norme, non pondéré)')
+    ax.set_title('Scores des nœuds de la hiérarchie des critères',
+                 fontsize=14, fontweight='bold')
+    ax.grid(axis='x', alpha=0.3)
+
+
+DRAWERS = {
+    'pie_ahp': _draw_pie_ahp,
+    'bar_scores': _draw_bar_scores,
+    'bar_global': _draw_bar_global,
+    'pie_classes': _draw_pie_classes,
+    'radar': _draw_radar,
+    'compare': _draw_compare,
+    'atlas': _draw_atlas,
+    'sub_criteria': _draw_sub_criteria,
+    'hist_global': _draw_hist_global,
+    'uncertainty': _draw_uncertainty,
+    'tornado': _draw_tornado,
+    'thresholds': _draw_thresholds,
+    'nodes': _draw_nodes,
+}
+
+# Taille des figures (pouces), fixe ou fonction des données
+FIGSIZES = {
+    'pie_ahp': (7, 5),
+    'bar_scores': (10, 6),
+    'bar_global': (10, 6),
+    'pie_classes': (7, 5),
+    'radar': (6, 6),
+    'compare': (12, 5),
+    'atlas': (11, 8.5),
+    'sub_criteria': (15, 5),
+    'hist_global': (10, 6),
+    'uncertainty': (15, 6),
+    'tornado': lambda rows: (11, max(4, 0.4 * len(rows) + 1.5)),
+    'thresholds': lambda rows: (11, max(3, 0.35 * (len(rows) + 1) + 1)),
+    'nodes': lambda scores: (11, max(4, 0.45 * scores.shape[1] + 1.5)),
+}
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Diagnostic de cohérence AHP
+ Localisation des jugements responsables de l'incohérence et recherche,
+ par lots, des corrections les plus petites ramenant le CR sous le seuil
+ (sans dépendance QGIS/Qt).
+ ***************************************************************************/
+"""
+import numpy as np
+
+from .SustainableZone_ahp import CR_THRESHOLD, ahp, ahp_batch, pairwise_matrices
+
+# Valeurs candidates : échelle de Saaty 1/9 … 9
+SAATY_SCALE = np.concatenate([1.0 / np.arange(9, 1, -1), np.arange(1, 10.0)])
+DEFAULT_MAX_CHANGES = 3
+
+
+def _upper(matrix):
+    matrix = np.asarray(matrix, dtype=np.float64)
+    rows, cols = np.triu_indices(len(matrix), 1)
+    return matrix[rows, cols], rows, cols
+
+
+def inconsistency_contributions(matrix):
+    """Classe les jugements du triangle supérieur par contribution à
+    l'incohérence.
+
+    Avec les poids w, l'écart d'un jugement est e = a_ij · w_j / w_i
+    (1 si cohérent) ; sa contribution e + 1/e - 2 est nulle pour un
+    jugement cohérent et leur somme est proportionnelle à λ_max - n.
+
+    :returns: dict 'pairs' (m × 2, triées par contribution décroissante),
+        'share' (part de l'incohérence totale), 'current' et 'consistent'
+        (valeur w_i / w_j qui annulerait l'écart).
+    """
+    upper, rows, cols = _upper(matrix)
+    weights, _ = ahp(matrix)
+    consistent = weights[rows] / weights[cols]
+    error = upper / consistent
+    contribution = error + 1.0 / error - 2.0
+    order = np.argsort(-contribution, kind='stable')
+    total = contribution.sum()
+    return {
+        'pairs': np.column_stack([rows, cols])[order],
+        'share': contribution[order] / total if total > 0 else np.zeros(len(order)),
+        'current': upper[order],
+        'consistent': consistent[order],
+    }
+
+
+def suggest_repairs(matrix, threshold=CR_THRESHOLD, max_changes=DEFAULT_MAX_CHANGES):
+    """Plus petit ensemble de jugements à modifier pour passer sous le seuil.
+
+    À chaque tour, toutes les modifications d'un seul jugement (valeurs de
+    l'échelle de Saaty et valeur cohérente w_i / w_j) sont évaluées en un
+    seul lot. Si l'une d'elles suffit, la plus petite (en pas logarithmique)
+    est retenue ; sinon celle qui réduit le plus le CR, et on recommence
+    sans toucher aux jugements déjà modifiés.
+
+    :returns: dict 'changes' (liste de (i, j, ancienne, nouvelle valeur)),
+        'cr' (CR après corrections) et 'consistent' (seuil atteint).
+    """
+    n = len(matrix)
+    upper, rows, cols = _upper(matrix)
+    m = len(upper)
+    weights, cr = ahp(matrix)
+    changes = []
+    frozen = np.zeros(m, dtype=bool)
+    while cr >= threshold and len(changes) < max_changes and not frozen.all():
+        consistent = np.clip(weights[rows] / weights[cols], SAATY_SCALE[0], SAATY_SCALE[-1])
+        # Candidats (m × s) : chaque jugement remplacé par chaque valeur
+        values = np.column_stack([np.tile(SAATY_SCALE, (m, 1)), consistent])
+        s = values.shape[1]
+        candidates = np.tile(upper, (m * s, 1))
+        candidates[np.arange(m * s), np.repeat(np.arange(m), s)] = values.ravel()
+        _, crs = ahp_batch(pairwise_matrices(n, candidates))
+        crs = crs.reshape(m, s)
+        step = np.abs(np.log(values / upper[:, None]))
+        usable = ~frozen[:, None] & (step > 1e-9)
+        if not usable.any():
+            break
+        passing = usable & (crs < threshold)
+        if passing.any():
+            # À pas égal, le CR le plus bas départage
+            cost = np.where(passing, step + crs * 1e-6, np.inf)
+        else:
+            cost = np.where(usable, crs, np.inf)
+        k, v = np.unravel_index(np.argmin(cost), cost.shape)
+        changes.append((int(rows[k]), int(cols[k]), float(upper[k]), float(values[k, v])))
+        upper[k] = values[k, v]
+        frozen[k] = True
+        weights, cr = ahp(pairwise_matrices(n, upper[None])[0])
+    return {'changes': changes, 'cr': float(cr), 'consistent': bool(cr < threshold)}
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Registre des critères
+ Dimensions, groupes imbriqués, indicateurs, normes, inversion et mots-clés
+ de détection des champs, lus depuis criteria.json (sans dépendance QGIS/Qt).
+ ***************************************************************************/
+"""
+import json
+import os
+
+import numpy as np
+
+DEFAULT_CRITERIA_FILE = os.path.join(os.path.dirname(__file__), 'criteria.json')
+
+# Dimensions attendues, dans l'ordre : champs Score_Eco/Env/Soc, règles de
+# conseil et matrice AHP 3 × 3 en dépendent
+DIMENSION_KEYS = ('eco', 'env', 'soc')
+
+
+# Nœud racine de la hiérarchie (jugements entre dimensions)
+ROOT_KEY = 'dim'
+
+
+class Criteria:
+    """Registre des critères : une liste de dimensions, chacune avec ses
+    indicateurs (``key``, ``name``, ``label``, ``short``, ``norm``,
+    ``invert``, ``keywords``) ou des groupes d'indicateurs imbriqués
+    (``key``, ``name``, ``children``) à profondeur quelconque.
+
+    Les indicateurs (feuilles) sont rangés en profondeur d'abord, dimension
+    par dimension : c'est l'ordre des colonnes de la matrice d'indicateurs,
+    et les feuilles de chaque groupe y sont contiguës (``span``).
+    ``groups`` : dimensions et groupes imbriqués, chacun avec ``parent``,
+    ``children`` (clés des enfants, feuilles ou groupes) et ``span``.
+    """
+
+    def __init__(self, dimensions):
+        keys = tuple(d.get('key') for d in dimensions)
+        if keys != DIMENSION_KEYS:
+            raise ValueError(f"Dimensions attendues {DIMENSION_KEYS}, trouvées {keys}")
+        self.dimensions = []
+        self.indicators = []
+        self.groups = {}
+        self.slices = {}
+        for dim in dimensions:
+            self._add_group(dim, dim['key'], ROOT_KEY)
+            self.slices[dim['key']] = self.groups[dim['key']]['span']
+            self.dimensions.append({
+                'key': dim['key'],
+                'name': dim.get('name', dim['key']),
+                'icon': dim.get('icon', ''),
+                'color': dim.get('color', '#7f8c8d'),
+            })
+        self.keys = [ind['key'] for ind in self.indicators]
+        all_keys = self.keys + list(self.groups) + [ROOT_KEY]
+        if len(set(all_keys)) != len(all_keys):
+            raise ValueError("Clés d'indicateurs ou de groupes en double")
+        self.norms = np.array([ind['norm'] for ind in self.indicators])
+        self.inverted = np.array([ind['invert'] for ind in self.indicators])
+
+    def _add_group(self, entry, dimension, parent):
+        """Ajoute un groupe et, récursivement, ses enfants."""
+        key = entry['key']
+        name = entry.get('name', key)
+        group = {'key': key, 'dimension': dimension, 'name': name,
+                 'short': entry.get('short', name), 'parent': parent, 'children': []}
+        # Inséré avant ses sous-groupes : ordre parent → enfants
+        self.groups[key] = group
+        start = len(self.indicators)
+        for child in entry.get('children', entry.get('indicators', [])):
+            if 'children' in child:
+                self._add_group(child, dimension, key)
+            else:
+                self._add_indicator(child, dimension, key)
+            group['children'].append(child['key'])
+        if not group['children']:
+            raise ValueError(f"Aucun indicateur pour « {key} »")
+        group['span'] = slice(start, len(self.indicators))
+
+    def _add_indicator(self, ind, dimension, parent):
+        norm = float(ind['norm'])
+        if norm <= 0:
+            raise ValueError(f"Norme invalide pour « {ind['key']} » : {norm}")
+        name = ind.get('name', ind['key'])
+        self.indicators.append({
+            'key': ind['key'],
+            'dimension': dimension,
+            'parent': parent,
+            'name': name,
+            'label': ind.get('label', name),
+            'short': ind.get('short', name),
+            'norm': norm,
+            'invert': bool(ind.get('invert', False)),
+            'keywords': [k.lower() for k in ind.get('keywords', [])],
+        })
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CRITERIA_FILE):
+        with open(path, encoding='utf-8') as fh:
+            return cls(json.load(fh)['dimensions'])
+
+    def __len__(self):
+        return len(self.indicators)
+
+    def indicators_of(self, dimension):
+        return self.indicators[self.slices[dimension]]
+
+    def names(self, dimension, attr='name'):
+        """Noms des indicateurs d'une dimension (``attr`` : 'name',
+        'label' ou 'short').
+        """
+        return [ind[attr] for ind in self.indicators_of(dimension)]
+
+    def dimension_names(self):
+        return [dim['name'] for dim in self.dimensions]
+
+    def child_names(self, group, attr='name'):
+        """Noms des enfants directs d'un groupe (ordre des jugements AHP)."""
+        if group == ROOT_KEY:
+            return self.dimension_names()
+        lookup = {ind['key']: ind for ind in self.indicators}
+        lookup.update(self.groups)
+        return [lookup[key][attr] for key in self.groups[group]['children']]
+
+    def nested_groups(self):
+        """Groupes situés sous les dimensions (hiérarchie à plus de deux niveaux)."""
+        return [key for key, group in self.groups.items() if group['parent'] != ROOT_KEY]
+
+    def counts(self):
+        return [self.slices[d].stop - self.slices[d].start for d in DIMENSION_KEYS]
+
+    def signature(self):
+        """Ce qui détermine les scores (clé de cache) : indicateurs et
+        forme de la hiérarchie.
+        """
+        return ([[ind['key'], ind['norm'], ind['invert']] for ind in self.indicators]
+                + [[key, group['children']] for key, group in self.groups.items()])
+
+
+def load_criteria(path=None):
+    """Registre de ``path`` (criteria.json du plugin par défaut)."""
+    return Criteria.from_file(path or DEFAULT_CRITERIA_FILE)
@@ -1,34 +1,57 @@
 # -*- coding: utf-8 -*-
 import os
+from collections import OrderedDict
+
 import numpy as np
 from qgis.PyQt import uic
 from qgis.PyQt import QtWidgets
-from qgis.PyQt.QtGui import QPixmap, QFont
-from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtGui import QImage, QPixmap, QFont
+from qgis.PyQt.QtCore import QEvent, Qt, QTimer, pyqtSignal
 from qgis.PyQt.QtWidgets import (
-    QLabel, QDoubleSpinBox, QFormLayout, QGroupBox, QVBoxLayout, QWidget
+    QLabel, QDoubleSpinBox, QFormLayout, QGroupBox, QPushButton, QSizePolicy, QVBoxLayout,
+    QWidget
+)
+from qgis.core import QgsApplication, QgsMapLayerProxyModel, QgsTask
+from qgis.gui import QgsFieldComboBox
+
+from .SustainableZone_ahp import (  # noqa: F401
+    RI_TABLE, ahp, is_consistent, pairwise_matrix, upper_pairs
 )
-from qgis.core import QgsMapLayerProxyModel
+from .SustainableZone_charts import render_preview
+from .SustainableZone_consistency import inconsistency_contributions, suggest_repairs
+from .SustainableZone_engine import CRITERIA, TREE
+from .SustainableZone_io import plugin_setting
 
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'SustainableZone_dialog_base.ui'))
 
 
 # =====================================================================
-#  Définition des sous-critères par dimension
+#  Définition des sous-critères par groupe (criteria.json)
 # =====================================================================
-SUB_CRITERIA = {
-    'eco': ['PIB', 'Infra', 'Resto', 'Touristes'],
-    'env': ['IQA', 'Ressources', 'Biodiversité'],
-    'soc': ['Sécurité', 'Santé', 'Pauvreté', 'PMR'],
-}
+# Enfants directs de chaque dimension et de chaque groupe imbriqué
+SUB_CRITERIA = {key: CRITERIA.child_names(key, 'short') for key in CRITERIA.groups}
+DIMENSION_NAMES = CRITERIA.dimension_names()
+
+# Graphiques tracés gardés en mémoire, et voisins tracés d'avance
+DEFAULT_CHART_CACHE = 16
+DEFAULT_CHART_PREFETCH = 1
+# Délai avant de retracer les aperçus après un redimensionnement (ms)
+PREVIEW_RESIZE_DELAY_MS = 150
 
-# RI (Random Index) pour matrices de taille n
-RI_TABLE = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12,
-            6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+
+def rgba_pixmap(preview, ratio=1.0):
+    """QPixmap d'un aperçu (octets RGBA, largeur, hauteur) de render_preview."""
+    rgba, width, height = preview
+    pixmap = QPixmap.fromImage(QImage(rgba, width, height, 4 * width, QImage.Format_RGBA8888))
+    pixmap.setDevicePixelRatio(ratio)
+    return pixmap
 
 
 class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
+    # Émis à chaque modification des poids AHP (dimensions ou sous-critères)
+    weightsChanged = pyqtSignal()
+
     def __init__(self, parent=None):
         super(SustainableZoneDialog, self).__init__(parent)
         self.setupUi(self)
@@ -39,9 +62,14 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
 
         self.mMapLayerComboBox.setFilters(QgsMapLayerProxyModel.VectorLayer)
         self.mMapLayerComboBox.layerChanged.connect(self.update_fields)
+        self.field_combos = {}         # { 'pib': QgsFieldComboBox, ... }
+        self._build_field_pickers()
         self.update_fields()
 
         # === AHP dimensions principales ===
+        self._repairs = {}             # { 'dim'|'eco'|...: correction suggérée }
+        self._repair_buttons = {'dim': self.btn_repair_cr}
+        self.btn_repair_cr.clicked.connect(lambda: self._apply_repair('dim'))
         self.spin_eco_env.valueChanged.connect(self.update_ahp_weights)
         self.spin_eco_soc.valueChanged.connect(self.update_ahp_weights)
         self.spin_env_soc.valueChanged.connect(self.update_ahp_weights)
@@ -56,32 +84,53 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
         self.chk_sub_ahp.stateChanged.connect(self._toggle_sub_ahp)
 
         # === Graph navigation ===
-        self._graph_paths = []
+        # Descripteurs (SustainableZone_charts.Chart), tracés à l'affichage
+        self._charts = []
         self._graph_index = 0
+        self._pixmaps = OrderedDict()   # { chart: (taille, QPixmap) } (LRU)
+        self._rendering = {}            # { chart: (taille, QgsTask) } tracés en cours
+        self._pixmap_cache_size = max(1, plugin_setting(
+            "chart_cache_size", DEFAULT_CHART_CACHE, int))
+        self._prefetch = max(0, plugin_setting("chart_prefetch", DEFAULT_CHART_PREFETCH, int))
         self.btn_graph_prev.clicked.connect(self.show_prev_graph)
         self.btn_graph_next.clicked.connect(self.show_next_graph)
 
+        # Aperçus tracés à la taille des encadrés, retracés quand elle change
+        self._compare_chart = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(PREVIEW_RESIZE_DELAY_MS)
+        self._resize_timer.timeout.connect(self._refresh_previews)
+        for label in (self.lbl_graph_display, self.lbl_compare_result):
+            # L'image suit l'encadré, pas l'inverse
+            label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+            label.installEventFilter(self)
+
         # Results storage
+        self._simulation_available = False
         self._results = []
 
+    # =================================================================
+    #  Champs des indicateurs (un sélecteur par indicateur du registre)
+    # =================================================================
+    def _build_field_pickers(self):
+        forms = {'eco': self.fl_eco, 'env': self.fl_env, 'soc': self.fl_soc}
+        for ind in CRITERIA.indicators:
+            combo = QgsFieldComboBox()
+            forms[ind['dimension']].addRow(f"{ind['label']} :", combo)
+            self.field_combos[ind['key']] = combo
+
+    def get_field_mapping(self):
+        """Champ choisi pour chaque indicateur ({clé: nom du champ})."""
+        return {key: combo.currentField() for key, combo in self.field_combos.items()}
+
     # =================================================================
     #  Champs auto-détection
     # =================================================================
     def update_fields(self):
         layer = self.mMapLayerComboBox.currentLayer()
-        mapping = {
-            self.mField_PIB:       ['pib', 'gdp', 'chiffre', 'affaire', 'revenu'],
-            self.mField_Infra:     ['infra', 'hotel', 'hebergement'],
-            self.mField_Resto:     ['resto', 'restaurant', 'cafe', 'terroir', 'artisan'],
-            self.mField_Touristes: ['tourist', 'visiteur'],
-            self.mField_IQA:       ['iqa', 'air', 'climat', 'meteo', 'qualit'],
-            self.mField_Ress:      ['ressource', 'nature', 'eau'],
-            self.mField_Bio:       ['bio', 'diversite', 'faune'],
-            self.mField_Secu:      ['secu', 'police', 'crime'],
-            self.mField_Sante:     ['sante', 'social', 'tradition'],
-            self.mField_Pauvrete:  ['pauvre', 'chomage', 'emploi'],
-            self.mField_PMR:       ['pmr', 'mobilite', 'accueil', 'handicap'],
-        }
+        mapping = {self.field_combos[ind['key']]: ind['keywords']
+                   for ind in CRITERIA.indicators}
         for combo in mapping.keys():
             combo.setLayer(layer)
             combo.setField(None)
@@ -105,33 +154,15 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
     @staticmethod
     def compute_ahp_generic(matrix):
         """Calcul AHP générique pour une matrice nxn.
-        Retourne (weights, CR).
+        Retourne (weights, CR). Voir SustainableZone_ahp.ahp.
         """
-        n = matrix.shape[0]
-        # Moyenne géométrique par ligne
-        geo_means = np.prod(matrix, axis=1) ** (1.0 / n)
-        weights = geo_means / geo_means.sum()
-
-        # Ratio de cohérence
-        Aw = matrix @ weights
-        lambda_max = np.mean(Aw / weights)
-        CI = (lambda_max - n) / max(n - 1, 1)
-        ri = RI_TABLE.get(n, 1.49)
-        CR = CI / ri if ri > 0 else 0.0
-        return weights, CR
+        return ahp(matrix)
 
     # =================================================================
     #  AHP dimensions principales (3×3)
     # =================================================================
     def compute_ahp(self, eco_env, eco_soc, env_soc):
-        eco_env = max(eco_env, 0.01)
-        eco_soc = max(eco_soc, 0.01)
-        env_soc = max(env_soc, 0.01)
-        M = np.array([
-            [1.0,         eco_env,     eco_soc],
-            [1.0/eco_env, 1.0,         env_soc],
-            [1.0/eco_soc, 1.0/env_soc, 1.0]
-        ])
+        M = pairwise_matrix(3, {(0, 1): eco_env, (0, 2): eco_soc, (1, 2): env_soc})
         return self.compute_ahp_generic(M)
 
     def update_ahp_weights(self):
@@ -144,12 +175,14 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
         self.lbl_weights_result.setText(
             f"Économie: {weights[0]:.3f}  |  Environnement: {weights[1]:.3f}  |  Social: {weights[2]:.3f}"
         )
-        if cr < 0.10:
-            self.lbl_cr.setText(f"CR : {cr:.3f} ✔ Cohérent")
-            self.lbl_cr.setStyleSheet("color: #27ae60; font-size: 11px;")
-        else:
-            self.lbl_cr.setText(f"CR : {cr:.3f} ✘ Incohérent (> 0.10)")
-            self.lbl_cr.setStyleSheet("color: #e74c3c; font-size: 11px;")
+        M = pairwise_matrix(3, dict(zip(upper_pairs(3), self.get_judgments())))
+        self._show_consistency('dim', M, cr, self.lbl_cr, 11)
+        self.weightsChanged.emit()
+
+    def get_judgments(self):
+        """Jugements par paires des dimensions (éco/env, éco/soc, env/soc)."""
+        return np.array([self.spin_eco_env.value(), self.spin_eco_soc.value(),
+                         self.spin_env_soc.value()])
 
     def get_weights(self):
         if hasattr(self, 'ahp_weights'):
@@ -160,20 +193,25 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
     #  AHP sous-critères — Construction dynamique des spinboxes
     # =================================================================
     def _build_sub_ahp_ui(self):
-        """Construit dynamiquement les GroupBox avec spinboxes pour chaque dimension."""
+        """Construit dynamiquement les GroupBox avec spinboxes pour chaque
+        dimension et chaque groupe imbriqué (ordre parent → enfants).
+        """
         if self._sub_ahp_built:
             return
 
         layout = self.vl_sub_ahp_content
 
-        dim_config = {
-            'eco': {'title': '📊 Économie — 4 sous-critères (6 paires)',
-                    'color': '#3498db', 'names': SUB_CRITERIA['eco']},
-            'env': {'title': '🌿 Environnement — 3 sous-critères (3 paires)',
-                    'color': '#27ae60', 'names': SUB_CRITERIA['env']},
-            'soc': {'title': '🤝 Social — 4 sous-critères (6 paires)',
-                    'color': '#f39c12', 'names': SUB_CRITERIA['soc']},
-        }
+        dimensions = {dim['key']: dim for dim in CRITERIA.dimensions}
+        dim_config = {}
+        for key, group in CRITERIA.groups.items():
+            dim = dimensions[group['dimension']]
+            names = SUB_CRITERIA[key]
+            n = len(names)
+            prefix = f"{dim['icon']}" if key == dim['key'] else f"↳ {dim['name']} ›"
+            dim_config[key] = {
+                'title': f"{prefix} {group['name']} — {n} sous-critères "
+                         f"({n * (n - 1) // 2} paires)",
+                'color': dim['color'], 'names': names}
 
         for dim_key, cfg in dim_config.items():
             names = cfg['names']
@@ -212,7 +250,8 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
                     spin.setDecimals(2)
                     spin.setValue(1.00)  # Poids égaux par défaut
                     spin.setFixedWidth(80)
-                    spin.valueChanged.connect(self._update_sub_ahp_weights)
+                    spin.valueChanged.connect(
+                        lambda _value, key=dim_key: self._update_sub_ahp_weights((key,)))
                     spinboxes[(i, j)] = spin
                     form.addRow(label_text, spin)
 
@@ -233,10 +272,18 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
             # Label CR
             lbl_cr = QLabel("CR : —")
             lbl_cr.setAlignment(Qt.AlignCenter)
+            lbl_cr.setWordWrap(True)
             lbl_cr.setStyleSheet("color:#7F8C8D; font-size:10px;")
             self._sub_ahp_cr_labels[dim_key] = lbl_cr
             grp_layout.addWidget(lbl_cr)
 
+            # Correction suggérée (visible si incohérent)
+            btn_repair = QPushButton("🩹 Appliquer la correction suggérée")
+            btn_repair.setVisible(False)
+            btn_repair.clicked.connect(lambda _checked, key=dim_key: self._apply_repair(key))
+            self._repair_buttons[dim_key] = btn_repair
+            grp_layout.addWidget(btn_repair)
+
             grp.setLayout(grp_layout)
             layout.addWidget(grp)
 
@@ -245,19 +292,15 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
 
     def _build_matrix_from_spinboxes(self, dim_key):
         """Reconstruit la matrice NxN à partir des spinboxes d'une dimension."""
-        names = SUB_CRITERIA[dim_key]
-        n = len(names)
-        M = np.ones((n, n))
         spinboxes = self._sub_ahp_spinboxes.get(dim_key, {})
-        for (i, j), spin in spinboxes.items():
-            val = max(spin.value(), 0.01)
-            M[i, j] = val
-            M[j, i] = 1.0 / val
-        return M
-
-    def _update_sub_ahp_weights(self):
-        """Recalcule les poids et CR pour chaque dimension de sous-critères."""
-        for dim_key in ['eco', 'env', 'soc']:
+        return pairwise_matrix(len(SUB_CRITERIA[dim_key]),
+                               {pair: spin.value() for pair, spin in spinboxes.items()})
+
+    def _update_sub_ahp_weights(self, dim_keys=None):
+        """Recalcule les poids et CR des groupes de sous-critères indiqués
+        (tous par défaut, seul celui modifié sinon).
+        """
+        for dim_key in dim_keys or SUB_CRITERIA:
             if dim_key not in self._sub_ahp_spinboxes:
                 continue
 
@@ -270,13 +313,59 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
             self._sub_ahp_labels[dim_key].setText(" | ".join(parts))
 
             # Afficher CR
-            lbl_cr = self._sub_ahp_cr_labels[dim_key]
-            if cr < 0.10:
-                lbl_cr.setText(f"CR : {cr:.3f} ✔ Cohérent")
-                lbl_cr.setStyleSheet("color: #27ae60; font-size: 10px;")
-            else:
-                lbl_cr.setText(f"CR : {cr:.3f} ✘ Incohérent (> 0.10)")
-                lbl_cr.setStyleSheet("color: #e74c3c; font-size: 10px;")
+            self._show_consistency(dim_key, M, cr, self._sub_ahp_cr_labels[dim_key], 10)
+        self.weightsChanged.emit()
+
+    # =================================================================
+    #  Diagnostic de cohérence — jugements fautifs et correction
+    # =================================================================
+    def _show_consistency(self, level, matrix, cr, lbl_cr, font_size):
+        """Affiche le CR ; si incohérent, la correction suggérée dans le
+        label et les jugements les plus incohérents dans son infobulle.
+        """
+        btn_repair = self._repair_buttons.get(level)
+        if is_consistent(cr):
+            self._repairs.pop(level, None)
+            lbl_cr.setText(f"CR : {cr:.3f} ✔ Cohérent")
+            lbl_cr.setStyleSheet(f"color: #27ae60; font-size: {font_size}px;")
+            lbl_cr.setToolTip("")
+            if btn_repair is not None:
+                btn_repair.setVisible(False)
+            return
+
+        names = DIMENSION_NAMES if level == 'dim' else SUB_CRITERIA[level]
+        repair = suggest_repairs(matrix)
+        self._repairs[level] = repair
+        text = f"CR : {cr:.3f} ✘ Incohérent (> 0.10)"
+        if repair['changes']:
+            parts = [f"{names[i]} / {names[j]} : {old:.2f} → {new:.2f}"
+                     for i, j, old, new in repair['changes']]
+            text += f"\nSuggestion : {' ; '.join(parts)} (CR {repair['cr']:.3f})"
+        lbl_cr.setText(text)
+        lbl_cr.setStyleSheet(f"color: #e74c3c; font-size: {font_size}px;")
+
+        contrib = inconsistency_contributions(matrix)
+        lines = [f"{names[i]} / {names[j]} : {share:.0%} (cohérent ≈ {value:.2f})"
+                 for (i, j), share, value in zip(contrib['pairs'][:3], contrib['share'],
+                                                 contrib['consistent'])]
+        lbl_cr.setToolTip("Jugements les plus incohérents :\n" + "\n".join(lines))
+        if btn_repair is not None:
+            btn_repair.setVisible(bool(repair['changes']))
+
+    def _apply_repair(self, level):
+        """Reporte la correction suggérée dans les spinboxes du niveau."""
+        repair = self._repairs.get(level)
+        if not repair:
+            return
+        if level == 'dim':
+            n, judgments = 3, self.get_judgments()
+        else:
+            n = len(SUB_CRITERIA[level])
+            judgments = self.get_sub_judgments()[level]
+        pairs = upper_pairs(n)
+        for i, j, _old, new in repair['changes']:
+            judgments[pairs.index((i, j))] = new
+        self.set_judgments(level, judgments)
 
     def _toggle_sub_ahp(self, state):
         """Affiche/masque le panneau AHP sous-critères."""
@@ -284,63 +373,222 @@ class SustainableZoneDialog(QtWidgets.QDialog, FORM_CLASS):
         if checked and not self._sub_ahp_built:
             self._build_sub_ahp_ui()
         self.scrollArea_sub_ahp.setVisible(checked)
+        self.weightsChanged.emit()
 
     # =================================================================
     #  Retourner les poids des sous-critères
     # =================================================================
+    def get_local_weights(self):
+        """Poids locaux AHP de chaque groupe ({groupe: poids des enfants}).
+        Vide si l'AHP détaillé est désactivé (poids égaux à chaque nœud).
+        """
+        if not (self.chk_sub_ahp.isChecked() and self._sub_ahp_built):
+            return {}
+        return {key: self.compute_ahp_generic(self._build_matrix_from_spinboxes(key))[0]
+                for key in SUB_CRITERIA}
+
     def get_sub_weights(self):
-        """Retourne les poids des sous-critères pour chaque dimension.
+        """Retourne les poids des sous-critères pour chaque dimension,
+        propagés dans l'arbre des critères depuis les poids locaux.
         Si AHP détaillé activé → poids calculés via AHP.
-        Sinon → poids égaux (moyenne simple).
+        Sinon → poids égaux à chaque nœud.
+        """
+        return TREE.sub_weights(self.get_local_weights())
+
+    def get_sub_judgments(self):
+        """Jugements par paires des sous-critères, par groupe, dans l'ordre
+        de upper_pairs (tous à 1 si l'AHP détaillé est désactivé).
+        """
+        judgments = {}
+        for dim_key, names in SUB_CRITERIA.items():
+            pairs = upper_pairs(len(names))
+            spinboxes = self._sub_ahp_spinboxes.get(dim_key, {})
+            if self.chk_sub_ahp.isChecked() and self._sub_ahp_built:
+                judgments[dim_key] = np.array([spinboxes[p].value() for p in pairs])
+            else:
+                judgments[dim_key] = np.ones(len(pairs))
+        return judgments
+
+    # =================================================================
+    #  AHP de groupe — report des jugements agrégés
+    # =================================================================
+    def get_group_method(self):
+        """Méthode d'agrégation choisie : 'aij' ou 'aip'."""
+        return 'aip' if self.cmb_group_method.currentIndex() == 1 else 'aij'
+
+    def set_judgments(self, level, judgments):
+        """Reporte des jugements (ordre upper_pairs) dans les spinboxes d'un
+        niveau ('dim' ou un groupe de sous-critères), puis recalcule une seule fois.
+        Les valeurs sont bornées à la plage des spinboxes (0.11 … 9).
         """
-        if self.chk_sub_ahp.isChecked() and self._sub_ahp_built:
-            w_eco, _ = self.compute_ahp_generic(self._build_matrix_from_spinboxes('eco'))
-            w_env, _ = self.compute_ahp_generic(self._build_matrix_from_spinboxes('env'))
-            w_soc, _ = self.compute_ahp_generic(self._build_matrix_from_spinboxes('soc'))
-            return w_eco, w_env, w_soc
+        if level == 'dim':
+            spins = [self.spin_eco_env, self.spin_eco_soc, self.spin_env_soc]
+        else:
+            if not self.chk_sub_ahp.isChecked():
+                self.chk_sub_ahp.setChecked(True)
+            self._build_sub_ahp_ui()
+            spinboxes = self._sub_ahp_spinboxes[level]
+            spins = [spinboxes[p] for p in upper_pairs(len(SUB_CRITERIA[level]))]
+        for spin, value in zip(spins, judgments):
+            spin.blockSignals(True)
+            spin.setValue(float(value))
+            spin.blockSignals(False)
+        if level == 'dim':
+            self.update_ahp_weights()
         else:
-            return (np.ones(4) / 4.0,
-                    np.ones(3) / 3.0,
-                    np.ones(4) / 4.0)
+            self._update_sub_ahp_weights((level,))
+
+    # =================================================================
+    #  Analyse en cours
+    # =================================================================
+    def set_running(self, running):
+        """Bloque le relancement pendant la tâche de fond, active Annuler."""
+        self.button_box.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(not running)
+        self.btn_cancel_analysis.setEnabled(running)
+        self.btn_monte_carlo.setEnabled(self._simulation_available and not running)
+        self.btn_sensitivity.setEnabled(self._simulation_available and not running)
+        self.btn_node_scores.setEnabled(self._simulation_available and not running)
+        if running:
+            self.btn_apply_weights.setEnabled(False)
+
+    def set_simulation_available(self, available):
+        """Simulations sur les poids possibles (résultats complets en mémoire)."""
+        self._simulation_available = available
+        self.btn_monte_carlo.setEnabled(available)
+        self.btn_sensitivity.setEnabled(available)
+        self.btn_node_scores.setEnabled(available)
+
+    def set_preview_pending(self, pending):
+        """Active l'enregistrement quand des scores recalculés attendent."""
+        self.btn_apply_weights.setEnabled(pending)
 
     # =================================================================
     #  Graphiques navigation
     # =================================================================
-    def set_graph_paths(self, paths):
-        self._graph_paths = paths
+    def set_charts(self, charts, index=0):
+        """Remplace la liste des graphiques ; les images déjà tracées des
+        graphiques conservés restent en mémoire.
+        """
+        self._charts = list(charts)
+        kept = set(self._charts)
+        for chart in [c for c in self._pixmaps if c not in kept]:
+            del self._pixmaps[chart]
         self._graph_index = 0
-        if paths:
-            self.show_graph(0)
+        self.btn_graph_export.setEnabled(bool(self._charts))
+        if self._charts:
+            self.show_graph(index)
+        else:
+            self.lbl_graph_display.clear()
+            self.lbl_graph_title.setText("")
 
     def show_graph(self, idx):
-        if not self._graph_paths:
+        """Affiche un graphique : aperçu en mémoire, sinon tracé en arrière-plan
+        (affiché à la fin du tracé). Les voisins sont tracés d'avance. Un
+        aperçu tracé à une autre taille reste affiché jusqu'au nouveau tracé.
+        """
+        if not self._charts:
             return
-        idx = idx % len(self._graph_paths)
+        idx = idx % len(self._charts)
         self._graph_index = idx
-        path = self._graph_paths[idx]
-        pixmap = QPixmap(path)
-        if not pixmap.isNull():
-            display_w = max(self.lbl_graph_display.width(), 580)
-            display_h = max(self.lbl_graph_display.height(), 400)
-            scaled = pixmap.scaled(
-                display_w, display_h,
-                Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            self.lbl_graph_display.setPixmap(scaled)
-        name = os.path.basename(path).replace('.png', '').replace('_', ' ').title()
-        self.lbl_graph_title.setText(f"{idx+1}/{len(self._graph_paths)} — {name}")
+        chart = self._charts[idx]
+        self.lbl_graph_title.setText(f"{idx+1}/{len(self._charts)} — {chart.title}")
+        size = self._preview_size(self.lbl_graph_display)
+        cached = self._pixmaps.get(chart)
+        if cached is not None:
+            self._pixmaps.move_to_end(chart)
+            self.lbl_graph_display.setPixmap(cached[1])
+        else:
+            self.lbl_graph_display.setText("⏳ Tracé du graphique...")
+        self._render_chart(chart, size)
+        for step in range(1, self._prefetch + 1):
+            for neighbour in (idx + step, idx - step):
+                self._render_chart(self._charts[neighbour % len(self._charts)], size)
+
+    def current_chart(self):
+        """Descripteur du graphique affiché, ou None."""
+        return self._charts[self._graph_index] if self._charts else None
+
+    def _preview_size(self, label):
+        """Taille de l'encadré en pixels physiques (écrans haute densité)."""
+        rect = label.contentsRect()
+        ratio = label.devicePixelRatioF()
+        return max(1, int(rect.width() * ratio)), max(1, int(rect.height() * ratio))
+
+    def _render_chart(self, chart, size):
+        """Lance le tracé de l'aperçu d'un graphique dans une QgsTask (sauf
+        s'il est déjà en mémoire ou en cours à cette taille).
+        """
+        if self._pixmaps.get(chart, (None,))[0] == size:
+            return
+        if self._rendering.get(chart, (None,))[0] == size:
+            return
+        task = QgsTask.fromFunction(
+            f"ADMC — graphique {chart.name}", lambda _task: render_preview(chart, *size),
+            on_finished=lambda exception, data=None: self._on_chart_rendered(
+                chart, size, exception, data))
+        self._rendering[chart] = (size, task)
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_chart_rendered(self, chart, size, exception, data):
+        if self._rendering.get(chart, (None,))[0] == size:
+            del self._rendering[chart]
+        current = self._charts[self._graph_index] if self._charts else None
+        if exception is not None or data is None:
+            if chart is current:
+                self.lbl_graph_display.setText(f"Erreur graphique : {exception}")
+            return
+        if chart not in self._charts:
+            return
+        pixmap = rgba_pixmap(data, self.lbl_graph_display.devicePixelRatioF())
+        self._pixmaps[chart] = (size, pixmap)
+        while len(self._pixmaps) > self._pixmap_cache_size:
+            self._pixmaps.popitem(last=False)
+        if chart is current:
+            self.lbl_graph_display.setPixmap(pixmap)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Resize and watched in (self.lbl_graph_display,
+                                                         self.lbl_compare_result):
+            self._resize_timer.start()
+        return super(SustainableZoneDialog, self).eventFilter(watched, event)
+
+    def _refresh_previews(self):
+        """Retrace les aperçus affichés à la nouvelle taille des encadrés."""
+        if self._charts:
+            self.show_graph(self._graph_index)
+        if self._compare_chart is not None:
+            self.show_compare(self._compare_chart)
 
     def show_prev_graph(self):
-        if self._graph_paths:
+        if self._charts:
             self.show_graph(self._graph_index - 1)
 
     def show_next_graph(self):
-        if self._graph_paths:
+        if self._charts:
             self.show_graph(self._graph_index + 1)
 
     # =================================================================
     #  Comparaison
     # =================================================================
+    def show_compare(self, chart):
+        """Trace la comparaison (figure radar modèle, rapide) à la taille de
+        l'encadré ; retracée si l'encadré change de taille.
+        """
+        self._compare_chart = chart
+        self.btn_compare_export.setEnabled(True)
+        size = self._preview_size(self.lbl_compare_result)
+        self.lbl_compare_result.setPixmap(rgba_pixmap(
+            render_preview(chart, *size), self.lbl_compare_result.devicePixelRatioF()))
+
+    def clear_compare(self, text=""):
+        self._compare_chart = None
+        self.btn_compare_export.setEnabled(False)
+        self.lbl_compare_result.setText(text)
+
+    def current_compare(self):
+        """Descripteur de la comparaison affichée, ou None."""
+        return self._compare_chart
+
     def populate_compare_combos(self, results):
         self._results = results
         self.combo_zone1.clear()
@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Moteur de calcul ADMC vectorisé
+ Normalisation, pondération AHP et classification en opérations NumPy
+ sur une matrice (n_entités × indicateurs de criteria.json). Sans
+ dépendance QGIS/Qt : ``score(X, config)`` est utilisable hors plugin
+ (scripts, processus).
+ ***************************************************************************/
+"""
+import numpy as np
+
+from .SustainableZone_criteria import load_criteria
+from .SustainableZone_tree import CriteriaTree
+
+# ========== CRITÈRES (criteria.json) ==========
+CRITERIA = load_criteria()
+TREE = CriteriaTree(CRITERIA)
+
+# Ordre des colonnes de la matrice d'indicateurs
+INDICATOR_KEYS = CRITERIA.keys
+NORMS = CRITERIA.norms
+INVERTED_MASK = CRITERIA.inverted
+INVERTED_CRITERIA = {k for k, inv in zip(INDICATOR_KEYS, INVERTED_MASK) if inv}
+
+# Colonnes de chaque dimension dans la matrice
+DIMENSION_SLICES = CRITERIA.slices
+
+# ========== CLASSES ==========
+CLASS_LABELS = ['Critique', 'Transition', 'Durable']
+CLASS_THRESHOLDS = (0.5, 0.8)
+
+ADVICE_MESSAGES = [
+    "URGENCE ÉCOLOGIQUE : biodiversité et qualité air.",
+    "RISQUE SOCIAL : sécurité, santé, accessibilité.",
+    "DÉFICIT ÉCO : infrastructures et attractivité.",
+    "SURCHAUFFE : limiter tourisme de masse.",
+    "Modèle équilibré : maintenir le cap.",
+]
+
+
+# ========== VALEURS SCALAIRES ==========
+def safe_float(val):
+    """Valeur numérique d'un attribut ; NULL, vide ou texte valent 0."""
+    try:
+        if val is None or val == "" or str(val).strip() == "NULL":
+            return 0.0
+        return float(val)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def norm_ratio(val, norm, invert=False):
+    """Ratio à la norme d'une valeur (1 - ratio, borné à 0, si inversé)."""
+    v = safe_float(val)
+    ratio = v / norm if norm > 0 else 0.0
+    if invert:
+        ratio = max(0.0, 1.0 - ratio)
+    return ratio
+
+
+def advice(n_eco, n_env, n_soc):
+    """Conseil pour une zone, d'après ses scores par dimension."""
+    return ADVICE_MESSAGES[int(advice_codes(np.array([[n_eco, n_env, n_soc]]))[0])]
+
+
+def class_label(id_global):
+    """Classe ADMC d'un indice global."""
+    return CLASS_LABELS[int(classify(np.array([id_global]))[0])]
+
+
+def to_float_column(values):
+    """Convertit une colonne de valeurs brutes en float64.
+    NULL, None, chaînes vides ou non numériques et NaN valent 0.
+    """
+    try:
+        col = np.asarray(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        col = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                col[i] = float(v)
+            except (ValueError, TypeError):
+                col[i] = 0.0
+    return np.nan_to_num(col, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def build_indicator_matrix(rows):
+    """Construit la matrice (n × indicateurs) à partir de lignes de valeurs brutes
+    ordonnées selon INDICATOR_KEYS.
+    """
+    n = len(rows)
+    if n == 0:
+        return np.zeros((0, len(INDICATOR_KEYS)))
+    try:
+        X = np.asarray(rows, dtype=np.float64)
+        return np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+    except (ValueError, TypeError):
+        # Valeurs hétérogènes (QVariant NULL, texte...) : conversion par colonne
+        cols = list(zip(*rows))
+        return np.column_stack([to_float_column(c) for c in cols])
+
+
+def normalize_matrix(X):
+    """Applique les normes et l'inversion des critères négatifs."""
+    R = X / NORMS
+    R[:, INVERTED_MASK] = np.maximum(0.0, 1.0 - R[:, INVERTED_MASK])
+    return R
+
+
+def sub_weight_matrix(*sub_weights):
+    """Matrice bloc-diagonale (indicateurs × dimensions) des poids des
+    sous-critères, un vecteur de poids par dimension.
+    """
+    W = np.zeros((len(INDICATOR_KEYS), len(DIMENSION_SLICES)))
+    for d, (key, w) in enumerate(zip(DIMENSION_SLICES, sub_weights)):
+        W[DIMENSION_SLICES[key], d] = w
+    return W
+
+
+def classify(id_global):
+    """Codes de classe (index dans CLASS_LABELS) selon les seuils."""
+    codes = np.zeros(len(id_global), dtype=np.int8)
+    codes[id_global >= CLASS_THRESHOLDS[0]] = 1
+    codes[id_global >= CLASS_THRESHOLDS[1]] = 2
+    return codes
+
+
+def advice_codes(dims):
+    """Codes de conseil (index dans ADVICE_MESSAGES), par ordre de priorité :
+    environnement, social, économie, surchauffe touristique.
+    """
+    n_eco, n_env, n_soc = dims[:, 0], dims[:, 1], dims[:, 2]
+    return np.select(
+        [n_env < 0.5, n_soc < 0.5, n_eco < 0.5, (n_eco > 1.2) & (n_env < 0.8)],
+        [0, 1, 2, 3], default=4).astype(np.int8)
+
+
+def score_matrix(X, sub_weights, dim_weights):
+    """Calcule tous les scores ADMC pour une matrice d'indicateurs.
+
+    :param X: matrice brute (n × indicateurs), colonnes selon INDICATOR_KEYS.
+    :param sub_weights: (w_eco, w_env, w_soc) poids des sous-critères.
+    :param dim_weights: poids AHP des 3 dimensions.
+    :returns: dict de tableaux : 'subs' (n × indicateurs), 'dims' (n × 3),
+        'weighted' (n × 3), 'id_global', 'classes', 'advice'.
+    """
+    subs = normalize_matrix(np.asarray(X, dtype=np.float64))
+    return score_normalized(subs, sub_weights, dim_weights)
+
+
+def score_normalized(subs, sub_weights, dim_weights):
+    """Comme score_matrix, à partir de la matrice déjà normalisée.
+
+    Id_Global est un seul produit matrice × poids globaux des indicateurs.
+    """
+    W = sub_weight_matrix(*sub_weights)
+    dim_weights = np.asarray(dim_weights, dtype=np.float64)
+    dims = subs @ W
+    weighted = dims * dim_weights
+    id_global = subs @ (W @ dim_weights)
+    return {
+        'subs': subs,
+        'dims': dims,
+        'weighted': weighted,
+        'id_global': id_global,
+        'classes': classify(id_global),
+        'advice': advice_codes(dims),
+    }
+
+
+def uniform_sub_weights():
+    """Poids des sous-critères à jugements égaux à chaque nœud de l'arbre
+    (AHP détaillé désactivé).
+    """
+    return TREE.sub_weights()
+
+
+def score(X, config=None):
+    """Point d'entrée sans QGIS : scores ADMC d'une matrice d'indicateurs.
+
+    :param X: matrice (n × indicateurs) ou lignes de valeurs brutes, colonnes
+        selon INDICATOR_KEYS (NULL, texte et NaN valent 0).
+    :param config: dict optionnel :
+        'dim_weights' (poids des 3 dimensions, égaux par défaut),
+        'sub_weights' (poids des sous-critères, égaux par défaut),
+        'names', 'fids' et 'dtype' (voir ResultsStore).
+    :returns: ResultsStore.
+    """
+    config = config or {}
+    if not isinstance(X, np.ndarray) or X.dtype == object:
+        X = build_indicator_matrix(X)
+    if config.get('sub_weights') is not None:
+        sub_weights = config['sub_weights']
+    else:
+        sub_weights = uniform_sub_weights()
+    dim_weights = config.get('dim_weights')
+    if dim_weights is None:
+        dim_weights = np.ones(3) / 3.0
+    scores = score_matrix(X, sub_weights, dim_weights)
+    names = config.get('names')
+    if names is None:
+        names = [f"Entité {i}" for i in range(len(scores['id_global']))]
+    return ResultsStore.from_scores(scores, names, config.get('fids'),
+                                    config.get('dtype', np.float64))
+
+
+# ========== RÉSULTATS EN COLONNES ==========
+# Colonnes exposées par clé (compatibles avec les anciens dictionnaires par zone)
+_DIM_KEYS = {'norm_eco': 0, 'norm_env': 1, 'norm_soc': 2}
+_WEIGHTED_KEYS = {'ws_eco': 0, 'ws_env': 1, 'ws_soc': 2}
+_SUB_KEYS = {'subs_eco': 'eco', 'subs_env': 'env', 'subs_soc': 'soc'}
+
+
+def _pack_strings(strings):
+    """Table de chaînes : un bloc UTF-8 et les positions de début/fin."""
+    encoded = [str(x).encode('utf-8') for x in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return b''.join(encoded), offsets
+
+
+class ResultsStore:
+    """Résultats d'une analyse ADMC stockés en colonnes NumPy.
+
+    Une ligne par zone : sous-critères normalisés (n × indicateurs), scores par
+    dimension (n × 3), scores pondérés (n × 3), Id_Global, codes de classe
+    et de conseil (index dans CLASS_LABELS / ADVICE_MESSAGES). Les noms
+    sont rangés dans une table de chaînes. ``dtype=np.float32`` divise par
+    deux la mémoire des colonnes de scores.
+    """
+
+    def __init__(self, names, subs, dims, weighted, id_global, classes, advice,
+                 fids=None, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        if isinstance(names, tuple):
+            self._names_blob, self._name_offsets = names
+        else:
+            self._names_blob, self._name_offsets = _pack_strings(names)
+        self.subs = np.asarray(subs, dtype=self.dtype)
+        self.dims = np.asarray(dims, dtype=self.dtype)
+        self.weighted = np.asarray(weighted, dtype=self.dtype)
+        self.id_global = np.asarray(id_global, dtype=self.dtype)
+        self.classes = np.asarray(classes, dtype=np.int8)
+        self.advice = np.asarray(advice, dtype=np.int8)
+        self.fids = None if fids is None else np.asarray(fids, dtype=np.int64)
+
+    @classmethod
+    def from_scores(cls, scores, names, fids=None, dtype=np.float64):
+        """Construit le store à partir de la sortie de score_matrix."""
+        return cls(names, scores['subs'], scores['dims'], scores['weighted'],
+                   scores['id_global'], scores['classes'], scores['advice'],
+                   fids, dtype)
+
+    @classmethod
+    def from_records(cls, records, dtype=np.float64):
+        """Construit le store à partir d'une liste de dictionnaires par zone."""
+        n = len(records)
+        subs = np.zeros((n, len(INDICATOR_KEYS)))
+        for i, r in enumerate(records):
+            for key, dim in _SUB_KEYS.items():
+                subs[i, DIMENSION_SLICES[dim]] = r[key]
+        return cls(
+            [r['name'] for r in records], subs,
+            [[r[k] for k in _DIM_KEYS] for r in records] or np.zeros((0, 3)),
+            [[r[k] for k in _WEIGHTED_KEYS] for r in records] or np.zeros((0, 3)),
+            [r['id_global'] for r in records],
+            [CLASS_LABELS.index(r['classe']) for r in records],
+            [ADVICE_MESSAGES.index(r['conseil']) for r in records],
+            dtype=dtype)
+
+    def __len__(self):
+        return len(self.id_global)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+    # ----- Colonnes -----
+    def name(self, i):
+        start, end = self._name_offsets[i], self._name_offsets[i + 1]
+        return self._names_blob[start:end].decode('utf-8')
+
+    def names(self):
+        return [self.name(i) for i in range(len(self))]
+
+    def column(self, key):
+        """Colonne par clé : 'norm_eco', 'ws_soc', 'id_global', 'subs_env'..."""
+        if key in _DIM_KEYS:
+            return self.dims[:, _DIM_KEYS[key]]
+        if key in _WEIGHTED_KEYS:
+            return self.weighted[:, _WEIGHTED_KEYS[key]]
+        if key in _SUB_KEYS:
+            return self.subs[:, DIMENSION_SLICES[_SUB_KEYS[key]]]
+        if key == 'id_global':
+            return self.id_global
+        raise KeyError(key)
+
+    def class_labels(self):
+        return [CLASS_LABELS[c] for c in self.classes]
+
+    def stats(self):
+        """Effectifs par classe, au format du dictionnaire ``stats``."""
+        counts = np.bincount(self.classes, minlength=len(CLASS_LABELS))
+        return {lbl: int(counts[c]) for c, lbl in reversed(list(enumerate(CLASS_LABELS)))}
+
+    @property
+    def nbytes(self):
+        arrays = [self.subs, self.dims, self.weighted, self.id_global,
+                  self.classes, self.advice, self._name_offsets]
+        if self.fids is not None:
+            arrays.append(self.fids)
+        return sum(a.nbytes for a in arrays) + len(self._names_blob)
+
+    # ----- Lignes -----
+    def row(self, i):
+        """Vue sur une zone, lisible comme l'ancien dictionnaire de résultats."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return ZoneRow(self, i)
+
+    def take(self, indices):
+        """Sous-ensemble de zones (dans l'ordre de ``indices``)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        names = [self.name(i) for i in indices]
+        return ResultsStore(
+            names, self.subs[indices], self.dims[indices], self.weighted[indices],
+            self.id_global[indices], self.classes[indices], self.advice[indices],
+            None if self.fids is None else self.fids[indices], self.dtype)
+
+    # ----- Sauvegarde -----
+    def save(self, path):
+        """Écrit les colonnes dans un fichier .npz (sans pickle)."""
+        arrays = dict(subs=self.subs, dims=self.dims, weighted=self.weighted,
+                      id_global=self.id_global, classes=self.classes, advice=self.advice,
+                      names=np.frombuffer(self._names_blob, dtype=np.uint8),
+                      name_offsets=self._name_offsets)
+        if self.fids is not None:
+            arrays['fids'] = self.fids
+        with open(path, 'wb') as fh:
+            np.savez(fh, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            names = (data['names'].tobytes(), data['name_offsets'])
+            fids = data['fids'] if 'fids' in data.files else None
+            return cls(names, data['subs'], data['dims'], data['weighted'],
+                       data['id_global'], data['classes'], data['advice'],
+                       fids, data['id_global'].dtype)
+
+    # ----- Recalcul -----
+    def rescore(self, sub_weights, dim_weights):
+        """Scores pour de nouveaux poids, à partir des sous-critères stockés."""
+        return score_normalized(self.subs.astype(np.float64), sub_weights, dim_weights)
+
+    def with_scores(self, scores):
+        """Nouveau store partageant noms et identifiants, avec d'autres scores."""
+        return ResultsStore(
+            (self._names_blob, self._name_offsets), scores['subs'], scores['dims'],
+            scores['weighted'], scores['id_global'], scores['classes'],
+            scores['advice'], self.fids, self.dtype)
+
+
+class ZoneRow:
+    """Vue (lecture seule) sur une ligne de ResultsStore."""
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        store, i = self.store, self.index
+        if key == 'name':
+            return store.name(i)
+        if key == 'classe':
+            return CLASS_LABELS[store.classes[i]]
+        if key == 'conseil':
+            return ADVICE_MESSAGES[store.advice[i]]
+        if key in _SUB_KEYS:
+            return store.column(key)[i].tolist()
+        return float(store.column(key)[i])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+# ========== AGRÉGATS (MODE FLUX) ==========
+HIST_EDGES = np.linspace(0.0, 2.0, 41)
+DEFAULT_TOP_K = 25
+
+
+class ScoreAggregator:
+    """Agrégats compacts d'une analyse traitée par blocs.
+
+    Ne conserve que les effectifs par classe, l'histogramme de Id_Global,
+    des sommes pour les moyennes et les ``top_k`` meilleures et pires zones :
+    la mémoire reste bornée quelle que soit la taille de la couche.
+    """
+
+    def __init__(self, top_k=DEFAULT_TOP_K, hist_edges=HIST_EDGES):
+        self.top_k = max(1, int(top_k))
+        self.hist_edges = np.asarray(hist_edges, dtype=np.float64)
+        self.count = 0
+        self.class_counts = np.zeros(len(CLASS_LABELS), dtype=np.int64)
+        self.hist = np.zeros(len(self.hist_edges) - 1, dtype=np.int64)
+        self.dim_sums = np.zeros(3)
+        self.id_min = np.inf
+        self.id_max = -np.inf
+        self._best = None
+        self._worst = None
+
+    def update(self, scores, names):
+        """Intègre un bloc de scores (sortie de score_matrix) et ses noms."""
+        n = len(scores['id_global'])
+        if n == 0:
+            return
+        id_global = scores['id_global']
+        self.class_counts += np.bincount(scores['classes'], minlength=len(CLASS_LABELS))
+        clipped = np.clip(id_global, self.hist_edges[0], self.hist_edges[-1])
+        self.hist += np.histogram(clipped, bins=self.hist_edges)[0]
+        self.dim_sums += scores['dims'].sum(axis=0)
+        self.id_min = min(self.id_min, float(id_global.min()))
+        self.id_max = max(self.id_max, float(id_global.max()))
+
+        block = {
+            'row': np.arange(self.count, self.count + n),
+            'name': np.asarray(names, dtype=object),
+            'subs': scores['subs'], 'dims': scores['dims'],
+            'weighted': scores['weighted'], 'id_global': id_global,
+            'classes': scores['classes'], 'advice': scores['advice'],
+        }
+        self._best = self._keep(self._best, block, largest=True)
+        self._worst = self._keep(self._worst, block, largest=False)
+        self.count += n
+
+    def _keep(self, kept, block, largest):
+        if kept is not None:
+            block = {k: np.concatenate([kept[k], block[k]]) for k in block}
+        key = -block['id_global'] if largest else block['id_global']
+        if len(key) > self.top_k:
+            sel = np.argpartition(key, self.top_k - 1)[:self.top_k]
+        else:
+            sel = np.arange(len(key))
+        sel = sel[np.argsort(key[sel], kind='stable')]
+        return {k: v[sel] for k, v in block.items()}
+
+    def stats(self):
+        """Effectifs par classe, au format du dictionnaire ``stats``."""
+        return {lbl: int(self.class_counts[c])
+                for c, lbl in reversed(list(enumerate(CLASS_LABELS)))}
+
+    def dim_means(self):
+        return self.dim_sums / max(self.count, 1)
+
+    def top_records(self):
+        """Meilleures puis pires zones (sans doublon), triées par Id_Global
+        décroissant, dans un ResultsStore.
+        """
+        parts = [kept for kept in (self._best, self._worst) if kept is not None]
+        if not parts:
+            return ResultsStore([], np.zeros((0, len(INDICATOR_KEYS))), np.zeros((0, 3)),
+                                np.zeros((0, 3)), [], [], [])
+        merged = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+        _, first = np.unique(merged['row'], return_index=True)
+        order = first[np.argsort(-merged['id_global'][first], kind='stable')]
+        return ResultsStore.from_scores(
+            {k: v[order] for k, v in merged.items()}, merged['name'][order])
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - AHP de groupe
+ Lecture des formulaires d'experts (CSV ou JSON) et agrégation par moyenne
+ géométrique, des jugements (AIJ) ou des priorités (AIP), sans dépendance
+ QGIS/Qt.
+ ***************************************************************************/
+"""
+import csv
+import json
+import os
+
+import numpy as np
+
+from .SustainableZone_ahp import (
+    MIN_JUDGMENT, ahp, ahp_batch, is_consistent, pairwise_matrices, upper_pairs
+)
+from .SustainableZone_engine import TREE
+
+# Nœuds de la hiérarchie (racine, dimensions, groupes imbriqués) et
+# taille de leur matrice de comparaison
+GROUP_LEVELS = TREE.group_sizes()
+
+AGGREGATION_METHODS = ('aij', 'aip')
+EXPERT_COLUMN = 'expert'
+
+
+def parse_judgment(text):
+    """Jugement saisi dans un formulaire : « 3 », « 0,5 » ou « 1/3 ».
+    Retourne NaN pour une case vide (ou ``null`` en JSON).
+    """
+    if text is None:
+        return np.nan
+    text = str(text).strip().replace(',', '.')
+    if not text:
+        return np.nan
+    if '/' in text:
+        num, den = text.split('/', 1)
+        return float(num) / float(den)
+    return float(text)
+
+
+def column_name(level, i, j):
+    """Colonne CSV du jugement (i, j) d'un niveau, indices à partir de 1
+    (ex. ``eco_1_2`` : PIB / Infra).
+    """
+    return f"{level}_{i + 1}_{j + 1}"
+
+
+def _empty_levels(count):
+    return {level: np.full((count, len(upper_pairs(n))), np.nan)
+            for level, n in GROUP_LEVELS.items()}
+
+
+def read_csv(path):
+    """Formulaires au format large : une ligne par expert, une colonne par
+    jugement (``dim_1_2``, ``eco_1_2``, …) et une colonne ``expert``
+    facultative. Séparateur « , », « ; » ou tabulation.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        sample = fh.read(4096)
+        fh.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        rows = list(csv.DictReader(fh, dialect=dialect))
+
+    experts = []
+    levels = _empty_levels(len(rows))
+    for r, row in enumerate(rows):
+        row = {(k or '').strip().lower(): v for k, v in row.items()}
+        experts.append((row.get(EXPERT_COLUMN) or '').strip() or f"Expert {r + 1}")
+        for level, n in GROUP_LEVELS.items():
+            for k, (i, j) in enumerate(upper_pairs(n)):
+                value = row.get(column_name(level, i, j))
+                if value is not None:
+                    levels[level][r, k] = parse_judgment(value)
+    return experts, levels
+
+
+def _json_judgments(value, n):
+    """Jugements du triangle supérieur (ordre upper_pairs) d'un niveau :
+    matrice complète n × n, lignes du triangle supérieur (longueurs n-1 … 1)
+    ou liste à plat.
+    """
+    rows = [[parse_judgment(v) for v in line] if isinstance(line, list)
+            else [parse_judgment(line)] for line in value]
+    if len(rows) == n and all(len(row) == n for row in rows):
+        return np.array(rows, dtype=np.float64)[np.triu_indices(n, 1)]
+    return np.array([v for row in rows for v in row], dtype=np.float64)
+
+
+def read_json(path):
+    """Liste d'experts (ou ``{"experts": [...]}``), chacun un objet avec
+    ``expert`` et, par niveau, la matrice complète, les lignes du triangle
+    supérieur ou ses jugements à plat dans l'ordre de upper_pairs. Une
+    valeur ``null`` est une réponse manquante.
+    """
+    with open(path, encoding='utf-8') as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get('experts', [])
+
+    experts = []
+    levels = _empty_levels(len(data))
+    for r, entry in enumerate(data):
+        experts.append(str(entry.get(EXPERT_COLUMN) or entry.get('name') or f"Expert {r + 1}"))
+        for level, n in GROUP_LEVELS.items():
+            if entry.get(level) is None:
+                continue
+            values = _json_judgments(entry[level], n)
+            if len(values) != levels[level].shape[1]:
+                raise ValueError(f"{experts[-1]} : {len(values)} jugements pour "
+                                 f"le niveau « {level} » ({levels[level].shape[1]} attendus)")
+            levels[level][r] = values
+    return experts, levels
+
+
+def read_expert_judgments(path):
+    """Formulaires d'experts d'un fichier CSV ou JSON.
+
+    :returns: (noms des experts, dict niveau → jugements (experts × paires),
+        NaN pour les réponses manquantes).
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        return read_json(path)
+    return read_csv(path)
+
+
+def aggregate(upper, n, method='aij', drop_inconsistent=False):
+    """Agrège les jugements d'un niveau.
+
+    Les formulaires incomplets sont ignorés. AIJ : moyenne géométrique des
+    jugements, puis AHP sur la matrice agrégée. AIP : AHP par expert, puis
+    moyenne géométrique des vecteurs de priorités.
+
+    :param upper: jugements (experts × n(n-1)/2), ordre de upper_pairs.
+    :returns: dict 'weights', 'judgments' (triangle supérieur de la matrice
+        de groupe ; rapports w_i / w_j en AIP), 'cr' (matrice de groupe),
+        'expert_cr' (NaN si formulaire incomplet), 'kept' (experts retenus).
+    """
+    if method not in AGGREGATION_METHODS:
+        raise ValueError(f"Méthode d'agrégation inconnue : {method}")
+    upper = np.asarray(upper, dtype=np.float64)
+    complete = ~np.isnan(upper).any(axis=1)
+    log_upper = np.log(np.maximum(np.where(complete[:, None], upper, 1.0), MIN_JUDGMENT))
+
+    weights, expert_cr = ahp_batch(pairwise_matrices(n, np.exp(log_upper)))
+    expert_cr = np.where(complete, expert_cr, np.nan)
+    kept = complete & is_consistent(np.nan_to_num(expert_cr)) if drop_inconsistent else complete
+    if not kept.any():
+        raise ValueError("Aucun formulaire complet et cohérent")
+
+    if method == 'aij':
+        judgments = np.exp(log_upper[kept].mean(axis=0))
+    else:
+        group_w = np.exp(np.log(weights[kept]).mean(axis=0))
+        rows, cols = np.triu_indices(n, 1)
+        judgments = group_w[rows] / group_w[cols]
+    group_weights, cr = ahp(pairwise_matrices(n, judgments[None])[0])
+    return {
+        'weights': group_weights,
+        'judgments': judgments,
+        'cr': float(cr),
+        'expert_cr': expert_cr,
+        'kept': kept,
+    }
+
+
+def group_ahp(path, method='aij', drop_inconsistent=False):
+    """Agrège un fichier de formulaires pour chaque niveau renseigné.
+
+    Un niveau sans formulaire exploitable (tous incomplets ou incohérents)
+    est écarté sans empêcher l'import des autres.
+
+    :returns: (noms des experts, dict niveau → résultat de ``aggregate``,
+        dict niveau écarté → motif).
+    """
+    experts, levels = read_expert_judgments(path)
+    results, skipped = {}, {}
+    for level, upper in levels.items():
+        if np.isnan(upper).all():
+            continue
+        try:
+            results[level] = aggregate(upper, GROUP_LEVELS[level], method, drop_inconsistent)
+        except ValueError as e:
+            skipped[level] = str(e)
+    if not results:
+        reasons = "; ".join(f"{level} : {reason}" for level, reason in skipped.items())
+        raise ValueError("Aucun jugement exploitable dans le fichier"
+                         + (f" ({reasons})" if reasons else ""))
+    return experts, results, skipped
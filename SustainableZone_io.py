@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Lecture / écriture des attributs de la couche
+ Requêtes de lecture sans géométrie et écriture groupée des résultats
+ via le fournisseur de données.
+ ***************************************************************************/
+"""
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import (
+    QgsFeatureRequest, QgsField, QgsSettings, QgsTransaction,
+    QgsVectorDataProvider
+)
+
+SETTINGS_PREFIX = "SustainableZone/"
+
+# Champs résultats écrits dans la couche (ordre des valeurs de ResultWriter.add)
+RESULT_FIELDS = [
+    ("Score_Eco", QVariant.Double),
+    ("Score_Env", QVariant.Double),
+    ("Score_Soc", QVariant.Double),
+    ("Id_Global", QVariant.Double),
+    ("Classe_ADMC", QVariant.String),
+    ("Conseil", QVariant.String),
+]
+
+# Champs de la simulation Monte-Carlo des poids (noms ≤ 10 caractères)
+UNCERTAINTY_FIELDS = [
+    ("MC_P_Dur", QVariant.Double),
+    ("MC_P_Tra", QVariant.Double),
+    ("MC_P_Cri", QVariant.Double),
+    ("MC_Id_Moy", QVariant.Double),
+    ("MC_Id_P05", QVariant.Double),
+    ("MC_Id_P95", QVariant.Double),
+    ("MC_Rg_Min", QVariant.Int),
+    ("MC_Rg_Max", QVariant.Int),
+]
+
+# Préfixe des champs de scores des nœuds de l'arbre des critères
+NODE_FIELD_PREFIX = "N_"
+
+
+def node_fields(nodes):
+    """Champs des scores (ratio à la norme) des nœuds indiqués, ``N_<clé>``
+    tronqué à 10 caractères. Deux clés de même début reçoivent des noms
+    distincts (suffixe numérique : ``N_transpor``, ``N_transpo2``...).
+    """
+    names = []
+    for key in nodes:
+        name = (NODE_FIELD_PREFIX + key)[:10]
+        suffix = 2
+        while name in names:
+            name = (NODE_FIELD_PREFIX + key)[:10 - len(str(suffix))] + str(suffix)
+            suffix += 1
+        names.append(name)
+    return [(name, QVariant.Double) for name in names]
+
+
+DEFAULT_WRITE_CHUNK = 5000
+# Au-delà de ce nombre d'entités, l'analyse passe en mode flux (par blocs)
+DEFAULT_STREAMING_THRESHOLD = 100000
+DEFAULT_STREAM_BLOCK = 10000
+
+
+def plugin_setting(key, default, type_=None):
+    """Lit un réglage du plugin (QgsSettings, préfixe SustainableZone/)."""
+    value = QgsSettings().value(SETTINGS_PREFIX + key, default)
+    if type_ is bool and isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'oui')
+    if type_ is not None:
+        try:
+            return type_(value)
+        except (ValueError, TypeError):
+            return default
+    return value
+
+
+def ensure_result_fields(layer, fields=None):
+    """Ajoute les champs résultats manquants à la couche."""
+    missing = [QgsField(name, qtype) for name, qtype in (fields or RESULT_FIELDS)
+               if layer.fields().indexOf(name) == -1]
+    if missing:
+        layer.dataProvider().addAttributes(missing)
+        layer.updateFields()
+
+
+def scoring_request(layer, field_names):
+    """Requête de lecture sans géométrie, limitée aux champs utiles.
+    Le premier attribut (nom de la zone) est toujours inclus.
+    """
+    fields = layer.fields()
+    idx = {fields.indexOf(name) for name in field_names if name}
+    idx.discard(-1)
+    if fields.count():
+        idx.add(0)
+    request = QgsFeatureRequest()
+    request.setFlags(QgsFeatureRequest.NoGeometry)
+    request.setSubsetOfAttributes(sorted(idx))
+    return request
+
+
+def indicator_indices(layer, ui, keys):
+    """Index des champs choisis pour chaque indicateur (-1 si absent)."""
+    fields = layer.fields()
+    return [fields.indexOf(ui[k]) if ui.get(k) else -1 for k in keys]
+
+
+def indicator_rows(features, idx):
+    """Valeurs brutes des indicateurs, une ligne par entité."""
+    rows = []
+    for f in features:
+        attrs = f.attributes()
+        rows.append([attrs[i] if i >= 0 else 0.0 for i in idx])
+    return rows
+
+
+def iter_blocks(source, request, block_size):
+    """Parcourt les entités de la requête par listes de ``block_size``.
+    ``source`` : couche ou QgsVectorLayerFeatureSource.
+    """
+    block = []
+    for f in source.getFeatures(request):
+        block.append(f)
+        if len(block) >= block_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+class ResultWriter:
+    """Écrit les résultats par paquets de ``chunk_size`` entités.
+
+    Mode groupé : un appel ``dataProvider().changeAttributeValues`` par
+    paquet, dans une seule transaction quand le fournisseur le permet.
+    Mode tampon d'édition : utilisé si le fournisseur ne sait pas modifier
+    les attributs directement, ou si la couche est déjà en cours d'édition.
+    Seule une session d'édition ouverte par l'écrivain est validée ou
+    annulée ; dans une session de l'utilisateur, les valeurs forment une
+    commande d'édition (annulable seule), sans toucher à ses autres
+    modifications en attente.
+    ``fields`` : champs écrits (RESULT_FIELDS par défaut).
+    """
+
+    def __init__(self, layer, chunk_size=None, fields=None):
+        self.layer = layer
+        if chunk_size is None:
+            chunk_size = plugin_setting("write_chunk_size", DEFAULT_WRITE_CHUNK, int)
+        self.chunk_size = max(1, int(chunk_size))
+        self.provider = layer.dataProvider()
+        caps = self.provider.capabilities()
+        self.bulk = (bool(caps & QgsVectorDataProvider.ChangeAttributeValues)
+                     and not layer.isEditable())
+        self._field_idx = [layer.fields().indexOf(name)
+                           for name, _ in (fields or RESULT_FIELDS)]
+        self._pending = {}
+        self._transaction = None
+        self._started_editing = False
+        self._edit_command = False
+        self.written = 0
+
+    def begin(self):
+        if not self.bulk:
+            if self.layer.isEditable():
+                self.layer.beginEditCommand("Résultats ADMC")
+                self._edit_command = True
+            else:
+                self._started_editing = self.layer.startEditing()
+            return
+        if QgsTransaction.supportsTransaction(self.layer):
+            transaction = QgsTransaction.create({self.layer})
+            if transaction is not None:
+                ok, _ = transaction.begin()
+                if ok:
+                    self._transaction = transaction
+
+    def add(self, fid, values):
+        """Ajoute les valeurs (ordre des champs) d'une entité."""
+        self._pending[fid] = dict(zip(self._field_idx, values))
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        if self.bulk:
+            if not self.provider.changeAttributeValues(self._pending):
+                errors = "; ".join(self.provider.errors()) or "erreur inconnue"
+                raise IOError(f"Écriture des attributs refusée : {errors}")
+        else:
+            for fid, attrs in self._pending.items():
+                self.layer.changeAttributeValues(fid, attrs)
+        self.written += len(self._pending)
+        self._pending = {}
+
+    def commit(self):
+        self.flush()
+        if not self.bulk:
+            if self._edit_command:
+                # Session de l'utilisateur : il validera lui-même
+                self.layer.endEditCommand()
+                self._edit_command = False
+            elif self._started_editing:
+                self._started_editing = False
+                if not self.layer.commitChanges():
+                    errors = "; ".join(self.layer.commitErrors()) or "erreur inconnue"
+                    raise IOError(f"Échec de l'enregistrement : {errors}")
+            return
+        if self._transaction is not None:
+            ok, err = self._transaction.commit()
+            self._transaction = None
+            if not ok:
+                raise IOError(f"Échec de la transaction : {err}")
+        self.layer.reload()
+
+    def rollback(self):
+        self._pending = {}
+        if not self.bulk:
+            if self._edit_command:
+                self.layer.destroyEditCommand()
+                self._edit_command = False
+            elif self._started_editing:
+                self.layer.rollBack()
+                self._started_editing = False
+        elif self._transaction is not None:
+            self._transaction.rollback()
+            self._transaction = None
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Journal de l'analyse
+ Console HTML tamponnée (rafraîchie quelques fois par seconde) et
+ journal par zone plafonné, avec copie complète optionnelle sur disque.
+ ***************************************************************************/
+"""
+import os
+import re
+import tempfile
+
+from qgis.PyQt.QtCore import QTimer
+
+DEFAULT_FLUSH_MS = 250
+# Au-delà de ce nombre de zones, la console n'affiche que le bilan
+DEFAULT_ZONE_LINES = 200
+DEFAULT_LOG_FILE = os.path.join(tempfile.gettempdir(), "SustainableZone_admc.log")
+
+_TAGS = re.compile(r'<[^>]+>')
+
+
+class ConsoleLog:
+    """Tampon des messages HTML d'un QTextBrowser.
+
+    Les messages sont accumulés puis ajoutés en un seul bloc au plus toutes
+    les ``interval_ms`` millisecondes, au lieu d'un bloc par message.
+    """
+
+    def __init__(self, browser, interval_ms=DEFAULT_FLUSH_MS):
+        self.browser = browser
+        self._buffer = []
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(0, int(interval_ms)))
+        self._timer.timeout.connect(self.flush)
+
+    def write(self, html):
+        self._buffer.append(html)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        if self._buffer:
+            self.browser.append("<br>".join(self._buffer))
+            self._buffer = []
+
+    def clear(self):
+        self._timer.stop()
+        self._buffer = []
+        self.browser.clear()
+
+
+class ZoneLog:
+    """Politique du journal par zone d'une analyse.
+
+    Les lignes par zone vont à la console tant que la couche compte au plus
+    ``max_lines`` zones (sinon bilan seul), et toutes vers ``file_path``
+    en texte brut si un fichier est demandé.
+    """
+
+    def __init__(self, n_zones, max_lines=DEFAULT_ZONE_LINES, file_path=None):
+        self.max_lines = max(0, int(max_lines))
+        self.console = 0 <= n_zones <= self.max_lines
+        self.file_path = file_path
+        self._file = open(file_path, 'w', encoding='utf-8') if file_path else None
+        self.shown = 0
+        self.hidden = 0
+
+    @property
+    def wants_lines(self):
+        return self.console or self._file is not None
+
+    def zone(self, text):
+        """Enregistre une ligne ; retourne True si elle doit aller à la console."""
+        if self._file is not None:
+            self._file.write(_TAGS.sub('', text).strip() + "\n")
+        if self.console and self.shown < self.max_lines:
+            self.shown += 1
+            return True
+        self.hidden += 1
+        return False
+
+    def skip(self, count):
+        """Compte des zones traitées sans ligne formatée."""
+        self.hidden += count
+
+    def summary(self):
+        """Ligne de bilan du journal, ou None si rien n'a été masqué."""
+        if not self.hidden:
+            return None
+        text = f"  ({self.hidden} lignes par zone non affichées"
+        if self.file_path:
+            text += f" — journal complet : {self.file_path}"
+        return text + ")"
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Assemblage du rapport PDF
+ Pages déjà tracées (PDF matplotlib d'une page, produits en parallèle)
+ recopiées dans un seul document : objets renumérotés, contenu intact,
+ pages vectorielles. Sans dépendance (ni matplotlib, ni QGIS).
+ ***************************************************************************/
+"""
+import re
+
+PDF_HEADER = b'%PDF-1.4\n%\xac\xdc \xab\xba\n'
+# Références « n 0 R » hors chaînes littérales ; l'analyse s'arrête au
+# mot-clé stream (données binaires recopiées telles quelles)
+_TOKENS = re.compile(rb'\((?:\\.|[^\\()])*\)|(?<![\w.])(\d+) 0 R\b|\bstream\r?\n', re.S)
+_OBJ_HEADER = re.compile(rb'\s*(\d+) 0 obj\s')
+_XREF = re.compile(rb'xref\s+(\d+)\s+(\d+)\s+')
+_XREF_ENTRY = re.compile(rb'(\d{10}) (\d{5}) ([nf])\s*')
+_TRAILER = re.compile(rb'trailer\s*<<(.*?)>>\s*startxref\s+(\d+)', re.S)
+_PAGE_TYPE = re.compile(rb'/Type\s*/Page\b')
+
+
+def _ref(body, key):
+    match = re.search(re.escape(key) + rb'\s+(\d+) 0 R', body)
+    if match is None:
+        raise ValueError(f"PDF non reconnu : {key.decode()} absent")
+    return int(match.group(1))
+
+
+def _read_objects(data):
+    """Objets d'un PDF à table xref classique (sortie matplotlib).
+
+    :returns: ({numéro: corps}, numéro du catalogue, numéro d'Info ou None).
+    """
+    trailer = _TRAILER.search(data, max(0, data.rfind(b'trailer')))
+    if trailer is None:
+        raise ValueError("PDF non reconnu : trailer absent")
+    startxref = int(trailer.group(2))
+    xref = _XREF.match(data, startxref)
+    if xref is None:
+        raise ValueError("PDF non reconnu : table xref absente (flux d'objets ?)")
+    first, count = int(xref.group(1)), int(xref.group(2))
+    offsets, pos = {}, xref.end()
+    for number in range(first, first + count):
+        entry = _XREF_ENTRY.match(data, pos)
+        if entry is None:
+            raise ValueError("PDF non reconnu : table xref illisible")
+        if entry.group(3) == b'n':
+            offsets[number] = int(entry.group(1))
+        pos = entry.end()
+    # Chaque objet s'étend jusqu'au suivant dans le fichier (ou la table xref)
+    starts = sorted(offsets.values()) + [startxref]
+    ends = dict(zip(starts, starts[1:]))
+    objects = {}
+    for number, offset in offsets.items():
+        raw = data[offset:ends[offset]]
+        header = _OBJ_HEADER.match(raw)
+        if header is None or int(header.group(1)) != number:
+            raise ValueError(f"PDF non reconnu : objet {number} introuvable")
+        objects[number] = raw[header.end():raw.rindex(b'endobj')].rstrip(b'\r\n ')
+    info = re.search(rb'/Info\s+(\d+) 0 R', trailer.group(1))
+    return objects, _ref(trailer.group(1), b'/Root'), int(info.group(1)) if info else None
+
+
+def _renumber(body, numbers):
+    """Corps d'objet avec ses références renumérotées (``numbers`` :
+    ancien → nouveau numéro). Le flux éventuel n'est pas touché.
+    """
+    parts, pos = [], 0
+    for match in _TOKENS.finditer(body):
+        if match.group(0).startswith(b'stream'):
+            break
+        if match.group(1) is None:
+            continue
+        old = int(match.group(1))
+        if old not in numbers:
+            raise ValueError(f"PDF non reconnu : référence {old} 0 R hors page")
+        parts += [body[pos:match.start()], b'%d 0 R' % numbers[old]]
+        pos = match.end()
+    parts.append(body[pos:])
+    return b''.join(parts)
+
+
+class PdfReport:
+    """Rapport PDF assemblé à partir de PDF déjà tracés (une ou plusieurs
+    pages chacun, table xref classique comme en écrit matplotlib).
+
+    Les objets de chaque page (contenu, polices, images) sont recopiés tels
+    quels, seuls leurs numéros changent : les pages restent vectorielles et
+    rien n'est retracé. Objet 1 : catalogue, objet 2 : arbre des pages.
+    """
+
+    def __init__(self):
+        self._objects = []      # corps des objets 3, 4, ...
+        self._pages = []        # numéros des objets page, dans l'ordre
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def add_pdf(self, data):
+        """Ajoute à la suite toutes les pages du PDF ``data`` (bytes)."""
+        objects, root, info = _read_objects(data)
+        pages = _ref(objects[root], b'/Pages')
+        kids = re.search(rb'/Kids\s*\[([^\]]*)\]', objects[pages])
+        if kids is None:
+            raise ValueError("PDF non reconnu : liste des pages absente")
+        kids = [int(n) for n in re.findall(rb'(\d+) 0 R', kids.group(1))]
+        if not all(_PAGE_TYPE.search(objects[kid]) for kid in kids):
+            raise ValueError("PDF non reconnu : arbre de pages imbriqué")
+        # Catalogue, arbre et Info de la source sont remplacés par ceux du
+        # rapport : /Parent des pages → objet 2
+        numbers = {pages: 2}
+        kept = [n for n in sorted(objects) if n not in (root, pages, info)]
+        base = len(self._objects) + 3
+        numbers.update((n, base + i) for i, n in enumerate(kept))
+        for n in kept:
+            self._objects.append(_renumber(objects[n], numbers))
+        self._pages += [numbers[kid] for kid in kids]
+
+    def getvalue(self):
+        """Document complet (bytes)."""
+        kids = b' '.join(b'%d 0 R' % n for n in self._pages)
+        bodies = [b'<< /Type /Catalog /Pages 2 0 R >>',
+                  b'<< /Type /Pages /Kids [ %s ] /Count %d >>' % (kids, len(self._pages))]
+        out = bytearray(PDF_HEADER)
+        offsets = []
+        for number, body in enumerate(bodies + self._objects, 1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        startxref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(offsets) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(offsets) + 1, startxref)
+        return bytes(out)
+
+    def save(self, path):
+        with open(path, 'wb') as fh:
+            fh.write(self.getvalue())
+        return path
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Aperçu des scores recalculés
+ Fonction d'expression admc_preview() lue par le rendu de la carte : les
+ scores recalculés restent en mémoire tant que l'utilisateur n'a pas
+ confirmé leur écriture dans la source.
+ ***************************************************************************/
+"""
+from qgis.core import QgsExpression, qgsfunction
+
+PREVIEW_EXPRESSION = "admc_preview(@layer_id)"
+
+# { layer_id: { fid: Id_Global } }
+_PREVIEW = {}
+
+
+@qgsfunction(args='auto', group='SustainableZone', register=False,
+             referenced_columns=[])
+def admc_preview(layer_id, feature, parent):
+    """
+    Id_Global recalculé par SustainableZone pour l'entité courante
+    (aperçu avant écriture), ou NULL s'il n'y en a pas.
+    <h4>Exemple</h4>
+    <div class="examples"><code>admc_preview(@layer_id)</code></div>
+    """
+    values = _PREVIEW.get(layer_id)
+    if values is None:
+        return None
+    return values.get(feature.id())
+
+
+def register():
+    QgsExpression.registerFunction(admc_preview)
+
+
+def unregister():
+    _PREVIEW.clear()
+    QgsExpression.unregisterFunction('admc_preview')
+
+
+def set_preview(layer_id, fids, id_global):
+    _PREVIEW[layer_id] = dict(zip(fids.tolist(), id_global.tolist()))
+
+
+def clear_preview(layer_id):
+    _PREVIEW.pop(layer_id, None)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Artefacts par analyse
+ Chaque analyse a son répertoire (profil QGIS, sinon dossier temporaire) :
+ images d'export des graphiques et manifest.json (couche, poids, fichiers).
+ Les anciennes analyses sont supprimées au-delà d'un âge et d'une taille.
+ ***************************************************************************/
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+
+RUN_VERSION = 1
+DEFAULT_RUNS_MB = 200
+DEFAULT_RUNS_DAYS = 7
+MANIFEST_FILE = "manifest.json"
+
+
+def new_run_id():
+    """Identifiant daté et unique (plusieurs instances de QGIS par profil)."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def _write_json(path, data):
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=1)
+    os.replace(f"{path}.tmp", path)
+
+
+class RunArtifacts:
+    """Répertoire ``<directory>/<run_id>/`` d'une analyse.
+
+    Le manifeste décrit l'analyse (``info`` : couche, poids...) et chaque
+    artefact produit : ``{nom: {'file', 'dpi', 'bytes'}}``. Seuls les
+    artefacts de cette analyse y figurent.
+    """
+
+    def __init__(self, directory, info=None, run_id=None):
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(directory, self.run_id)
+        now = time.time()
+        self.manifest = {
+            'version': RUN_VERSION,
+            'run': self.run_id,
+            'created': now,
+            'last_used': now,
+            'info': info or {},
+            'artifacts': {},
+            'exports': [],
+        }
+        self._save()
+
+    def _save(self):
+        os.makedirs(self.path, exist_ok=True)
+        _write_json(os.path.join(self.path, MANIFEST_FILE), self.manifest)
+
+    def get(self, name, dpi=None):
+        """Octets de l'artefact ``name`` (à la résolution ``dpi`` si donnée),
+        ou None s'il manque (répertoire nettoyé par une autre instance...).
+        """
+        entry = self.manifest['artifacts'].get(name)
+        if entry is None or (dpi is not None and entry['dpi'] != dpi):
+            return None
+        try:
+            with open(os.path.join(self.path, entry['file']), 'rb') as fh:
+                return fh.read()
+        except OSError:
+            del self.manifest['artifacts'][name]
+            try:
+                self._save()
+            except OSError:
+                pass
+            return None
+
+    def put(self, name, data, dpi=None, ext='png'):
+        """Enregistre un artefact et l'inscrit au manifeste."""
+        os.makedirs(self.path, exist_ok=True)
+        file_name = f"{name}.{ext}"
+        target = os.path.join(self.path, file_name)
+        with open(f"{target}.tmp", 'wb') as fh:
+            fh.write(data)
+        os.replace(f"{target}.tmp", target)
+        self.manifest['artifacts'][name] = {'file': file_name, 'dpi': dpi, 'bytes': len(data)}
+        self.manifest['last_used'] = time.time()
+        self._save()
+        return target
+
+    def discard(self, name):
+        """Oublie un artefact périmé (graphique retracé avec d'autres données)."""
+        entry = self.manifest['artifacts'].pop(name, None)
+        if entry is None:
+            return
+        try:
+            os.remove(os.path.join(self.path, entry['file']))
+        except OSError:
+            pass
+        self._save()
+
+    def record_export(self, path):
+        """Note un fichier exporté (rapport PDF...) à partir de cette analyse."""
+        self.manifest['exports'].append({'path': path, 'time': time.time()})
+        self.manifest['last_used'] = time.time()
+        self._save()
+
+
+def list_runs(directory):
+    """(dernière utilisation, taille en octets, run_id) des analyses. Seuls
+    les répertoires munis d'un manifeste d'analyse sont pris en compte :
+    rien d'autre n'est jamais supprimé.
+    """
+    found = []
+    if not os.path.isdir(directory):
+        return found
+    for run_id in os.listdir(directory):
+        run_dir = os.path.join(directory, run_id)
+        try:
+            with open(os.path.join(run_dir, MANIFEST_FILE), encoding='utf-8') as fh:
+                manifest = json.load(fh)
+            if manifest['run'] != run_id:
+                continue
+            size = sum(os.path.getsize(os.path.join(run_dir, name))
+                       for name in os.listdir(run_dir))
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        found.append((manifest['last_used'], size, run_id))
+    return found
+
+
+def prune_runs(directory, max_bytes=DEFAULT_RUNS_MB * 1024 * 1024,
+               max_age=DEFAULT_RUNS_DAYS * 86400, keep=None):
+    """Supprime les analyses plus anciennes que ``max_age`` secondes, puis
+    les plus anciennes au-delà de ``max_bytes``. Renvoie les run_id supprimés.
+    """
+    found = sorted(list_runs(directory))
+    total = sum(size for _, size, _ in found)
+    limit = time.time() - max_age
+    removed = []
+    for last_used, size, run_id in found:
+        if run_id == keep:
+            continue
+        if last_used >= limit and total <= max_bytes:
+            continue
+        shutil.rmtree(os.path.join(directory, run_id), ignore_errors=True)
+        total -= size
+        removed.append(run_id)
+    return removed
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Analyses de sensibilité des poids AHP
+ Simulation Monte-Carlo et balayage un-à-un des jugements par paires,
+ calculés par lots sur les scores déjà normalisés (sans dépendance QGIS/Qt).
+ ***************************************************************************/
+"""
+import numpy as np
+
+from .SustainableZone_ahp import (
+    CR_THRESHOLD, ahp_batch, pairwise_matrices, upper_pairs
+)
+from .SustainableZone_engine import (
+    CLASS_LABELS, CLASS_THRESHOLDS, TREE, sub_weight_matrix
+)
+
+# Échelle de Saaty : 1/9 … 1/2, 1, 2 … 9 (positions -8 … 8)
+SAATY_MAX = 9.0
+
+DEFAULT_DRAWS = 10000
+DEFAULT_SPREAD = 1.0          # ± 1 pas de l'échelle de Saaty
+DEFAULT_CHUNK = 4096
+# Valeurs zones × tirages calculées à la fois (≈ 4 Mo en float64)
+DEFAULT_BLOCK_CELLS = 500000
+# Tirages (les premiers, indépendants) sur lesquels les rangs sont calculés
+DEFAULT_RANK_DRAWS = 500
+# Balayage un-à-un : positions -8 … 8 de l'échelle de Saaty (pas de 1/3)
+DEFAULT_SWEEP_STEPS = 49
+
+
+def saaty_position(value):
+    """Position continue d'un jugement sur l'échelle de Saaty (1 → 0,
+    9 → 8, 1/9 → -8).
+    """
+    value = np.asarray(value, dtype=np.float64)
+    return np.where(value >= 1.0, value - 1.0, 1.0 - 1.0 / value)
+
+
+def saaty_value(position):
+    """Inverse de saaty_position."""
+    position = np.asarray(position, dtype=np.float64)
+    return np.where(position >= 0.0, 1.0 + position, 1.0 / (1.0 - np.minimum(position, 0.0)))
+
+
+def perturb_judgments(judgments, count, spread=DEFAULT_SPREAD, rng=None):
+    """Tirages log-uniformes de jugements à ± ``spread`` pas de Saaty.
+
+    :param judgments: jugements du triangle supérieur (ordre upper_pairs).
+    :returns: tableau (count × len(judgments)).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    pos = saaty_position(judgments)
+    limit = SAATY_MAX - 1.0
+    low = np.log(saaty_value(np.clip(pos - spread, -limit, limit)))
+    high = np.log(saaty_value(np.clip(pos + spread, -limit, limit)))
+    return np.exp(rng.uniform(low, high, size=(count, len(pos))))
+
+
+def sample_weights(judgments, draws=DEFAULT_DRAWS, spread=DEFAULT_SPREAD, seed=None,
+                   chunk=DEFAULT_CHUNK):
+    """Poids AHP des dimensions pour ``draws`` jugements perturbés.
+
+    :returns: (weights (draws × 3), CR (draws,)).
+    """
+    rng = np.random.default_rng(seed)
+    weights, crs = [], []
+    for start in range(0, draws, chunk):
+        upper = perturb_judgments(judgments, min(chunk, draws - start), spread, rng)
+        w, cr = ahp_batch(pairwise_matrices(len(judgments), upper))
+        weights.append(w)
+        crs.append(cr)
+    if not weights:
+        return np.zeros((0, 3)), np.zeros(0)
+    return np.concatenate(weights), np.concatenate(crs)
+
+
+def zone_uncertainty(dims, weights, block_cells=DEFAULT_BLOCK_CELLS,
+                     rank_draws=DEFAULT_RANK_DRAWS, progress=None):
+    """Distribution de Id_Global de chaque zone sur des tirages de poids.
+
+    Probabilités de classe et quantiles sont exacts, sur tous les tirages :
+    la matrice zones × tirages est parcourue par blocs d'au plus
+    ``block_cells`` valeurs, chaque ligne triée une fois. Le rang de chaque
+    zone est calculé dans chacun des ``rank_draws`` premiers tirages
+    seulement (un tri des n zones par tirage) : l'intervalle de rangs
+    n'est exact que si ``rank_draws`` couvre tous les tirages.
+
+    :param dims: scores par dimension (n × 3).
+    :param weights: tirages de poids (k × 3).
+    :param progress: fonction appelée avec l'avancement (0–1) après
+        chaque bloc ; elle peut lever une exception pour annuler.
+    :returns: dict de tableaux de longueur n : 'p_class' (n × 3), 'mean',
+        'p05', 'p95', 'rank_best', 'rank_worst' ; et 'rank_draws', nombre
+        de tirages utilisés pour les rangs.
+    """
+    dims = np.asarray(dims, dtype=np.float64)
+    n, k = len(dims), len(weights)
+    rank_draws = min(k, max(1, int(rank_draws)))
+    result = {
+        'p_class': np.zeros((n, len(CLASS_LABELS))),
+        'mean': dims @ weights.mean(axis=0) if k else np.zeros(n),
+        'p05': np.zeros(n),
+        'p95': np.zeros(n),
+        'rank_best': np.ones(n, dtype=np.int64),
+        'rank_worst': np.ones(n, dtype=np.int64),
+        'rank_draws': rank_draws if k else 0,
+    }
+    if not n or not k:
+        return result
+
+    # Quantiles « linear » de np.quantile : interpolation entre deux rangs
+    quantiles = []
+    for key, q in (('p05', 0.05), ('p95', 0.95)):
+        pos = q * (k - 1)
+        lo = int(np.floor(pos))
+        quantiles.append((result[key], lo, min(lo + 1, k - 1), pos - lo))
+    zone_block = max(1, block_cells // k)
+    for start in range(0, n, zone_block):
+        ids = np.sort(dims[start:start + zone_block] @ weights.T, axis=1)  # zones × tirages
+        below = np.array([np.searchsorted(row, CLASS_THRESHOLDS) for row in ids]) / k
+        p_class = result['p_class'][start:start + zone_block]
+        p_class[:, 0] = below[:, 0]
+        p_class[:, 1] = below[:, 1] - below[:, 0]
+        p_class[:, 2] = 1.0 - below[:, 1]
+        for out, lo, hi, frac in quantiles:
+            out[start:start + zone_block] = ids[:, lo] + frac * (ids[:, hi] - ids[:, lo])
+        if progress is not None:
+            progress(min(start + zone_block, n) / n * 0.8)
+
+    # Rang 1 = meilleur Id_Global ; ex aequo au meilleur rang
+    best, worst = result['rank_best'], result['rank_worst']
+    best[:] = n
+    pos = np.arange(n)
+    draw_block = max(1, block_cells // n)
+    for start in range(0, rank_draws, draw_block):
+        stop = min(start + draw_block, rank_draws)
+        ids = -(weights[start:stop] @ dims.T)                      # tirages × zones
+        order = np.argsort(ids, axis=1)
+        ranked = np.take_along_axis(ids, order, axis=1)
+        first = np.ones(ranked.shape, dtype=bool)
+        first[:, 1:] = ranked[:, 1:] != ranked[:, :-1]
+        rank = np.maximum.accumulate(np.where(first, pos, 0), axis=1) + 1
+        ranks = np.empty_like(rank)
+        np.put_along_axis(ranks, order, rank, axis=1)
+        np.minimum(best, ranks.min(axis=0), out=best)
+        np.maximum(worst, ranks.max(axis=0), out=worst)
+        if progress is not None:
+            progress(0.8 + stop / rank_draws * 0.2)
+    return result
+
+
+def monte_carlo(dims, judgments, draws=DEFAULT_DRAWS, spread=DEFAULT_SPREAD,
+                seed=None, **kwargs):
+    """Simulation Monte-Carlo des poids des dimensions.
+
+    :param dims: scores par dimension (n × 3) des zones.
+    :param judgments: jugements (éco/env, éco/soc, env/soc).
+    :returns: dict de zone_uncertainty, plus 'draws', 'weights' (tirages)
+        et 'inconsistent' (part des tirages avec CR ≥ 0,10).
+    """
+    weights, cr = sample_weights(judgments, draws, spread, seed)
+    result = zone_uncertainty(dims, weights, **kwargs)
+    result['draws'] = len(weights)
+    result['weights'] = weights
+    result['inconsistent'] = float(np.mean(cr >= CR_THRESHOLD)) if len(cr) else 0.0
+    return result
+
+
+# ========== BALAYAGE UN-À-UN ==========
+def sweep_values(steps=DEFAULT_SWEEP_STEPS):
+    """Valeurs balayées, de 1/9 à 9, régulières sur l'échelle de Saaty."""
+    return saaty_value(np.linspace(-(SAATY_MAX - 1.0), SAATY_MAX - 1.0, steps))
+
+
+def _swept_weights(judgments, k, values):
+    """Poids AHP quand le jugement ``k`` prend chacune des ``values``."""
+    judgments = np.asarray(judgments, dtype=np.float64)
+    upper = np.tile(judgments, (len(values), 1))
+    upper[:, k] = values
+    n = int(round((1 + np.sqrt(1 + 8 * len(judgments))) / 2))
+    return ahp_batch(pairwise_matrices(n, upper))[0]
+
+
+def _flips(ids, base_classes, values, current):
+    """Zones qui changent de classe à chaque pas, et valeur de flip la plus
+    proche du jugement courant de chaque côté (NaN si aucune).
+    """
+    classes = np.searchsorted(CLASS_THRESHOLDS, ids, side='right')
+    changed = classes != base_classes[:, None]
+    below = values < current
+    above = values > current
+    lower = np.where(changed & below, values, -np.inf).max(axis=1)
+    upper = np.where(changed & above, values, np.inf).min(axis=1)
+    return {
+        'changed': changed.sum(axis=0),
+        'lower': np.where(np.isfinite(lower), lower, np.nan),
+        'upper': np.where(np.isfinite(upper), upper, np.nan),
+    }
+
+
+def oat_sweep(subs, dim_judgments, sub_judgments, steps=DEFAULT_SWEEP_STEPS,
+              progress=None):
+    """Balayage un-à-un de chaque jugement par paires sur 1/9 … 9.
+
+    Les autres jugements restent fixes. Pour un jugement d'un groupe de
+    sous-critères, seule la contribution de ce groupe est recalculée
+    (produit n × pas) : elle est pondérée par le poids global du groupe.
+
+    :param subs: sous-critères normalisés (n × indicateurs).
+    :param dim_judgments: jugements des dimensions (éco/env, éco/soc, env/soc).
+    :param sub_judgments: dict {groupe: jugements (ordre upper_pairs)} pour
+        chaque dimension et groupe imbriqué de l'arbre des critères.
+    :returns: liste d'un dict par jugement : 'group' ('dim' ou clé du
+        groupe), 'pair' (i, j), 'current', 'values', 'changed' (zones changeant
+        de classe à chaque pas), 'lower' / 'upper' (par zone : valeur de
+        flip la plus proche sous / au-dessus du jugement courant).
+    """
+    subs = np.asarray(subs, dtype=np.float64)
+    values = sweep_values(steps)
+    sizes = TREE.group_sizes()
+    groups = [g for g in TREE.groups if g in sub_judgments]
+    local = {g: ahp_batch(pairwise_matrices(sizes[g], np.asarray(sub_judgments[g])[None]))[0][0]
+             for g in groups}
+    dim_w = ahp_batch(pairwise_matrices(3, np.asarray(dim_judgments)[None]))[0][0]
+    local['dim'] = dim_w
+    dims = subs @ sub_weight_matrix(*TREE.sub_weights(local))
+    base = dims @ dim_w
+    base_classes = np.searchsorted(CLASS_THRESHOLDS, base, side='right')
+
+    jobs = [('dim', k) for k in range(len(dim_judgments))]
+    jobs += [(g, k) for g in groups for k in range(len(sub_judgments[g]))]
+    sweeps = []
+    for done, (group, k) in enumerate(jobs):
+        if group == 'dim':
+            current = float(dim_judgments[k])
+            ids = dims @ _swept_weights(dim_judgments, k, values).T
+            pair = upper_pairs(3)[k]
+        else:
+            info = TREE.groups[group]
+            current = float(sub_judgments[group][k])
+            weights = _swept_weights(sub_judgments[group], k, values)
+            # Scores des enfants du groupe, puis poids global du groupe
+            children = subs[:, info['span']] @ TREE.child_matrix(local, group)
+            span_w = TREE.leaf_weights(local)[info['span']].sum()
+            ids = base[:, None] + span_w * (children @ weights.T
+                                            - children @ local[group][:, None])
+            pair = upper_pairs(weights.shape[1])[k]
+        sweep = _flips(ids, base_classes, values, current)
+        sweep.update(group=group, pair=pair, current=current, values=values)
+        sweeps.append(sweep)
+        if progress is not None:
+            progress((done + 1) / len(jobs))
+    return sweeps
+
+
+def critical_thresholds(sweep):
+    """Résumé d'un balayage : valeurs de flip les plus proches (toutes
+    zones confondues) et zones changeant de classe aux deux extrémités.
+    """
+    lower, upper = sweep['lower'], sweep['upper']
+    values, changed = sweep['values'], sweep['changed']
+    below = values < sweep['current']
+    above = values > sweep['current']
+    return {
+        'lower': float(np.nanmax(lower)) if np.any(np.isfinite(lower)) else None,
+        'upper': float(np.nanmin(upper)) if np.any(np.isfinite(upper)) else None,
+        'max_down': int(changed[below].max()) if below.any() else 0,
+        'max_up': int(changed[above].max()) if above.any() else 0,
+        'zones': int(np.count_nonzero(np.isfinite(lower) | np.isfinite(upper))),
+    }
@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Tâches de fond de l'analyse ADMC
+ Lecture, calcul et écriture exécutés dans des QgsTask annulables.
+ ***************************************************************************/
+"""
+import threading
+
+import numpy as np
+
+from qgis.PyQt.QtCore import Qt, pyqtSignal
+from qgis.core import (
+    QgsTask, QgsVectorLayer, QgsVectorLayerFeatureSource
+)
+
+from .SustainableZone_engine import (
+    INDICATOR_KEYS, CLASS_LABELS, ADVICE_MESSAGES, DEFAULT_TOP_K,
+    ResultsStore, ScoreAggregator, build_indicator_matrix, score_matrix
+)
+from .SustainableZone_io import (
+    DEFAULT_STREAM_BLOCK, DEFAULT_WRITE_CHUNK, UNCERTAINTY_FIELDS, ResultWriter, indicator_indices,
+    indicator_rows, iter_blocks, plugin_setting
+)
+from .SustainableZone_sensitivity import monte_carlo, oat_sweep
+
+# Paquets envoyés au thread principal et pas encore écrits (mémoire bornée)
+MAX_PENDING_CHUNKS = 2
+
+CLASS_COLORS = {'Durable': "#2ecc71", 'Transition': "#f39c12", 'Critique': "#e74c3c"}
+
+
+class AnalysisCanceled(Exception):
+    pass
+
+
+class _ResultTask(QgsTask):
+    """Base des tâches qui écrivent les champs résultats d'une couche.
+
+    L'écriture groupée passe par une connexion propre à la tâche ; pour les
+    couches mémoire et le tampon d'édition, les valeurs partent par paquets
+    vers le thread principal (signal ``chunkReady``) et y sont écrites à
+    mesure, au plus MAX_PENDING_CHUNKS paquets en attente ; ``finished``
+    ne fait que valider ou annuler.
+    """
+
+    message = pyqtSignal(str, str, bool)       # texte, couleur, gras
+    analysisFinished = pyqtSignal(bool)        # succès
+    chunkReady = pyqtSignal(object)            # {fid: valeurs} à écrire
+
+    def __init__(self, description, layer, fields=None):
+        super().__init__(description, QgsTask.CanCancel)
+        self.layer = layer
+        self.fields = fields
+        # Écriture directe depuis la tâche seulement si le fournisseur le permet
+        # et si une seconde connexion voit les mêmes données (pas en mémoire)
+        self.direct_write = (ResultWriter(layer).bulk
+                             and layer.providerType() != 'memory')
+        self._source_uri = layer.source()
+        self._provider_key = layer.providerType()
+        self._chunk = {}
+        self._chunk_size = max(1, plugin_setting("write_chunk_size", DEFAULT_WRITE_CHUNK, int))
+        self._chunk_slots = threading.BoundedSemaphore(MAX_PENDING_CHUNKS)
+        self._main_writer = None
+        self._write_error = None
+        self.error = None
+        self.bulk = True
+        # Émis depuis le thread de la tâche, reçu sur le thread principal
+        self.chunkReady.connect(self._write_chunk, Qt.QueuedConnection)
+
+    def _open_writer(self):
+        if not self.direct_write:
+            return None
+        target = QgsVectorLayer(self._source_uri, "admc_writer", self._provider_key)
+        writer = ResultWriter(target, fields=self.fields)
+        writer.begin()
+        return writer
+
+    def _write(self, writer, fid, values):
+        if writer is not None:
+            writer.add(fid, values)
+            return
+        self._chunk[fid] = values
+        if len(self._chunk) >= self._chunk_size:
+            self._send_chunk()
+
+    def _send_chunk(self):
+        """Envoie le paquet courant au thread principal ; attend si trop de
+        paquets n'y sont pas encore écrits.
+        """
+        if not self._chunk:
+            return
+        while not self._chunk_slots.acquire(timeout=0.1):
+            if self.isCanceled():
+                raise AnalysisCanceled()
+        self.chunkReady.emit(self._chunk)
+        self._chunk = {}
+
+    def _commit(self, writer):
+        """Fin de l'écriture côté tâche : validation de l'écriture directe,
+        ou envoi du dernier paquet au thread principal.
+        """
+        if writer is not None:
+            writer.commit()
+        else:
+            self._send_chunk()
+
+    # ==================== THREAD PRINCIPAL ====================
+    def _write_chunk(self, chunk):
+        try:
+            if self._write_error is not None:
+                return
+            if self._main_writer is None:
+                self._main_writer = ResultWriter(self.layer, fields=self.fields)
+                self.bulk = self._main_writer.bulk
+                self._main_writer.begin()
+            for fid, values in chunk.items():
+                self._main_writer.add(fid, values)
+            self._main_writer.flush()
+        except Exception as e:
+            self._write_error = str(e)
+            self.cancel()
+        finally:
+            self._chunk_slots.release()
+
+    def finished(self, result):
+        writer, self._main_writer = self._main_writer, None
+        if self._write_error is not None:
+            self.error = self._write_error
+            result = False
+        if writer is not None:
+            try:
+                if result:
+                    writer.commit()
+                else:
+                    writer.rollback()
+            except Exception as e:
+                writer.rollback()
+                self.error = str(e)
+                result = False
+        elif result and self.direct_write:
+            self.layer.reload()
+        self._chunk = {}
+        self.analysisFinished.emit(bool(result))
+
+
+class AnalysisTask(_ResultTask):
+    """Analyse ADMC en arrière-plan.
+
+    Les entités sont lues sur un instantané ``QgsVectorLayerFeatureSource``.
+    Les résultats (ResultsStore) sont remis au dialogue via le signal
+    ``analysisFinished`` ; hors mode flux, ils contiennent toutes les zones
+    et servent aussi au recalcul instantané des poids.
+    """
+
+    def __init__(self, layer, request, ui, weights, sub_weights, streaming, zone_log):
+        super().__init__(f"ADMC — {layer.name()}", layer)
+        self.source = QgsVectorLayerFeatureSource(layer)
+        self.request = request
+        self.ui = ui
+        self.idx = indicator_indices(layer, ui, INDICATOR_KEYS)
+        self.weights = weights
+        self.sub_weights = sub_weights
+        self.streaming = streaming
+        self.zone_log = zone_log
+        self.total = layer.featureCount()
+
+        self.block_size = max(1, plugin_setting("stream_block_size", DEFAULT_STREAM_BLOCK, int))
+        self.top_k = plugin_setting("stream_top_k", DEFAULT_TOP_K, int)
+        self.dtype = (np.float32 if plugin_setting("results_float32", False, bool)
+                      else np.float64)
+
+        self.results = None
+        self.stats = {}
+        self.aggregates = None
+
+    # ==================== THREAD DE LA TÂCHE ====================
+    def run(self):
+        writer = None
+        try:
+            writer = self._open_writer()
+            if self.streaming:
+                self._run_streaming(writer)
+            else:
+                self._run_full(writer)
+            self._commit(writer)
+            summary = self.zone_log.summary()
+            if summary:
+                self.message.emit(summary, "#7f8c8d", False)
+            return True
+        except AnalysisCanceled:
+            if writer is not None:
+                writer.rollback()
+            return False
+        except Exception as e:
+            if writer is not None:
+                writer.rollback()
+            self.error = str(e)
+            return False
+        finally:
+            self.zone_log.close()
+
+    def _run_full(self, writer):
+        feats = []
+        for f in self.source.getFeatures(self.request):
+            if self.isCanceled():
+                raise AnalysisCanceled()
+            feats.append(f)
+        self.setProgress(10)
+
+        scores = score_matrix(
+            build_indicator_matrix(indicator_rows(feats, self.idx)),
+            self.sub_weights, self.weights)
+        dims, weighted = scores['dims'], scores['weighted']
+        id_global, class_codes, advice = (
+            scores['id_global'], scores['classes'], scores['advice'])
+
+        names = []
+        count = len(feats)
+        for i, f in enumerate(feats):
+            if self.isCanceled():
+                raise AnalysisCanceled()
+            ws_eco, ws_env, ws_soc = weighted[i]
+            classe = CLASS_LABELS[class_codes[i]]
+            conseil = ADVICE_MESSAGES[advice[i]]
+
+            fname = f.attribute(0) if f.attribute(0) else f"Entité {f.id()}"
+            names.append(str(fname))
+            if self.zone_log.wants_lines:
+                self._zone_line(fname, dims[i], id_global[i], classe)
+            else:
+                self.zone_log.skip(1)
+
+            self._write(writer, f.id(), (float(ws_eco), float(ws_env), float(ws_soc),
+                                         float(id_global[i]), classe, conseil))
+            if (i + 1) % 1000 == 0 or i + 1 == count:
+                self.setProgress(10 + 90 * (i + 1) / count)
+
+        self.results = ResultsStore.from_scores(
+            scores, names, [f.id() for f in feats], self.dtype)
+        self.stats = self.results.stats()
+
+    def _run_streaming(self, writer):
+        """Mode flux : lecture, calcul et écriture par blocs d'entités.
+        Seuls des agrégats compacts (ScoreAggregator) sont conservés.
+        """
+        aggregates = ScoreAggregator(self.top_k)
+        self.message.emit(f"  Mode flux : blocs de {self.block_size} entités", "#9b59b6", False)
+
+        for block in iter_blocks(self.source, self.request, self.block_size):
+            self._score_block(block, writer, aggregates)
+
+        self.aggregates = aggregates
+        self.stats = aggregates.stats()
+        self.results = aggregates.top_records()
+        if aggregates.count:
+            self.message.emit(f"  {len(self.results)} zones extrêmes conservées "
+                              f"pour les graphiques et la comparaison", "#9b59b6", False)
+
+    def _zone_line(self, fname, dims, id_global, classe):
+        norm_eco, norm_env, norm_soc = dims
+        line = (f"  [{fname}] Éco={norm_eco:.2f} Env={norm_env:.2f} Soc={norm_soc:.2f} "
+                f"Id={id_global:.3f} → {classe}")
+        if self.zone_log.zone(line):
+            self.message.emit(line, CLASS_COLORS[classe], False)
+
+    def _score_block(self, block, writer, aggregates):
+        if self.isCanceled():
+            raise AnalysisCanceled()
+        scores = score_matrix(
+            build_indicator_matrix(indicator_rows(block, self.idx)),
+            self.sub_weights, self.weights)
+        weighted, id_global = scores['weighted'], scores['id_global']
+        wants_lines = self.zone_log.wants_lines
+        names = []
+        for i, f in enumerate(block):
+            fname = f.attribute(0) if f.attribute(0) else f"Entité {f.id()}"
+            names.append(str(fname))
+            if wants_lines:
+                self._zone_line(fname, scores['dims'][i], id_global[i],
+                                CLASS_LABELS[scores['classes'][i]])
+            self._write(writer, f.id(), (float(weighted[i, 0]), float(weighted[i, 1]),
+                                         float(weighted[i, 2]), float(id_global[i]),
+                                         CLASS_LABELS[scores['classes'][i]],
+                                         ADVICE_MESSAGES[scores['advice'][i]]))
+        if not wants_lines:
+            self.zone_log.skip(len(block))
+        aggregates.update(scores, names)
+
+        if self.total > 0:
+            self.setProgress(min(aggregates.count / self.total * 100, 100))
+        self.message.emit(f"  … {aggregates.count} zones traitées", "#7f8c8d", False)
+
+    # ==================== THREAD PRINCIPAL ====================
+    def finished(self, result):
+        self.zone_log.close()
+        super().finished(result)
+
+
+class WriteScoresTask(_ResultTask):
+    """Écrit dans la source des scores recalculés (poids AHP modifiés)."""
+
+    def __init__(self, layer, fids, scores):
+        super().__init__(f"ADMC — écriture {layer.name()}", layer)
+        self.fids = fids
+        self.scores = scores
+
+    def run(self):
+        writer = None
+        try:
+            writer = self._open_writer()
+            weighted, id_global = self.scores['weighted'], self.scores['id_global']
+            classes, advice = self.scores['classes'], self.scores['advice']
+            count = len(self.fids)
+            for i, fid in enumerate(self.fids):
+                if i % 1000 == 0:
+                    if self.isCanceled():
+                        raise AnalysisCanceled()
+                    self.setProgress(100 * i / max(count, 1))
+                self._write(writer, int(fid), (
+                    float(weighted[i, 0]), float(weighted[i, 1]), float(weighted[i, 2]),
+                    float(id_global[i]), CLASS_LABELS[classes[i]], ADVICE_MESSAGES[advice[i]]))
+            self._commit(writer)
+            return True
+        except AnalysisCanceled:
+            if writer is not None:
+                writer.rollback()
+            return False
+        except Exception as e:
+            if writer is not None:
+                writer.rollback()
+            self.error = str(e)
+            return False
+
+
+class NodeScoresTask(_ResultTask):
+    """Écrit les scores des nœuds intermédiaires de l'arbre des critères
+    (une colonne de ``scores`` par champ de ``fields``).
+    """
+
+    def __init__(self, layer, fids, scores, fields):
+        super().__init__(f"ADMC — scores des nœuds {layer.name()}", layer, fields)
+        self.fids = fids
+        self.scores = scores
+
+    def run(self):
+        writer = None
+        try:
+            writer = self._open_writer()
+            count = len(self.fids)
+            for i, fid in enumerate(self.fids):
+                if i % 1000 == 0:
+                    if self.isCanceled():
+                        raise AnalysisCanceled()
+                    self.setProgress(100 * i / max(count, 1))
+                self._write(writer, int(fid), [float(v) for v in self.scores[i]])
+            self._commit(writer)
+            return True
+        except AnalysisCanceled:
+            if writer is not None:
+                writer.rollback()
+            return False
+        except Exception as e:
+            if writer is not None:
+                writer.rollback()
+            self.error = str(e)
+            return False
+
+
+class UncertaintyTask(_ResultTask):
+    """Simulation Monte-Carlo des poids des dimensions.
+
+    Calculée sur les scores par dimension de la dernière analyse (aucune
+    relecture de la couche) ; les statistiques par zone sont écrites dans
+    les champs UNCERTAINTY_FIELDS et conservées dans ``result``.
+    """
+
+    def __init__(self, layer, fids, dims, judgments, draws, spread, seed=None):
+        super().__init__(f"ADMC — incertitude {layer.name()}", layer, UNCERTAINTY_FIELDS)
+        self.fids = fids
+        self.dims = dims
+        self.judgments = judgments
+        self.draws = draws
+        self.spread = spread
+        self.seed = seed
+        self.result = None
+
+    def _progress(self, fraction):
+        if self.isCanceled():
+            raise AnalysisCanceled()
+        self.setProgress(80 * fraction)
+
+    def run(self):
+        writer = None
+        try:
+            result = monte_carlo(self.dims, self.judgments, self.draws, self.spread,
+                                 self.seed, progress=self._progress)
+
+            writer = self._open_writer()
+            p_class = result['p_class']
+            count = len(self.fids)
+            for i, fid in enumerate(self.fids):
+                if i % 1000 == 0:
+                    if self.isCanceled():
+                        raise AnalysisCanceled()
+                    self.setProgress(80 + 20 * i / max(count, 1))
+                self._write(writer, int(fid), (
+                    float(p_class[i, 2]), float(p_class[i, 1]), float(p_class[i, 0]),
+                    float(result['mean'][i]), float(result['p05'][i]),
+                    float(result['p95'][i]), int(result['rank_best'][i]),
+                    int(result['rank_worst'][i])))
+            self._commit(writer)
+            self.result = result
+            return True
+        except AnalysisCanceled:
+            if writer is not None:
+                writer.rollback()
+            return False
+        except Exception as e:
+            if writer is not None:
+                writer.rollback()
+            self.error = str(e)
+            return False
+
+
+class SensitivityTask(QgsTask):
+    """Balayage un-à-un des jugements par paires (aucune écriture)."""
+
+    analysisFinished = pyqtSignal(bool)        # succès
+
+    def __init__(self, subs, dim_judgments, sub_judgments, steps):
+        super().__init__("ADMC — sensibilité des jugements", QgsTask.CanCancel)
+        self.subs = subs
+        self.dim_judgments = dim_judgments
+        self.sub_judgments = sub_judgments
+        self.steps = steps
+        self.sweeps = None
+        self.error = None
+
+    def _progress(self, fraction):
+        if self.isCanceled():
+            raise AnalysisCanceled()
+        self.setProgress(100 * fraction)
+
+    def run(self):
+        try:
+            self.sweeps = oat_sweep(self.subs, self.dim_judgments, self.sub_judgments,
+                                    self.steps, progress=self._progress)
+            return True
+        except AnalysisCanceled:
+            return False
+        except Exception as e:
+            self.error = str(e)
+            return False
+
+    def finished(self, result):
+        self.analysisFinished.emit(bool(result))
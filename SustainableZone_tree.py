@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ SustainableZone - Arbre hiérarchique AHP
+ Propagation des poids locaux (un jeu par nœud) en poids globaux des
+ indicateurs, et scores des nœuds intermédiaires par un seul produit
+ matriciel (sans dépendance QGIS/Qt).
+ ***************************************************************************/
+"""
+import numpy as np
+
+from .SustainableZone_criteria import DIMENSION_KEYS, ROOT_KEY
+
+
+class CriteriaTree:
+    """Hiérarchie des critères d'un registre : racine ``'dim'``, dimensions,
+    groupes imbriqués, indicateurs (feuilles).
+
+    Les poids locaux sont un dict ``{nœud: poids de ses enfants}`` ; un nœud
+    absent reçoit des poids uniformes. Le poids global d'un indicateur est
+    le produit des poids locaux le long du chemin depuis la racine.
+    """
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+        self.groups = criteria.groups
+        self.position = {key: i for i, key in enumerate(criteria.keys)}
+
+    def children(self, node):
+        if node == ROOT_KEY:
+            return list(DIMENSION_KEYS)
+        return self.groups[node]['children']
+
+    def group_sizes(self):
+        """Nombre d'enfants de chaque nœud (racine comprise)."""
+        sizes = {ROOT_KEY: len(DIMENSION_KEYS)}
+        sizes.update((key, len(group['children'])) for key, group in self.groups.items())
+        return sizes
+
+    def _local(self, local_weights, node):
+        n = len(self.children(node))
+        weights = local_weights.get(node)
+        if weights is None:
+            return np.full(n, 1.0 / n)
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (n,):
+            raise ValueError(f"{n} poids attendus pour « {node} », {weights.shape} reçus")
+        return weights
+
+    def leaf_weights(self, local_weights=None, node=ROOT_KEY):
+        """Poids des indicateurs sous ``node``, relatifs à ce nœud (somme 1).
+
+        Renvoie un vecteur sur toutes les colonnes de la matrice
+        d'indicateurs, nul hors du sous-arbre.
+        """
+        local_weights = local_weights or {}
+        out = np.zeros(len(self.position))
+        stack = [(node, 1.0)]
+        while stack:
+            current, weight = stack.pop()
+            for child, w in zip(self.children(current), self._local(local_weights, current)):
+                if child in self.position:
+                    out[self.position[child]] = weight * w
+                else:
+                    stack.append((child, weight * w))
+        return out
+
+    def global_weights(self, local_weights=None):
+        """Poids globaux des indicateurs : Id_Global = indicateurs @ poids."""
+        return self.leaf_weights(local_weights)
+
+    def sub_weights(self, local_weights=None):
+        """Poids des indicateurs au sein de chaque dimension (eco, env, soc),
+        format attendu par ``sub_weight_matrix``.
+        """
+        return tuple(self.leaf_weights(local_weights, dim)[self.criteria.slices[dim]]
+                     for dim in DIMENSION_KEYS)
+
+    def child_matrix(self, local_weights, group):
+        """Matrice (feuilles du groupe × enfants) : colonne k = poids des
+        feuilles de l'enfant k relatifs à cet enfant. Les scores des
+        enfants sont ``indicateurs[:, span] @ matrice``.
+        """
+        local_weights = local_weights or {}
+        span = self.groups[group]['span']
+        children = self.children(group)
+        matrix = np.zeros((span.stop - span.start, len(children)))
+        for k, child in enumerate(children):
+            if child in self.position:
+                matrix[self.position[child] - span.start, k] = 1.0
+            else:
+                matrix[:, k] = self.leaf_weights(local_weights, child)[span]
+        return matrix
+
+    def node_matrix(self, local_weights=None, nodes=None):
+        """Matrice (indicateurs × nœuds) des poids relatifs de chaque nœud
+        (tous les groupes par défaut).
+        """
+        nodes = list(self.groups) if nodes is None else list(nodes)
+        return np.column_stack([self.leaf_weights(local_weights, node) for node in nodes])
+
+    def node_scores(self, subs, local_weights=None, nodes=None):
+        """Scores des nœuds intermédiaires pour chaque zone, en un seul
+        produit : ``subs`` (n × indicateurs normalisés) @ ``node_matrix``.
+        Moyennes pondérées des ratios aux normes : 1 = norme atteinte, et
+        souvent au-delà.
+        """
+        return np.asarray(subs, dtype=np.float64) @ self.node_matrix(local_weights, nodes)
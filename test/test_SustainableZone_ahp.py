@@ -0,0 +1,108 @@
+# coding=utf-8
+"""AHP core test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from .. import SustainableZone_ahp
+from ..SustainableZone_ahp import (
+    ahp, ahp_batch, is_consistent, pairwise_matrices, pairwise_matrix, random_index,
+    set_random_index_cache, simulate_random_index, upper_pairs
+)
+
+
+class SustainableZoneAhpTest(unittest.TestCase):
+    """Test the QGIS-independent AHP functions."""
+
+    def test_pairwise_matrix(self):
+        """Test the matrix is reciprocal and clamps invalid judgments."""
+        M = pairwise_matrix(3, {(0, 1): 3.0, (1, 2): 0.0})
+        np.testing.assert_allclose(M * M.T, np.ones((3, 3)))
+        self.assertEqual(M[0, 2], 1.0)
+        self.assertEqual(M[1, 2], 0.01)
+
+    def test_saaty_example(self):
+        """Test weights and CR of a classic 3x3 example."""
+        M = pairwise_matrix(3, {(0, 1): 3.0, (0, 2): 5.0, (1, 2): 3.0})
+        weights, cr = ahp(M)
+        np.testing.assert_allclose(weights, [0.637, 0.258, 0.105], atol=1e-3)
+        self.assertAlmostEqual(cr, 0.033, places=3)
+        self.assertTrue(is_consistent(cr))
+
+    def test_identity_is_uniform(self):
+        """Test equal judgments give equal weights and CR 0."""
+        weights, cr = ahp(np.ones((4, 4)))
+        np.testing.assert_allclose(weights, np.ones(4) / 4)
+        self.assertAlmostEqual(cr, 0.0)
+
+    def test_batch_matches_single(self):
+        """Test the batched solver equals one call per matrix."""
+        rng = np.random.default_rng(7)
+        upper = np.exp(rng.uniform(-np.log(9), np.log(9), size=(200, 6)))
+        stack = pairwise_matrices(4, upper)
+        weights, cr = ahp_batch(stack)
+        self.assertEqual(weights.shape, (200, 4))
+        for i in (0, 57, 199):
+            judgments = dict(zip(upper_pairs(4), upper[i]))
+            w, c = ahp(pairwise_matrix(4, judgments))
+            np.testing.assert_allclose(weights[i], w)
+            self.assertAlmostEqual(cr[i], c)
+
+    def test_eigenvector_method(self):
+        """Test the eigenvector method against numpy.linalg.eig."""
+        rng = np.random.default_rng(11)
+        stack = pairwise_matrices(3, np.exp(rng.uniform(-2, 2, size=(50, 3))))
+        weights, cr = ahp_batch(stack, method='eigenvector')
+        for i in range(50):
+            values, vectors = np.linalg.eig(stack[i])
+            top = np.argmax(values.real)
+            v = np.abs(vectors[:, top].real)
+            np.testing.assert_allclose(weights[i], v / v.sum(), atol=1e-10)
+            expected_cr = (values[top].real - 3) / 2 / random_index(3)
+            self.assertAlmostEqual(cr[i], expected_cr, places=10)
+        with self.assertRaises(ValueError):
+            ahp_batch(stack, method='median')
+
+    def test_simulated_random_index(self):
+        """Test simulated RI beyond the table, kept in the cache file."""
+        self.assertAlmostEqual(simulate_random_index(4, samples=4000), 0.89, delta=0.02)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'random_index.json')
+            set_random_index_cache(path)
+            SustainableZone_ahp._simulated_ri.clear()
+            ri = random_index(11)
+            self.assertAlmostEqual(ri, 1.51, delta=0.02)
+            with open(path, encoding='utf-8') as fh:
+                self.assertAlmostEqual(json.load(fh)['11'], ri)
+            # Relu depuis le fichier, sans nouvelle simulation
+            SustainableZone_ahp._simulated_ri.clear()
+            with open(path, 'w', encoding='utf-8') as fh:
+                json.dump({'11': 1.5}, fh)
+            self.assertEqual(random_index(11), 1.5)
+        finally:
+            set_random_index_cache(None)
+            SustainableZone_ahp._simulated_ri.clear()
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneAhpTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,91 @@
+# coding=utf-8
+"""On-disk results cache test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_cache import ResultsCache, cache_key, rows_fingerprint
+from ..SustainableZone_engine import ResultsStore, score_matrix
+
+
+class SustainableZoneCacheTest(unittest.TestCase):
+    """Test the content-addressed results cache."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        X = np.random.default_rng(3).uniform(0, 200, size=(50, 11))
+        sub_weights = (np.ones(4) / 4, np.ones(3) / 3, np.ones(4) / 4)
+        scores = score_matrix(X, sub_weights, np.array([0.4, 0.3, 0.3]))
+        self.store = ResultsStore.from_scores(
+            scores, [f'Zone {i}' for i in range(50)], np.arange(50))
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_key_depends_on_weights(self):
+        """Test the key changes with the weights only."""
+        w = np.array([0.4, 0.3, 0.3])
+        self.assertEqual(cache_key('src', {'pib': 'a'}, w),
+                         cache_key('src', {'pib': 'a'}, w.copy()))
+        self.assertNotEqual(cache_key('src', {'pib': 'a'}, w),
+                            cache_key('src', {'pib': 'a'}, np.array([0.3, 0.4, 0.3])))
+
+    def test_rows_fingerprint(self):
+        """Test the value fingerprint ignores row order, not values."""
+        rows = [(i, [f'Zone {i}', i * 1.5, None]) for i in range(20)]
+        self.assertEqual(rows_fingerprint(rows), rows_fingerprint(reversed(rows)))
+        edited = list(rows)
+        edited[7] = (7, ['Zone 7', 99.0, None])
+        self.assertNotEqual(rows_fingerprint(rows), rows_fingerprint(edited))
+        self.assertTrue(rows_fingerprint([]).startswith('0:'))
+
+    def test_round_trip(self):
+        """Test a stored entry restores the results."""
+        cache = ResultsCache(os.path.join(self.directory, 'cache'))
+        self.assertIsNone(cache.get('k1'))
+        cache.put('k1', self.store, self.store.stats())
+        entry = cache.get('k1')
+        restored = ResultsStore.load(entry['results'])
+        self.assertEqual(restored.names(), self.store.names())
+        np.testing.assert_array_equal(restored.id_global, self.store.id_global)
+        np.testing.assert_array_equal(restored.fids, self.store.fids)
+        self.assertEqual(entry['stats'], self.store.stats())
+        self.assertFalse(entry['streaming'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directory, 'cache', 'k1'))),
+                         ['manifest.json', 'results.npz'])
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = ResultsCache(os.path.join(self.directory, 'cache'))
+        for key in ('a', 'b'):
+            cache.put(key, self.store, self.store.stats())
+            time.sleep(0.01)
+        size = max(s for _, s, _ in cache.entries())
+        cache.get('a')
+        cache.max_bytes = 2 * size + size // 2
+        cache.put('c', self.store, self.store.stats())
+        self.assertEqual(sorted(k for _, _, k in cache.entries()), ['a', 'c'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
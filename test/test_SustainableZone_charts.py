@@ -0,0 +1,215 @@
+# coding=utf-8
+"""Chart descriptors test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import multiprocessing.spawn
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from .. import SustainableZone_charts
+from ..SustainableZone_charts import (
+    MIN_PARALLEL_CHARTS, add_pdf_page, analysis_charts, atlas_charts, compare_chart,
+    export_chart, matplotlib_available, new_figure, node_chart, render_all, render_bytes,
+    render_png, render_preview, sensitivity_charts, uncertainty_chart
+)
+from ..SustainableZone_engine import (
+    NORMS, TREE, ScoreAggregator, score, score_matrix, uniform_sub_weights
+)
+from ..SustainableZone_pdf import PdfReport
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class SustainableZoneChartsTest(unittest.TestCase):
+    """Test charts are described up front and drawn on demand."""
+
+    def setUp(self):
+        """Runs before each test."""
+        rng = np.random.default_rng(5)
+        self.X = rng.uniform(0.0, 1.5, size=(6, len(NORMS))) * NORMS
+        self.results = score(self.X, {'names': [f"Zone {i}" for i in range(6)]})
+
+    def test_analysis_descriptors(self):
+        """Test one descriptor per chart and per zone radar, nothing drawn."""
+        aggregates = ScoreAggregator()
+        aggregates.update(score_matrix(self.X, uniform_sub_weights(), np.ones(3) / 3),
+                          self.results.names())
+        charts = analysis_charts(self.results, self.results.stats(), [0.5, 0.3, 0.2],
+                                 aggregates, atlas_page=0)
+        names = [chart.name for chart in charts]
+        self.assertEqual(len(charts), 4 + 6 + 2)
+        self.assertIn("05_radar_Zone_3", names)
+        self.assertEqual(names[-1], "07_hist_global")
+        # Données compactes : transmissibles à un autre processus
+        self.assertEqual(pickle.loads(pickle.dumps(charts))[4].name, "05_radar_Zone_0")
+
+    def test_atlas_pages(self):
+        """Test the atlas tiles every zone once, sorted, a page at a time."""
+        charts = analysis_charts(self.results, self.results.stats(), [0.5, 0.3, 0.2])
+        self.assertEqual([c.name for c in charts if c.kind == 'atlas'], ["05_atlas_01"])
+
+        pages = atlas_charts(self.results, page_size=4)
+        self.assertEqual([c.name for c in pages], ["05_atlas_01", "05_atlas_02"])
+        self.assertEqual([len(c.data['names']) for c in pages], [4, 2])
+        ids = np.concatenate([c.data['id_global'] for c in pages])
+        np.testing.assert_array_equal(ids, np.sort(self.results.id_global)[::-1])
+        self.assertEqual(pages[0].data['page'], (1, 2))
+
+        # Plus de 99 pages : l'ordre des noms reste celui des pages
+        many = atlas_charts(score(np.tile(self.X, (20, 1))), page_size=1)
+        self.assertEqual(many[0].name, "05_atlas_001")
+        self.assertEqual(sorted(many, key=lambda c: c.name), many)
+
+        by_class = atlas_charts(self.results, page_size=6, sort='classe')[0]
+        classes = by_class.data['classes']
+        self.assertTrue(np.all(np.diff(classes) <= 0))
+        with self.assertRaises(ValueError):
+            atlas_charts(self.results, sort='nom')
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_render_every_kind(self):
+        """Test every chart kind renders to PNG bytes."""
+        charts = analysis_charts(self.results, self.results.stats(), [0.5, 0.3, 0.2])
+        mc = {'p_class': np.tile([0.1, 0.2, 0.7], (6, 1)),
+              'mean': self.results.id_global, 'p05': self.results.id_global - 0.05,
+              'p95': self.results.id_global + 0.05, 'draws': 100}
+        threshold = {'max_down': 2, 'max_up': 1, 'lower': 0.5, 'upper': None, 'zones': 2}
+        charts.append(uncertainty_chart(self.results, mc))
+        charts += sensitivity_charts([("Éco / Env", 2.0, threshold)])
+        charts.append(node_chart(TREE.node_scores(self.results.subs)))
+        charts.append(compare_chart(self.results[0], self.results[1]))
+        kinds = {}
+        for chart in charts:
+            kinds.setdefault(chart.kind, chart)
+        for chart in kinds.values():
+            self.assertTrue(render_png(chart, dpi=30).startswith(PNG_SIGNATURE), chart)
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_preview_fits_display(self):
+        """Test previews are drawn at the display size, aspect kept."""
+        charts = analysis_charts(self.results, self.results.stats(), [0.5, 0.3, 0.2])
+        charts.append(compare_chart(self.results[0], self.results[1]))
+        for chart in charts:
+            rgba, width, height = render_preview(chart, 600, 400)
+            self.assertEqual(len(rgba), 4 * width * height)
+            self.assertLessEqual(width, 600)
+            self.assertLessEqual(height, 400)
+            # Plus grande taille de même proportion que la figure
+            fig_w, fig_h = chart.figsize
+            scale = min(600 / fig_w, 400 / fig_h)
+            self.assertAlmostEqual(width, fig_w * scale, delta=2, msg=chart)
+            self.assertAlmostEqual(height, fig_h * scale, delta=2, msg=chart)
+        # Redimensionnement : même descripteur, nouvelle taille
+        self.assertEqual(render_preview(charts[0], 300, 200)[1:], (280, 200))
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_node_axis_follows_scores(self):
+        """Test node scores above the norm are not cut off at 1."""
+        scores = TREE.node_scores(self.results.subs)
+        scores[0, 0] = 2.4
+        chart = node_chart(scores)
+        fig = new_figure(chart)
+        chart.draw(fig)
+        self.assertGreaterEqual(fig.axes[0].get_xlim()[1], 2.4)
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_export_formats(self):
+        """Test charts are rendered to bytes, files written only on export."""
+        chart = compare_chart(self.results[0], self.results[1])
+        self.assertTrue(render_bytes(chart, 'svg').lstrip().startswith(b'<?xml'))
+        self.assertTrue(render_bytes(chart, 'pdf').startswith(b'%PDF'))
+        with self.assertRaises(ValueError):
+            render_bytes(chart, 'bmp')
+        directory = tempfile.mkdtemp()
+        try:
+            path = export_chart(chart, os.path.join(directory, 'comparaison.svg'))
+            self.assertEqual(os.listdir(directory), ['comparaison.svg'])
+            with open(path, 'rb') as fh:
+                self.assertIn(b'<svg', fh.read())
+            os.remove(path)
+        finally:
+            os.rmdir(directory)
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_vector_pdf_pages(self):
+        """Test report pages stay vector unless rasterising is asked for."""
+        charts = analysis_charts(self.results, self.results.stats(), [0.5, 0.3, 0.2])
+        pdfs = {}
+        for raster_dpi in (0, 72):
+            report = PdfReport()
+            for chart in charts:
+                add_pdf_page(report, chart, raster_dpi)
+            self.assertEqual(report.page_count, len(charts))
+            pdfs[raster_dpi] = report.getvalue()
+        self.assertNotIn(b'/Subtype /Image', pdfs[0])
+        self.assertIn(b'/Subtype /Image', pdfs[72])
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_radar_template(self):
+        """Test the reused radar figure keeps nothing from the previous zone."""
+        radars = [c for c in analysis_charts(self.results, self.results.stats(), [0.5, 0.3, 0.2],
+                                             atlas_page=0) if c.kind == 'radar']
+        first = render_png(radars[0], dpi=30)
+        self.assertNotEqual(render_png(radars[1], dpi=30), first)
+        self.assertEqual(render_png(radars[0], dpi=30), first)
+        # Même descripteur tracé sur une figure neuve
+        fig = new_figure(radars[0])
+        radars[0].draw(fig)
+        self.assertEqual(fig.axes[0].title.get_text(), "Profil — Zone 0")
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_render_all_in_pool(self):
+        """Test the process pool gives the serial images and pages, in order."""
+        X = np.tile(self.X, (2, 1))
+        results = score(X, {'names': [f"Zone {i}" for i in range(len(X))]})
+        charts = [c for c in analysis_charts(results, results.stats(), [0.5, 0.3, 0.2],
+                                             atlas_page=0) if c.kind == 'radar']
+        self.assertGreaterEqual(len(charts), MIN_PARALLEL_CHARTS)
+        done = []
+        images = render_all(charts, workers=2, dpi=20, progress=done.append)
+        self.assertEqual(images, [render_png(c, dpi=20) for c in charts])
+        self.assertEqual(done[-1], 1.0)
+        # Pages de rapport : recopiées sans retracé
+        pages = render_all(charts, workers=2, dpi=0, fmt='pdf')
+        report = PdfReport()
+        for chart, page in zip(charts, pages):
+            with mock.patch.object(SustainableZone_charts, 'render_pdf_page') as draw:
+                add_pdf_page(report, chart, page=page)
+            draw.assert_not_called()
+        self.assertEqual(report.page_count, len(charts))
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_render_all_serial_fallback(self):
+        """Test a pool that cannot start falls back to serial rendering."""
+        X = np.tile(self.X, (2, 1))
+        results = score(X, {'names': [f"Zone {i}" for i in range(len(X))]})
+        charts = [c for c in analysis_charts(results, results.stats(), [0.5, 0.3, 0.2],
+                                             atlas_page=0) if c.kind == 'radar']
+        executable = multiprocessing.spawn.get_executable()
+        missing = os.path.join(tempfile.gettempdir(), 'absent', 'python3')
+        with mock.patch.object(SustainableZone_charts, 'python_executable',
+                               return_value=missing):
+            images = render_all(charts, workers=2, dpi=20)
+        self.assertEqual(images, [render_png(c, dpi=20) for c in charts])
+        self.assertEqual(multiprocessing.spawn.get_executable(), executable)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneChartsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
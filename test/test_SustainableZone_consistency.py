@@ -0,0 +1,67 @@
+# coding=utf-8
+"""AHP consistency diagnosis test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_ahp import ahp, pairwise_matrix, upper_pairs
+from ..SustainableZone_consistency import inconsistency_contributions, suggest_repairs
+
+
+class SustainableZoneConsistencyTest(unittest.TestCase):
+    """Test locating and repairing inconsistent judgments."""
+
+    def setUp(self):
+        """Runs before each test."""
+        # Matrice cohérente 6 × 6 dont un seul jugement est inversé
+        weights = np.array([0.35, 0.25, 0.15, 0.12, 0.08, 0.05])
+        self.judgments = {(i, j): weights[i] / weights[j] for i, j in upper_pairs(6)}
+        self.judgments[(0, 5)] = 1.0 / self.judgments[(0, 5)]
+        self.matrix = pairwise_matrix(6, self.judgments)
+
+    def test_culprit_ranked_first(self):
+        """Test the flipped judgment has the largest contribution."""
+        contrib = inconsistency_contributions(self.matrix)
+        self.assertEqual(tuple(contrib['pairs'][0]), (0, 5))
+        self.assertAlmostEqual(contrib['share'].sum(), 1.0)
+        self.assertTrue(np.all(np.diff(contrib['share']) <= 1e-12))
+
+    def test_repair_reaches_threshold(self):
+        """Test one change on the culprit brings CR under 0.10."""
+        _, cr = ahp(self.matrix)
+        self.assertGreater(cr, 0.10)
+        repair = suggest_repairs(self.matrix)
+        self.assertTrue(repair['consistent'])
+        self.assertEqual(len(repair['changes']), 1)
+        i, j, old, new = repair['changes'][0]
+        self.assertEqual((i, j), (0, 5))
+        self.assertAlmostEqual(old, self.judgments[(0, 5)])
+
+        fixed = dict(self.judgments)
+        fixed[(i, j)] = new
+        _, cr = ahp(pairwise_matrix(6, fixed))
+        self.assertAlmostEqual(cr, repair['cr'])
+
+    def test_consistent_matrix_unchanged(self):
+        """Test a consistent matrix needs no repair."""
+        repair = suggest_repairs(pairwise_matrix(3, {(0, 1): 2.0, (0, 2): 4.0, (1, 2): 2.0}))
+        self.assertEqual(repair['changes'], [])
+        self.assertTrue(repair['consistent'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneConsistencyTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
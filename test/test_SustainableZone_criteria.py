@@ -0,0 +1,74 @@
+# coding=utf-8
+"""Criteria registry test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import copy
+import json
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_criteria import DEFAULT_CRITERIA_FILE, Criteria, load_criteria
+
+
+class SustainableZoneCriteriaTest(unittest.TestCase):
+    """Test the criteria registry."""
+
+    def setUp(self):
+        """Runs before each test."""
+        with open(DEFAULT_CRITERIA_FILE, encoding='utf-8') as fh:
+            self.config = json.load(fh)['dimensions']
+
+    def test_default_registry(self):
+        """Test the shipped registry keeps the historical criteria."""
+        criteria = load_criteria()
+        self.assertEqual(criteria.keys, ['pib', 'infra', 'resto', 'tour', 'iqa', 'ress',
+                                         'bio', 'secu', 'sante', 'pauv', 'pmr'])
+        np.testing.assert_array_equal(
+            criteria.norms, [500, 400, 700, 1000, 40, 600, 900, 68, 60, 50, 50])
+        self.assertEqual(list(np.flatnonzero(criteria.inverted)), [9])
+        self.assertEqual(criteria.counts(), [4, 3, 4])
+        self.assertEqual(criteria.names('eco', 'short'), ['PIB', 'Infra', 'Resto', 'Touristes'])
+
+    def test_added_indicator(self):
+        """Test an extra indicator shifts the following columns."""
+        config = copy.deepcopy(self.config)
+        config[1]['indicators'].append(
+            {'key': 'eau', 'name': 'Consommation d\'eau', 'norm': 300, 'invert': True,
+             'keywords': ['conso_eau']})
+        criteria = Criteria(config)
+        self.assertEqual(len(criteria), 12)
+        self.assertEqual(criteria.slices['env'], slice(4, 8))
+        self.assertEqual(criteria.slices['soc'], slice(8, 12))
+        self.assertEqual(criteria.keys[7], 'eau')
+        self.assertTrue(criteria.inverted[7])
+        self.assertNotEqual(criteria.signature(), load_criteria().signature())
+
+    def test_invalid_registry(self):
+        """Test missing dimensions, bad norms and duplicate keys are rejected."""
+        with self.assertRaises(ValueError):
+            Criteria(self.config[:2])
+        config = copy.deepcopy(self.config)
+        config[0]['indicators'][0]['norm'] = 0
+        with self.assertRaises(ValueError):
+            Criteria(config)
+        config = copy.deepcopy(self.config)
+        config[2]['indicators'].append(dict(config[0]['indicators'][0]))
+        with self.assertRaises(ValueError):
+            Criteria(config)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneCriteriaTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -16,9 +16,9 @@ import unittest
 
 from qgis.PyQt.QtGui import QDialogButtonBox, QDialog
 
-from SustainableZone_dialog import SustainableZoneDialog
+from ..SustainableZone_dialog import SustainableZoneDialog
 
-from utilities import get_qgis_app
+from .utilities import get_qgis_app
 QGIS_APP = get_qgis_app()
 
 
@@ -0,0 +1,157 @@
+# coding=utf-8
+"""Vectorized scoring engine test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_engine import (
+    NORMS, CLASS_LABELS, ADVICE_MESSAGES,
+    ResultsStore, ScoreAggregator, advice, build_indicator_matrix, class_label,
+    classify, norm_ratio, score, score_matrix
+)
+
+
+def reference_score(row, sub_weights, dim_weights):
+    """Scalar re-implementation of the historical per-feature loop."""
+    ratios = []
+    for k, (v, norm) in enumerate(zip(row, NORMS)):
+        r = v / norm
+        if k == 9:
+            r = max(0.0, 1.0 - r)
+        ratios.append(r)
+    dims = [np.dot(ratios[0:4], sub_weights[0]),
+            np.dot(ratios[4:7], sub_weights[1]),
+            np.dot(ratios[7:11], sub_weights[2])]
+    id_global = sum(d * w for d, w in zip(dims, dim_weights))
+    return dims, id_global
+
+
+class SustainableZoneEngineTest(unittest.TestCase):
+    """Test the NumPy engine matches the per-feature computation."""
+
+    def setUp(self):
+        """Runs before each test."""
+        rng = np.random.default_rng(42)
+        self.X = rng.uniform(0.0, 1.5, size=(500, 11)) * NORMS
+        self.sub_weights = (np.array([0.4, 0.3, 0.2, 0.1]),
+                            np.array([0.5, 0.25, 0.25]),
+                            np.ones(4) / 4.0)
+        self.dim_weights = np.array([0.540, 0.297, 0.163])
+
+    def test_matches_reference(self):
+        """Test scores equal the scalar loop."""
+        scores = score_matrix(self.X, self.sub_weights, self.dim_weights)
+        for i, row in enumerate(self.X):
+            dims, id_global = reference_score(row, self.sub_weights, self.dim_weights)
+            np.testing.assert_allclose(scores['dims'][i], dims, rtol=1e-12)
+            self.assertAlmostEqual(scores['id_global'][i], id_global, places=12)
+
+    def test_classes_thresholds(self):
+        """Test classification at the 0.5 and 0.8 boundaries."""
+        codes = classify(np.array([0.49, 0.5, 0.8]))
+        labels = [CLASS_LABELS[c] for c in codes]
+        self.assertEqual(labels, ['Critique', 'Transition', 'Durable'])
+
+    def test_null_values(self):
+        """Test NULL, empty and text values count as zero."""
+        rows = [[None, '', 'abc', '12'] + [0.0] * 7]
+        X = build_indicator_matrix(rows)
+        np.testing.assert_array_equal(X[0, :4], [0.0, 0.0, 0.0, 12.0])
+
+    def test_advice_priority(self):
+        """Test the environmental warning takes precedence."""
+        X = np.zeros((1, 11))
+        sub = (np.ones(4) / 4.0, np.ones(3) / 3.0, np.ones(4) / 4.0)
+        scores = score_matrix(X, sub, [0.540, 0.297, 0.163])
+        self.assertEqual(ADVICE_MESSAGES[scores['advice'][0]],
+                         "URGENCE ÉCOLOGIQUE : biodiversité et qualité air.")
+
+    def test_streaming_aggregates(self):
+        """Test block aggregates match a single full pass."""
+        full = score_matrix(self.X, self.sub_weights, self.dim_weights)
+        aggregates = ScoreAggregator(top_k=5)
+        for start in range(0, len(self.X), 64):
+            block = score_matrix(self.X[start:start + 64],
+                                 self.sub_weights, self.dim_weights)
+            n = len(block['id_global'])
+            aggregates.update(block, [f'z{i}' for i in range(start, start + n)])
+
+        counts = np.bincount(full['classes'], minlength=3)
+        self.assertEqual(aggregates.stats(),
+                         {lbl: int(counts[c]) for c, lbl in enumerate(CLASS_LABELS)})
+        self.assertEqual(aggregates.hist.sum(), len(self.X))
+        np.testing.assert_allclose(aggregates.dim_means(), full['dims'].mean(axis=0))
+
+        order = np.argsort(-full['id_global'])
+        expected = [f'z{i}' for i in np.concatenate([order[:5], order[-5:]])]
+        self.assertEqual([r['name'] for r in aggregates.top_records()], expected)
+
+    def test_results_store_rows(self):
+        """Test row views read like the historical result dicts."""
+        scores = score_matrix(self.X, self.sub_weights, self.dim_weights)
+        names = [f'Zone é{i}' for i in range(len(self.X))]
+        store = ResultsStore.from_scores(scores, names, np.arange(len(self.X)))
+        self.assertEqual(len(store), len(self.X))
+        self.assertEqual(store.names(), names)
+        row = store[3]
+        self.assertEqual(row['name'], 'Zone é3')
+        self.assertAlmostEqual(row['norm_env'], scores['dims'][3, 1])
+        self.assertAlmostEqual(row['ws_soc'], scores['weighted'][3, 2])
+        self.assertEqual(row['subs_env'], scores['subs'][3, 4:7].tolist())
+        self.assertEqual(row['classe'], CLASS_LABELS[scores['classes'][3]])
+        self.assertEqual(row['conseil'], ADVICE_MESSAGES[scores['advice'][3]])
+
+        again = ResultsStore.from_records([dict((k, r[k]) for k in (
+            'name', 'norm_eco', 'norm_env', 'norm_soc', 'ws_eco', 'ws_env', 'ws_soc',
+            'subs_eco', 'subs_env', 'subs_soc', 'id_global', 'classe', 'conseil'))
+            for r in store])
+        np.testing.assert_allclose(again.subs, store.subs)
+        np.testing.assert_array_equal(again.advice, store.advice)
+        self.assertEqual(again.stats(), store.stats())
+
+        small = ResultsStore.from_scores(scores, names, dtype=np.float32)
+        self.assertLess(small.nbytes, store.nbytes)
+        self.assertEqual(store.take([5, 1]).names(), ['Zone é5', 'Zone é1'])
+
+    def test_headless_api(self):
+        """Test score() and the scalar helpers agree with score_matrix."""
+        store = score(self.X, {'dim_weights': self.dim_weights,
+                               'sub_weights': self.sub_weights})
+        expected = score_matrix(self.X, self.sub_weights, self.dim_weights)
+        np.testing.assert_allclose(store.id_global, expected['id_global'])
+        for i in range(10):
+            row = store[i]
+            self.assertEqual(row['conseil'],
+                             advice(row['norm_eco'], row['norm_env'], row['norm_soc']))
+            self.assertEqual(row['classe'], class_label(row['id_global']))
+        self.assertEqual(len(score([['NULL'] * 11, [None] * 11])), 2)
+        self.assertEqual(norm_ratio('NULL', 50.0), 0.0)
+        self.assertEqual(norm_ratio(75.0, 50.0, invert=True), 0.0)
+
+    def test_cache_rescore(self):
+        """Test re-scoring the stored matrix equals a full run."""
+        first = score_matrix(self.X, self.sub_weights, self.dim_weights)
+        cache = ResultsStore.from_scores(first, [''] * len(self.X), np.arange(len(self.X)))
+        new_weights = np.array([0.2, 0.5, 0.3])
+        rescored = cache.rescore(self.sub_weights, new_weights)
+        expected = score_matrix(self.X, self.sub_weights, new_weights)
+        np.testing.assert_allclose(rescored['id_global'], expected['id_global'])
+        np.testing.assert_array_equal(rescored['classes'], expected['classes'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneEngineTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
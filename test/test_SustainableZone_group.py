@@ -0,0 +1,127 @@
+# coding=utf-8
+"""Group AHP test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_ahp import ahp, pairwise_matrix
+from ..SustainableZone_group import aggregate, group_ahp, parse_judgment, read_expert_judgments
+
+
+class SustainableZoneGroupTest(unittest.TestCase):
+    """Test reading and aggregating expert judgments."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_parse_judgment(self):
+        """Test fractions, decimal commas and empty cells."""
+        self.assertAlmostEqual(parse_judgment('1/3'), 1 / 3)
+        self.assertAlmostEqual(parse_judgment(' 0,5 '), 0.5)
+        self.assertTrue(np.isnan(parse_judgment('')))
+        self.assertTrue(np.isnan(parse_judgment(None)))
+
+    def test_aij_and_aip(self):
+        """Test both aggregations against their definitions."""
+        upper = np.array([[2.0, 3.0, 2.0, 1.0, 4.0, 2.0],
+                          [4.0, 1.0, 0.5, 2.0, 2.0, 1.0],
+                          [1.0, 5.0, 3.0, 0.5, 1.0, 3.0]])
+        aij = aggregate(upper, 4, 'aij')
+        np.testing.assert_allclose(aij['judgments'], np.exp(np.log(upper).mean(axis=0)))
+
+        aip = aggregate(upper, 4, 'aip')
+        expert_w = [ahp(pairwise_matrix(4, dict(zip([(0, 1), (0, 2), (0, 3), (1, 2),
+                                                     (1, 3), (2, 3)], row))))[0]
+                    for row in upper]
+        expected = np.exp(np.log(expert_w).mean(axis=0))
+        np.testing.assert_allclose(aip['weights'], expected / expected.sum())
+        self.assertAlmostEqual(aip['cr'], 0.0)
+
+        with self.assertRaises(ValueError):
+            aggregate(upper, 4, 'median')
+
+    def test_drop_inconsistent(self):
+        """Test incomplete and inconsistent forms are left out."""
+        upper = np.array([[2.0, 3.0, 2.0],
+                          [9.0, 1 / 9, 9.0],
+                          [2.0, np.nan, 2.0]])
+        res = aggregate(upper, 3, 'aij', drop_inconsistent=True)
+        np.testing.assert_array_equal(res['kept'], [True, False, False])
+        self.assertTrue(np.isnan(res['expert_cr'][2]))
+        np.testing.assert_allclose(res['judgments'], upper[0])
+        self.assertTrue(aggregate(upper, 3, 'aij')['kept'][1])
+
+    def test_read_csv_and_json(self):
+        """Test the CSV and JSON forms give the same judgments."""
+        csv_path = os.path.join(self.directory, 'avis.csv')
+        with open(csv_path, 'w', encoding='utf-8') as fh:
+            fh.write("expert;dim_1_2;dim_1_3;dim_2_3;env_1_2;env_1_3;env_2_3\n")
+            fh.write("A;2;3;2;1/2;1;2\n")
+            fh.write("B;1,5;4;3;;;\n")
+        json_path = os.path.join(self.directory, 'avis.json')
+        with open(json_path, 'w', encoding='utf-8') as fh:
+            json.dump({'experts': [
+                {'expert': 'A', 'dim': [2, 3, 2],
+                 'env': [[1, 0.5, 1], [2, 1, 2], [1, '1/2', 1]]},
+                {'expert': 'B', 'dim': [1.5, 4, 3]},
+            ]}, fh)
+
+        experts, levels = read_expert_judgments(csv_path)
+        self.assertEqual(experts, ['A', 'B'])
+        _, from_json = read_expert_judgments(json_path)
+        for level in ('dim', 'env', 'eco'):
+            np.testing.assert_allclose(levels[level], from_json[level])
+
+        _, results, skipped = group_ahp(csv_path)
+        self.assertEqual(set(results), {'dim', 'env'})
+        self.assertEqual(skipped, {})
+        np.testing.assert_array_equal(results['env']['kept'], [True, False])
+
+    def test_json_triangle_rows_and_nulls(self):
+        """Test ragged upper-triangle rows, null answers and skipped levels."""
+        json_path = os.path.join(self.directory, 'avis.json')
+        with open(json_path, 'w', encoding='utf-8') as fh:
+            json.dump([
+                {'expert': 'A', 'dim': [[2, 3], [2]],
+                 'eco': [[2, 3, 2], [1, 4], [2]], 'env': [2, None, 1]},
+                {'expert': 'B', 'dim': [[1, '1/2'], [None]], 'env': None},
+            ], fh)
+
+        _, levels = read_expert_judgments(json_path)
+        np.testing.assert_allclose(levels['dim'][0], [2, 3, 2])
+        np.testing.assert_allclose(levels['eco'][0], [2, 3, 2, 1, 4, 2])
+        self.assertTrue(np.isnan(levels['dim'][1, 2]))
+        self.assertTrue(np.isnan(levels['env']).any(axis=1).all())
+
+        # « env » : aucun formulaire complet, les autres niveaux sont importés
+        _, results, skipped = group_ahp(json_path)
+        self.assertEqual(set(results), {'dim', 'eco'})
+        np.testing.assert_array_equal(results['dim']['kept'], [True, False])
+        self.assertEqual(set(skipped), {'env'})
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneGroupTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,111 @@
+# coding=utf-8
+"""Layer I/O test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import unittest
+
+from qgis.core import QgsFeature, QgsFeatureRequest, QgsVectorLayer
+
+from ..SustainableZone_io import (
+    RESULT_FIELDS, ResultWriter, ensure_result_fields, node_fields, scoring_request
+)
+
+from .utilities import get_qgis_app
+QGIS_APP = get_qgis_app()
+
+
+class SustainableZoneIoTest(unittest.TestCase):
+    """Test bulk write-back of the result fields."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.layer = QgsVectorLayer('Point?field=nom:string', 'zones', 'memory')
+        feats = []
+        for i in range(7):
+            f = QgsFeature(self.layer.fields())
+            f['nom'] = f'Zone {i}'
+            feats.append(f)
+        self.layer.dataProvider().addFeatures(feats)
+        ensure_result_fields(self.layer)
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.layer = None
+
+    def _write_all(self, writer):
+        writer.begin()
+        for f in self.layer.getFeatures():
+            writer.add(f.id(), (0.1, 0.2, 0.3, 0.6, 'Transition', 'ok'))
+        writer.commit()
+
+    def test_result_fields_added(self):
+        """Test the six result fields exist."""
+        for name, _ in RESULT_FIELDS:
+            self.assertNotEqual(self.layer.fields().indexOf(name), -1)
+
+    def test_scoring_request(self):
+        """Test the read request skips geometry and unused fields."""
+        request = scoring_request(self.layer, ['Id_Global', '', 'absent'])
+        self.assertTrue(request.flags() & QgsFeatureRequest.NoGeometry)
+        self.assertEqual(sorted(request.subsetOfAttributes()),
+                         [0, self.layer.fields().indexOf('Id_Global')])
+
+    def test_node_fields_unique(self):
+        """Test node keys sharing their first characters get distinct fields."""
+        names = [name for name, _ in node_fields(
+            ['transport_air', 'transport_rail', 'transport_route', 'eco'])]
+        self.assertEqual(names, ['N_transpor', 'N_transpo2', 'N_transpo3', 'N_eco'])
+
+    def test_bulk_write_in_chunks(self):
+        """Test values are written through the provider in chunks."""
+        writer = ResultWriter(self.layer, chunk_size=3)
+        self.assertTrue(writer.bulk)
+        self._write_all(writer)
+        self.assertEqual(writer.written, 7)
+        self.assertFalse(self.layer.isEditable())
+        for f in self.layer.getFeatures():
+            self.assertAlmostEqual(f['Id_Global'], 0.6)
+            self.assertEqual(f['Classe_ADMC'], 'Transition')
+
+    def test_edit_buffer_fallback(self):
+        """Test an editable layer goes through the edit buffer."""
+        self.layer.startEditing()
+        writer = ResultWriter(self.layer, chunk_size=3)
+        self.assertFalse(writer.bulk)
+        self._write_all(writer)
+        for f in self.layer.getFeatures():
+            self.assertEqual(f['Conseil'], 'ok')
+
+    def test_user_edit_session_kept(self):
+        """Test the user's own edit session and pending edits are left alone."""
+        self.layer.startEditing()
+        self.layer.changeAttributeValue(1, 0, 'Renommée')
+        writer = ResultWriter(self.layer, chunk_size=3)
+        self._write_all(writer)
+        self.assertTrue(self.layer.isEditable())
+        self.assertEqual(self.layer.getFeature(1)['nom'], 'Renommée')
+        self.assertEqual(self.layer.getFeature(1)['Conseil'], 'ok')
+
+        writer = ResultWriter(self.layer, chunk_size=3)
+        writer.begin()
+        writer.add(1, (0.0, 0.0, 0.0, 0.0, 'Critique', 'annulé'))
+        writer.rollback()
+        self.assertTrue(self.layer.isEditable())
+        self.assertEqual(self.layer.getFeature(1)['nom'], 'Renommée')
+        self.assertEqual(self.layer.getFeature(1)['Conseil'], 'ok')
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneIoTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,56 @@
+# coding=utf-8
+"""Analysis log test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import os
+import tempfile
+import unittest
+
+from ..SustainableZone_log import ZoneLog
+
+
+class SustainableZoneLogTest(unittest.TestCase):
+    """Test the per-zone log policy."""
+
+    def test_small_layer_shows_lines(self):
+        """Test every zone line reaches the console below the cap."""
+        log = ZoneLog(3, max_lines=10)
+        self.assertTrue(all(log.zone(f'zone {i}') for i in range(3)))
+        self.assertIsNone(log.summary())
+
+    def test_large_layer_summary_only(self):
+        """Test a layer above the cap only gets the summary."""
+        log = ZoneLog(50, max_lines=10)
+        self.assertFalse(log.wants_lines)
+        log.skip(50)
+        self.assertIn('50 lignes', log.summary())
+
+    def test_full_log_on_disk(self):
+        """Test the file receives every line without HTML."""
+        path = os.path.join(tempfile.mkdtemp(), 'admc.log')
+        log = ZoneLog(50, max_lines=10, file_path=path)
+        self.assertTrue(log.wants_lines)
+        for i in range(50):
+            self.assertFalse(log.zone(f"<b>zone {i}</b>"))
+        log.close()
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(lines[0], 'zone 0')
+        self.assertIn(path, log.summary())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneLogTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
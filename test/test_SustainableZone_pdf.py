@@ -0,0 +1,93 @@
+# coding=utf-8
+"""PDF report assembly test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import io
+import re
+import unittest
+
+from ..SustainableZone_charts import matplotlib_available
+from ..SustainableZone_pdf import PdfReport, _read_objects, _renumber
+
+
+def figure_pdf(text, size=(4, 3)):
+    """Single-page matplotlib PDF with one line of text."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=size)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot([0, 1, 2], [1, 0, 1])
+    ax.set_title(text)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='pdf')
+    return buffer.getvalue()
+
+
+class SustainableZonePdfTest(unittest.TestCase):
+    """Test pre-rendered pages are copied into one report."""
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_pages_in_order(self):
+        """Test every page is kept, in order, with its own size."""
+        report = PdfReport()
+        report.add_pdf(figure_pdf("Économie", (4, 3)))
+        report.add_pdf(figure_pdf("Social", (6, 6)))
+        data = report.getvalue()
+        self.assertEqual(report.page_count, 2)
+        objects, root, info = _read_objects(data)
+        self.assertIsNone(info)
+        self.assertIn(b'/Count 2', objects[2])
+        kids = [int(n) for n in re.findall(rb'(\d+) 0 R', objects[2])]
+        boxes = [re.search(rb'/MediaBox \[ ([\d. ]+) \]', objects[kid]).group(1).split()
+                 for kid in kids]
+        self.assertEqual([box[2:] for box in boxes], [[b'288', b'216'], [b'432', b'432']])
+        for kid in kids:
+            self.assertIn(b'/Parent 2 0 R', objects[kid])
+        # Le rapport assemblé se relit et se réassemble
+        again = PdfReport()
+        again.add_pdf(data)
+        self.assertEqual(again.page_count, 2)
+
+    @unittest.skipUnless(matplotlib_available(), "matplotlib requis")
+    def test_references_resolve(self):
+        """Test every reference of the report points to one of its objects."""
+        report = PdfReport()
+        for text in ("A", "B", "C"):
+            report.add_pdf(figure_pdf(text))
+        objects, root, _ = _read_objects(report.getvalue())
+        self.assertEqual(root, 1)
+        for number, body in objects.items():
+            header = body.split(b'stream', 1)[0]
+            for ref in re.findall(rb'(?<![\w.])(\d+) 0 R', header):
+                self.assertIn(int(ref), objects, f"objet {number}")
+
+    def test_renumber_skips_strings_and_streams(self):
+        """Test only references outside strings and stream data change."""
+        body = b'<< /A 4 0 R /S (4 0 R \\) 4 0 R) /Length 5 0 R >>\nstream\n4 0 R\nendstream'
+        self.assertEqual(
+            _renumber(body, {4: 10, 5: 11}),
+            b'<< /A 10 0 R /S (4 0 R \\) 4 0 R) /Length 11 0 R >>\nstream\n4 0 R\nendstream')
+        with self.assertRaises(ValueError):
+            _renumber(b'<< /A 7 0 R >>', {4: 10})
+
+    def test_unknown_pdf(self):
+        """Test a PDF without a classic xref table is refused."""
+        with self.assertRaises(ValueError):
+            PdfReport().add_pdf(b'%PDF-1.5\n1 0 obj\n<< >>\nendobj\n')
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZonePdfTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
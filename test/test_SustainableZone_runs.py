@@ -0,0 +1,91 @@
+# coding=utf-8
+"""Run artifacts test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from ..SustainableZone_runs import MANIFEST_FILE, RunArtifacts, list_runs, prune_runs
+
+
+class SustainableZoneRunsTest(unittest.TestCase):
+    """Test per-run artifact directories and their cleanup."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_manifest(self):
+        """Test artifacts are stored and described in the run manifest."""
+        run = RunArtifacts(self.directory, {'layer': 'zones', 'weights': [0.5, 0.3, 0.2]})
+        run.put('01_pie_ahp', b'\x89PNG data', dpi=200)
+        self.assertEqual(run.get('01_pie_ahp', 200), b'\x89PNG data')
+        self.assertIsNone(run.get('01_pie_ahp', 100))
+        self.assertIsNone(run.get('02_bar_scores'))
+        run.record_export('/tmp/rapport.pdf')
+
+        with open(os.path.join(run.path, MANIFEST_FILE), encoding='utf-8') as fh:
+            manifest = json.load(fh)
+        self.assertEqual(manifest['info']['layer'], 'zones')
+        self.assertEqual(manifest['artifacts']['01_pie_ahp'],
+                         {'file': '01_pie_ahp.png', 'dpi': 200, 'bytes': 9})
+        self.assertEqual(manifest['exports'][0]['path'], '/tmp/rapport.pdf')
+
+        run.discard('01_pie_ahp')
+        self.assertIsNone(run.get('01_pie_ahp'))
+        self.assertEqual(sorted(os.listdir(run.path)), [MANIFEST_FILE])
+
+    def test_missing_artifact_forgotten(self):
+        """Test an artifact whose file vanished is dropped from the saved manifest."""
+        run = RunArtifacts(self.directory)
+        run.put('01_pie_ahp', b'\x89PNG data', dpi=200)
+        os.remove(os.path.join(run.path, '01_pie_ahp.png'))
+        self.assertIsNone(run.get('01_pie_ahp'))
+        with open(os.path.join(run.path, MANIFEST_FILE), encoding='utf-8') as fh:
+            self.assertEqual(json.load(fh)['artifacts'], {})
+
+    def test_prune_by_age_and_size(self):
+        """Test old runs go first, the current run and foreign folders stay."""
+        runs = []
+        for _ in range(3):
+            run = RunArtifacts(self.directory)
+            run.put('chart', b'\0' * 10000)
+            runs.append(run)
+            time.sleep(0.01)
+        os.makedirs(os.path.join(self.directory, 'autre'))
+        self.assertEqual(len(list_runs(self.directory)), 3)
+
+        # Âge : la plus ancienne dépasse le budget, sauf si c'est l'analyse courante
+        runs[0].manifest['last_used'] -= 10 * 86400
+        runs[0]._save()
+        self.assertEqual(prune_runs(self.directory, keep=runs[0].run_id), [])
+        self.assertEqual(prune_runs(self.directory), [runs[0].run_id])
+
+        # Taille : la moins récemment utilisée part d'abord
+        self.assertEqual(prune_runs(self.directory, max_bytes=15000, keep=runs[1].run_id),
+                         [runs[2].run_id])
+        self.assertEqual(set(os.listdir(self.directory)), {'autre', runs[1].run_id})
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneRunsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
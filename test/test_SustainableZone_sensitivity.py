@@ -0,0 +1,128 @@
+# coding=utf-8
+"""Weight sensitivity analysis test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import time
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_ahp import ahp, pairwise_matrix
+from ..SustainableZone_engine import classify, sub_weight_matrix
+from ..SustainableZone_sensitivity import (
+    DEFAULT_DRAWS, DEFAULT_RANK_DRAWS, critical_thresholds, monte_carlo, oat_sweep,
+    perturb_judgments, saaty_position, saaty_value, sweep_values
+)
+
+# Budget de la simulation sur 50 000 zones (« quelques secondes »)
+BENCHMARK_SECONDS = 15.0
+
+
+class SustainableZoneSensitivityTest(unittest.TestCase):
+    """Test the Monte Carlo weight uncertainty."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.dims = np.random.default_rng(5).uniform(0.0, 1.5, size=(400, 3))
+        self.judgments = np.array([2.0, 3.0, 2.0])
+
+    def test_saaty_scale(self):
+        """Test the Saaty position mapping round-trips."""
+        values = np.array([1 / 9, 1 / 2, 1.0, 2.0, 9.0])
+        np.testing.assert_allclose(saaty_position(values), [-8, -1, 0, 1, 8])
+        np.testing.assert_allclose(saaty_value(saaty_position(values)), values)
+
+    def test_perturbation_bounds(self):
+        """Test draws stay within one Saaty step of each judgment."""
+        draws = perturb_judgments(self.judgments, 5000, 1.0, np.random.default_rng(0))
+        self.assertTrue(np.all(draws[:, 0] >= 1.0) and np.all(draws[:, 0] <= 3.0))
+        self.assertTrue(np.all(draws[:, 1] >= 2.0) and np.all(draws[:, 1] <= 4.0))
+
+    def test_zero_spread_is_deterministic(self):
+        """Test without perturbation every zone keeps its class."""
+        mc = monte_carlo(self.dims, self.judgments, draws=50, spread=0.0, seed=1)
+        weights, _ = ahp(pairwise_matrix(3, {(0, 1): 2.0, (0, 2): 3.0, (1, 2): 2.0}))
+        id_global = self.dims @ weights
+        expected = np.eye(3)[classify(id_global)]
+        np.testing.assert_allclose(mc['p_class'], expected, atol=1e-9)
+        np.testing.assert_allclose(mc['mean'], id_global)
+
+    def test_matches_brute_force(self):
+        """Test per-zone statistics against the full draws x zones matrix."""
+        # Petits blocs : plusieurs blocs de zones et de tirages
+        mc = monte_carlo(self.dims, self.judgments, draws=4000, seed=2, block_cells=50000)
+        ids = self.dims @ mc['weights'].T
+        np.testing.assert_allclose(mc['mean'], ids.mean(axis=1))
+        np.testing.assert_allclose(mc['p05'], np.percentile(ids, 5, axis=1), atol=1e-9)
+        np.testing.assert_allclose(mc['p95'], np.percentile(ids, 95, axis=1), atol=1e-9)
+        durable = (ids >= 0.8).mean(axis=1)
+        np.testing.assert_allclose(mc['p_class'][:, 2], durable, atol=1e-9)
+        critical = (ids < 0.5).mean(axis=1)
+        np.testing.assert_allclose(mc['p_class'][:, 0], critical, atol=1e-9)
+        np.testing.assert_allclose(mc['p_class'].sum(axis=1), 1.0)
+
+        # Rangs : exacts sur les rank_draws premiers tirages
+        self.assertEqual(mc['rank_draws'], DEFAULT_RANK_DRAWS)
+        for count in (mc['rank_draws'], 4000):
+            mc = monte_carlo(self.dims, self.judgments, draws=4000, seed=2,
+                             block_cells=50000, rank_draws=count)
+            ranked = ids[:, :count]
+            ranks = np.array([1 + (ranked > row).sum(axis=0) for row in ranked])
+            np.testing.assert_array_equal(mc['rank_best'], ranks.min(axis=1))
+            np.testing.assert_array_equal(mc['rank_worst'], ranks.max(axis=1))
+
+    def test_benchmark_50k_zones(self):
+        """Test 50,000 zones x 10,000 draws run within the time budget."""
+        dims = np.random.default_rng(7).uniform(0.0, 1.5, size=(50000, 3))
+        start = time.perf_counter()
+        mc = monte_carlo(dims, self.judgments, draws=DEFAULT_DRAWS, seed=3)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(mc['draws'], 10000)
+        # Environ 7 s sur un seul cœur
+        self.assertLess(elapsed, BENCHMARK_SECONDS)
+
+    def test_oat_sweep(self):
+        """Test the one-at-a-time sweep against a direct recomputation."""
+        subs = np.random.default_rng(6).uniform(0.0, 1.5, size=(300, 11))
+        sub_judgments = {'eco': np.ones(6), 'env': np.ones(3), 'soc': np.ones(6)}
+        values = sweep_values(17)
+        self.assertAlmostEqual(values[0], 1 / 9)
+        self.assertAlmostEqual(values[-1], 9.0)
+
+        sweeps = oat_sweep(subs, self.judgments, sub_judgments, steps=17)
+        self.assertEqual(len(sweeps), 3 + 6 + 3 + 6)
+        for sweep in sweeps:
+            self.assertEqual(sweep['changed'][values == sweep['current']].sum(), 0)
+
+        # Jugement éco (0, 1) : recalcul complet pour chaque valeur balayée
+        sweep = sweeps[3]
+        self.assertEqual((sweep['group'], sweep['pair']), ('eco', (0, 1)))
+        dim_w, _ = ahp(pairwise_matrix(3, {(0, 1): 2.0, (0, 2): 3.0, (1, 2): 2.0}))
+        uniform = [np.full(m, 1.0 / m) for m in (4, 3, 4)]
+        base = classify(subs @ sub_weight_matrix(*uniform) @ dim_w)
+        for step, value in enumerate(values):
+            eco_w, _ = ahp(pairwise_matrix(4, {(0, 1): value}))
+            ids = subs @ sub_weight_matrix(eco_w, *uniform[1:]) @ dim_w
+            self.assertEqual(sweep['changed'][step], np.count_nonzero(classify(ids) != base))
+
+        summary = critical_thresholds(sweep)
+        self.assertEqual(set(summary), {'lower', 'upper', 'max_down', 'max_up', 'zones'})
+        self.assertTrue(summary['lower'] is None or summary['lower'] < 1.0)
+        self.assertTrue(summary['upper'] is None or summary['upper'] > 1.0)
+        self.assertEqual(summary['max_up'], sweep['changed'][values > 1.0].max())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneSensitivityTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
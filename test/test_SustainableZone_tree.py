@@ -0,0 +1,107 @@
+# coding=utf-8
+"""Criteria tree test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'imanekhoussi@gmail.com'
+__date__ = '2026-10-17'
+__copyright__ = 'Copyright 2026, KHOUSSI Imane & Zian Aymane'
+
+import unittest
+
+import numpy as np
+
+from ..SustainableZone_criteria import Criteria
+from ..SustainableZone_engine import CRITERIA, sub_weight_matrix
+from ..SustainableZone_tree import CriteriaTree
+
+
+def _leaf(key):
+    return {'key': key, 'norm': 1}
+
+
+# Environnement → Air → (PM2.5, NO2, O3), Eau ; Économie → (PIB, Emploi) ; Social → Santé
+NESTED = [
+    {'key': 'eco', 'indicators': [_leaf('pib'), _leaf('emploi')]},
+    {'key': 'env', 'indicators': [
+        {'key': 'air', 'children': [_leaf('pm25'), _leaf('no2'), _leaf('o3')]},
+        _leaf('eau'),
+    ]},
+    {'key': 'soc', 'indicators': [_leaf('sante')]},
+]
+
+
+class SustainableZoneTreeTest(unittest.TestCase):
+    """Test weight propagation and node scores."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.criteria = Criteria(NESTED)
+        self.tree = CriteriaTree(self.criteria)
+        self.local = {
+            'dim': np.array([0.5, 0.3, 0.2]),
+            'eco': np.array([0.75, 0.25]),
+            'env': np.array([0.6, 0.4]),
+            'air': np.array([0.5, 0.3, 0.2]),
+        }
+
+    def test_nested_registry(self):
+        """Test leaves are contiguous under each group."""
+        self.assertEqual(self.criteria.keys, ['pib', 'emploi', 'pm25', 'no2', 'o3', 'eau', 'sante'])
+        self.assertEqual(list(self.criteria.groups), ['eco', 'env', 'air', 'soc'])
+        self.assertEqual(self.criteria.groups['air']['span'], slice(2, 5))
+        self.assertEqual(self.criteria.slices['env'], slice(2, 6))
+        self.assertEqual(self.criteria.nested_groups(), ['air'])
+        self.assertEqual(self.tree.group_sizes(), {'dim': 3, 'eco': 2, 'env': 2, 'air': 3,
+                                                   'soc': 1})
+
+    def test_global_weights(self):
+        """Test a leaf weight is the product of local weights along its path."""
+        w = self.tree.global_weights(self.local)
+        self.assertAlmostEqual(w.sum(), 1.0)
+        self.assertAlmostEqual(w[3], 0.3 * 0.6 * 0.3)   # env → air → no2
+        self.assertAlmostEqual(w[5], 0.3 * 0.4)         # env → eau
+        self.assertAlmostEqual(w[6], 0.2)               # soc → sante (groupe uniforme)
+
+        eco, env, soc = self.tree.sub_weights(self.local)
+        np.testing.assert_allclose(env, [0.3, 0.18, 0.12, 0.4])
+        np.testing.assert_allclose(soc, [1.0])
+
+    def test_flat_tree(self):
+        """Test the default two-level registry matches the per-dimension weights."""
+        tree = CriteriaTree(CRITERIA)
+        local = {key: np.arange(1.0, len(group['children']) + 1)
+                 / np.arange(1.0, len(group['children']) + 1).sum()
+                 for key, group in CRITERIA.groups.items()}
+        local['dim'] = np.array([0.54, 0.297, 0.163])
+        for weights, key in zip(tree.sub_weights(local), ('eco', 'env', 'soc')):
+            np.testing.assert_allclose(weights, local[key])
+        np.testing.assert_allclose(tree.global_weights(local),
+                                   sub_weight_matrix(*tree.sub_weights(local)) @ local['dim'])
+
+    def test_node_scores(self):
+        """Test node scores against a direct weighted mean of their children."""
+        subs = np.random.default_rng(3).random((50, len(self.criteria)))
+        nodes = ['env', 'air']
+        scores = self.tree.node_scores(subs, self.local, nodes)
+        air = subs[:, 2:5] @ self.local['air']
+        np.testing.assert_allclose(scores[:, 1], air)
+        np.testing.assert_allclose(scores[:, 0], 0.6 * air + 0.4 * subs[:, 5])
+
+        C = self.tree.child_matrix(self.local, 'env')
+        np.testing.assert_allclose(subs[:, 2:6] @ C, np.column_stack([air, subs[:, 5]]))
+
+        id_global = subs @ self.tree.global_weights(self.local)
+        dims = self.tree.node_scores(subs, self.local, ['eco', 'env', 'soc'])
+        np.testing.assert_allclose(id_global, dims @ self.local['dim'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SustainableZoneTreeTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)